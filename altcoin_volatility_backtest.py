@@ -24,7 +24,6 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import time
 
 
 class SMA_20_200_Backtester:
@@ -46,32 +45,16 @@ class SMA_20_200_Backtester:
     def fetch_binance_data(self, symbol, days=365, timeframe='5m'):
         """바이낸스 데이터 수집 (1년)"""
         try:
-            import ccxt
+            from exchange_provider import get_exchange, fetch_ohlcv_range
         except ImportError:
             print("❌ ccxt 필요: pip install ccxt")
             return None
 
         print(f"\n📊 {symbol} {days}일 데이터 수집 ({timeframe})...")
 
-        exchange = ccxt.binance()
-        limit = 1000
-
+        exchange = get_exchange('binance')
         since = exchange.parse8601((datetime.now() - timedelta(days=days)).isoformat())
-        all_ohlcv = []
-
-        while True:
-            try:
-                ohlcv = exchange.fetch_ohlcv(symbol, timeframe, since, limit)
-                if not ohlcv:
-                    break
-                all_ohlcv.extend(ohlcv)
-                since = ohlcv[-1][0] + 1
-                if len(ohlcv) < limit:
-                    break
-                time.sleep(exchange.rateLimit / 1000)
-            except Exception as e:
-                print(f"❌ {e}")
-                break
+        all_ohlcv = fetch_ohlcv_range(exchange, symbol, timeframe, since)
 
         if not all_ohlcv:
             return None
@@ -0,0 +1,284 @@
+"""
+업비트 비동기 API 클라이언트 (asyncio + aiohttp)
+UpbitAPI와 같은 메서드 구성 + 여러 마켓 캔들 동시 조회(gather_candles)
+
+요청 제한은 UpbitAPI와 같은 프로세스 공유 UpbitRateLimiter를 사용하므로
+동기/비동기 클라이언트를 함께 써도 한도를 넘지 않습니다.
+"""
+import asyncio
+import os
+import aiohttp
+from upbit_api import UpbitAPI
+from upbit_rate_limiter import get_shared_limiter
+
+
+class AsyncUpbitAPI:
+    """업비트 asyncio 클라이언트"""
+
+    TIMEOUTS = UpbitAPI.TIMEOUTS
+    MAX_THROTTLE_RETRIES = UpbitAPI.MAX_THROTTLE_RETRIES
+
+    # JWT 인증 헤더 생성은 동기 클라이언트와 동일
+    _get_headers = UpbitAPI._get_headers
+
+    def __init__(self, access_key=None, secret_key=None, pool_maxsize=10, rate_limiter=None,
+                 server_url=None):
+        """
+        Args:
+            access_key: 업비트 API Access Key (시세 조회만 하면 None 가능)
+            secret_key: 업비트 API Secret Key
+            pool_maxsize: 동시 keep-alive 커넥션 수
+            rate_limiter: UpbitRateLimiter (None이면 프로세스 공유 인스턴스)
+            server_url: API 주소 (None이면 UPBIT_SERVER_URL 환경변수 또는 api.upbit.com)
+        """
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.server_url = server_url or os.getenv('UPBIT_SERVER_URL', "https://api.upbit.com")
+        self.pool_maxsize = pool_maxsize
+        self.rate_limiter = rate_limiter or get_shared_limiter()
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_session(self):
+        # aiohttp 세션은 실행 중인 이벤트 루프 안에서 생성해야 함
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self):
+        """커넥션 풀 정리"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _request(self, method, path, group='default', params=None, json=None, headers=None):
+        """공용 세션으로 요청 후 JSON 반환 (요청 제한 + 그룹별 타임아웃)"""
+        connect, read = self.TIMEOUTS.get(group, self.TIMEOUTS['default'])
+        timeout = aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        limit_group = self.rate_limiter.group_for(path, group)
+        # JWT nonce는 재사용할 수 없으므로 인증 요청은 재시도하지 않음
+        retries = 0 if headers else self.MAX_THROTTLE_RETRIES
+
+        session = self._get_session()
+        for attempt in range(retries + 1):
+            wait = self.rate_limiter.reserve(limit_group)
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            async with session.request(method, f"{self.server_url}{path}", params=params,
+                                       json=json, headers=headers, timeout=timeout) as response:
+                limit_group = self.rate_limiter.update_from_header(
+                    path, response.headers.get('Remaining-Req')
+                ) or limit_group
+
+                if response.status != 429 or attempt == retries:
+                    return await response.json(content_type=None)
+
+            # 한도 초과: 그룹을 비우고 다음 구간에서 재시도
+            self.rate_limiter.penalize(limit_group)
+
+    async def get_accounts(self):
+        headers = self._get_headers()
+        return await self._request('GET', '/v1/accounts', 'default', headers=headers)
+
+    async def get_market_all(self):
+        """마켓 코드 조회"""
+        params = {"isDetails": "false"}
+        return await self._request('GET', '/v1/market/all', 'market', params=params)
+
+    async def get_current_price(self, market="KRW-ETH"):
+        params = {"markets": market}
+        return (await self._request('GET', '/v1/ticker', 'market', params=params))[0]
+
+    async def get_ticker(self, markets):
+        """여러 마켓의 현재가 정보 조회"""
+        if isinstance(markets, list) and len(markets) > UpbitAPI.TICKER_CHUNK_SIZE:
+            return list((await self.get_tickers_batch(markets)).values())
+        markets_str = ','.join(markets) if isinstance(markets, list) else markets
+        params = {"markets": markets_str}
+        return await self._request('GET', '/v1/ticker', 'market', params=params)
+
+    async def get_tickers_batch(self, markets, chunk_size=None):
+        """마켓 수 제한 없는 현재가 일괄 조회 (청크 동시 요청)
+
+        Returns:
+            dict: {market: ticker} (입력 순서 유지)
+        """
+        chunk_size = chunk_size or UpbitAPI.TICKER_CHUNK_SIZE
+        markets = list(dict.fromkeys(markets))
+        chunks = [markets[i:i + chunk_size] for i in range(0, len(markets), chunk_size)]
+        results = await asyncio.gather(
+            *(self._request('GET', '/v1/ticker', 'market', params={"markets": ','.join(chunk)})
+              for chunk in chunks)
+        )
+
+        by_market = {}
+        for tickers in results:
+            if not isinstance(tickers, list):
+                raise ValueError(f"티커 조회 실패: {tickers}")
+            by_market.update((t['market'], t) for t in tickers)
+        return {m: by_market[m] for m in markets if m in by_market}
+
+    async def get_orderbook(self, market="KRW-ETH"):
+        params = {"markets": market}
+        return (await self._request('GET', '/v1/orderbook', 'market', params=params))[0]
+
+    async def get_candles(self, market="KRW-ETH", interval="minutes", unit=1, count=200):
+        if interval == "minutes":
+            path = f"/v1/candles/minutes/{unit}"
+        else:
+            path = f"/v1/candles/{interval}"
+
+        params = {"market": market, "count": count}
+        return await self._request('GET', path, 'candle', params=params)
+
+    async def gather_candles(self, markets, unit=1, count=200, interval="minutes"):
+        """여러 마켓 캔들 동시 조회
+
+        공유 요청 제한 안에서 모든 마켓 요청을 한꺼번에 띄웁니다.
+
+        Args:
+            markets: 마켓 리스트
+            unit: 분봉 단위
+            count: 마켓당 캔들 개수
+
+        Returns:
+            dict: {market: 캔들 리스트 (실패 시 None)}
+        """
+        results = await asyncio.gather(
+            *(self.get_candles(market, interval, unit, count) for market in markets),
+            return_exceptions=True
+        )
+        return {
+            market: (result if isinstance(result, list) else None)
+            for market, result in zip(markets, results)
+        }
+
+    async def order_market_buy(self, market, price):
+        """시장가 매수"""
+        query = {
+            'market': market,
+            'side': 'bid',
+            'price': str(price),
+            'ord_type': 'price'
+        }
+        headers = self._get_headers(query)
+        return await self._request('POST', '/v1/orders', 'order', json=query, headers=headers)
+
+    async def order_market_sell(self, market, volume):
+        """시장가 매도"""
+        query = {
+            'market': market,
+            'side': 'ask',
+            'volume': str(volume),
+            'ord_type': 'market'
+        }
+        headers = self._get_headers(query)
+        return await self._request('POST', '/v1/orders', 'order', json=query, headers=headers)
+
+    async def get_current_prices(self, markets):
+        """여러 마켓의 현재가 한번에 조회"""
+        return list((await self.get_tickers_batch(markets)).values())
+
+    async def buy_limit(self, market, price, volume):
+        """지정가 매수"""
+        query = {
+            'market': market,
+            'side': 'bid',
+            'volume': str(volume),
+            'price': str(price),
+            'ord_type': 'limit'
+        }
+        headers = self._get_headers(query)
+        try:
+            return await self._request('POST', '/v1/orders', 'order', json=query, headers=headers)
+        except Exception as e:
+            print(f"지정가 매수 실패: {e}")
+            return None
+
+    async def sell_limit(self, market, price, volume):
+        """지정가 매도"""
+        query = {
+            'market': market,
+            'side': 'ask',
+            'volume': str(volume),
+            'price': str(price),
+            'ord_type': 'limit'
+        }
+        headers = self._get_headers(query)
+        try:
+            return await self._request('POST', '/v1/orders', 'order', json=query, headers=headers)
+        except Exception as e:
+            print(f"지정가 매도 실패: {e}")
+            return None
+
+    async def get_order(self, uuid):
+        """주문 상태 조회"""
+        query = {'uuid': uuid}
+        headers = self._get_headers(query)
+        try:
+            return await self._request('GET', '/v1/order', 'default', params=query, headers=headers)
+        except Exception as e:
+            print(f"주문 조회 실패: {e}")
+            return None
+
+    async def cancel_order(self, uuid):
+        """주문 취소"""
+        query = {'uuid': uuid}
+        headers = self._get_headers(query)
+        try:
+            return await self._request('DELETE', '/v1/order', 'order', params=query, headers=headers)
+        except Exception as e:
+            print(f"주문 취소 실패: {e}")
+            return None
+
+    async def buy_market_order(self, market, krw_amount):
+        """시장가 매수 (wrapper)"""
+        return await self.order_market_buy(market, krw_amount)
+
+    async def sell_market_order(self, market, volume):
+        """시장가 매도 (wrapper)"""
+        return await self.order_market_sell(market, volume)
+
+    async def get_balances(self):
+        """잔고 조회 (wrapper)"""
+        return await self.get_accounts()
+
+
+def fetch_candles_concurrently(markets, unit=1, count=200, interval="minutes"):
+    """동기 코드에서 여러 마켓 캔들을 동시 조회
+
+    Returns:
+        dict: {market: 캔들 리스트 (실패 시 None)}
+    """
+    async def _run():
+        async with AsyncUpbitAPI() as api:
+            return await api.gather_candles(markets, unit, count, interval)
+
+    return asyncio.run(_run())
+
+
+def fetch_candles_multi_unit(markets, units, count=200):
+    """여러 마켓×분봉 단위 캔들을 한 번에 동시 조회
+
+    Returns:
+        dict: {(market, unit): 캔들 리스트 (실패 시 None)}
+    """
+    async def _run():
+        async with AsyncUpbitAPI() as api:
+            per_unit = await asyncio.gather(
+                *(api.gather_candles(markets, unit, count) for unit in units)
+            )
+        return {
+            (market, unit): candles
+            for unit, result in zip(units, per_unit)
+            for market, candles in result.items()
+        }
+
+    return asyncio.run(_run())
@@ -10,8 +10,7 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import time
-import ccxt
+from exchange_provider import get_exchange, fetch_ohlcv_range
 import pytz
 
 
@@ -42,7 +41,7 @@ class FourHourRangeBacktest:
         """바이낸스 데이터 수집 (5분봉 + 4시간봉)"""
         print(f"\n📊 바이낸스 {symbol} {days}일 데이터 수집...")
 
-        exchange = ccxt.binance()
+        exchange = get_exchange('binance')
 
         # 5분봉 데이터 수집
         print("5분봉 데이터 수집 중...")
@@ -72,23 +71,8 @@ class FourHourRangeBacktest:
 
     def _fetch_timeframe(self, exchange, symbol, timeframe, days):
         """특정 타임프레임 데이터 수집"""
-        limit = 1000
         since = exchange.parse8601((datetime.now() - timedelta(days=days)).isoformat())
-        all_ohlcv = []
-
-        while True:
-            try:
-                ohlcv = exchange.fetch_ohlcv(symbol, timeframe, since, limit)
-                if not ohlcv:
-                    break
-                all_ohlcv.extend(ohlcv)
-                since = ohlcv[-1][0] + 1
-                if len(ohlcv) < limit:
-                    break
-                time.sleep(exchange.rateLimit / 1000)
-            except Exception as e:
-                print(f"❌ {e}")
-                break
+        all_ohlcv = fetch_ohlcv_range(exchange, symbol, timeframe, since)
 
         if not all_ohlcv:
             return None
@@ -10,8 +10,7 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import time
-import requests
+from candle_history import fetch_candles_df
 
 
 class FourHourRangeBacktestUpbit:
@@ -58,64 +57,16 @@ class FourHourRangeBacktestUpbit:
 
     def _fetch_upbit_candles(self, market, timeframe, days):
         """업비트 캔들 데이터 수집"""
-        candles_per_request = 200
-        total_candles_needed = (days * 24 * 60) // timeframe
-
-        all_candles = []
-        to_time = None
-
-        while len(all_candles) < total_candles_needed:
-            try:
-                url = f"https://api.upbit.com/v1/candles/minutes/{timeframe}"
-                params = {
-                    'market': market,
-                    'count': candles_per_request
-                }
-                if to_time:
-                    params['to'] = to_time
-
-                response = requests.get(url, params=params)
-                if response.status_code != 200:
-                    print(f"❌ API 에러: {response.status_code}")
-                    break
-
-                candles = response.json()
-                if not candles:
-                    break
-
-                all_candles.extend(candles)
-                to_time = candles[-1]['candle_date_time_kst']
-
-                # API 제한 (초당 10회)
-                time.sleep(0.1)
-
-                if len(candles) < candles_per_request:
-                    break
-
-            except Exception as e:
-                print(f"❌ {e}")
-                break
-
-        if not all_candles:
+        try:
+            # DB에 저장된 구간은 재사용하고 빠진 구간만 조회
+            return fetch_candles_df(
+                market, timeframe, start=datetime.now() - timedelta(days=days),
+                limit=(days * 24 * 60) // timeframe
+            )
+        except Exception as e:
+            print(f"❌ {e}")
             return None
 
-        df = pd.DataFrame(all_candles)
-
-        # 업비트는 최신 데이터가 먼저 오므로 역순 정렬
-        df = df.iloc[::-1].reset_index(drop=True)
-
-        # 필요한 컬럼만 선택하고 rename
-        df_clean = pd.DataFrame({
-            'timestamp': pd.to_datetime(df['candle_date_time_kst']),
-            'open': df['opening_price'],
-            'high': df['high_price'],
-            'low': df['low_price'],
-            'close': df['trade_price'],
-            'volume': df['candle_acc_trade_volume']
-        })
-
-        return df_clean
-
     def get_daily_range(self, df_4h, target_date):
         """해당 날짜의 09:00~13:00 KST 4시간 레인지 찾기"""
         # 09:00 시작하는 240분봉 캔들 찾기
@@ -16,7 +16,7 @@
 - 부분 익절: +1.5% (50%), +3% (나머지)
 """
 import os
-import ccxt
+from exchange_provider import get_exchange
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -71,7 +71,7 @@ class Binance20_200Bot:
             initial_balance_usdt: 초기 자본 (USDT)
         """
         # 바이낸스 API
-        self.exchange = ccxt.binance({
+        self.exchange = get_exchange('binance', {
             'apiKey': api_key or os.getenv('BINANCE_API_KEY'),
             'secret': api_secret or os.getenv('BINANCE_API_SECRET'),
             'enableRateLimit': True,
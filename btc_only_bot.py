@@ -7,6 +7,7 @@ import os
 import time
 from datetime import datetime
 from upbit_api import UpbitAPI
+from order_tracker import OrderTracker
 from config import get_config
 
 
@@ -64,6 +65,7 @@ class BitcoinOnlyBot:
 
     def __init__(self, upbit, telegram):
         self.upbit = upbit
+        self.order_tracker = OrderTracker(upbit)
         self.telegram = telegram
         self.market = "KRW-BTC"
 
@@ -266,19 +268,11 @@ class BitcoinOnlyBot:
             result = self.upbit.order_market_buy(self.market, invest_krw)
 
             if result and 'uuid' in result:
-                time.sleep(0.5)
-                order_info = self.upbit.get_order(result['uuid'])
-
-                if order_info and float(order_info.get('executed_volume', 0)) > 0:
-                    trades = order_info.get('trades', [])
-                    if trades:
-                        total_funds = sum(float(t['funds']) for t in trades)
-                        total_volume = sum(float(t['volume']) for t in trades)
-                        executed_price = total_funds / total_volume
-                        amount = total_volume
-                    else:
-                        executed_price = float(order_info.get('avg_price', 0))
-                        amount = float(order_info.get('executed_volume', 0))
+                fill = self.order_tracker.wait(result['uuid'], timeout=10)
+
+                if fill['filled'] and fill['avg_price']:
+                    executed_price = fill['avg_price']
+                    amount = fill['executed_volume']
 
                     self.position = {
                         'market': self.market,
@@ -0,0 +1,395 @@
+"""
+체결 → 분봉 집계기
+REST로 한 번 채운 뒤에는 체결(WebSocket trade 또는 /v1/trades/ticks 폴링)만으로
+마켓별 1/5/15/60/240분봉을 링 버퍼에서 갱신합니다.
+
+- 봉 시작 시각은 UTC epoch ms 기준 unit 배수 (업비트 분봉 경계와 동일, 240분봉 = 09/13/17시 KST ...)
+- 체결이 없는 분은 업비트처럼 봉을 만들지 않음
+- sequential_id로 중복 체결 제거, REST 시드에 이미 포함된 체결은 무시
+- 끊긴 구간 보충 체결은 봉의 첫/마지막 체결 시각과 비교해 시가/종가를 판단 (늦게 받은 과거 체결이 종가를 덮지 않음)
+
+사용 예:
+    aggregator = CandleAggregator(upbit)
+    aggregator.seed('KRW-BTC')
+    ws = UpbitWebSocketClient(on_message=aggregator.handle_message, on_gap=aggregator.handle_gap)
+    ws.subscribe('trade', ['KRW-BTC'])
+    ws.start()
+    candles = aggregator.get_candles('KRW-BTC', 15, 50)  # 업비트 응답 형식 (최신순)
+"""
+import threading
+import numpy as np
+from candle_decoder import decode_candles, to_dataframe, CANDLE_COLUMNS, KST_OFFSET_MS
+
+DEFAULT_UNITS = (1, 5, 15, 60, 240)
+TICKS_PAGE = 500     # /v1/trades/ticks 최대 조회 개수
+GAP_MAX_PAGES = 10   # 끊긴 구간 보충 시 과거 방향 최대 페이지 수
+
+
+def _format_ms(ts_ms):
+    """epoch ms → 'YYYY-MM-DDTHH:MM:SS' (업비트 candle_date_time 형식)"""
+    return str(np.datetime64(int(ts_ms), 'ms').astype('datetime64[s]'))
+
+
+class CandleRing:
+    """고정 크기 분봉 링 버퍼 (시간 오름차순, 오래된 봉부터 덮어씀)"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((capacity, 5), dtype=np.float64)  # open, high, low, close, volume
+        self.first_ms = np.zeros(capacity, dtype=np.int64)  # 봉에 반영된 첫 체결 시각
+        self.last_ms = np.zeros(capacity, dtype=np.int64)   # 봉에 반영된 마지막 체결 시각
+        self.size = 0
+        self.cutoff_ms = 0  # 이 시각까지의 체결은 이미 반영됨 (REST 시드)
+        self._end = 0  # 다음에 쓸 위치
+
+    @property
+    def last_ts(self):
+        return self.ts[self._end - 1] if self.size else None
+
+    def _index(self):
+        """버퍼 위치 (시간 오름차순)"""
+        return (np.arange(self._end - self.size, self._end)) % self.capacity
+
+    def append(self, ts, open_, high, low, close, volume, trade_ms=None):
+        """새 봉 추가
+
+        Args:
+            trade_ms: 봉을 연 체결 시각 (None이면 봉 시작 시각 - REST 시드)
+        """
+        self.ts[self._end] = ts
+        self.values[self._end] = (open_, high, low, close, volume)
+        self.first_ms[self._end] = self.last_ms[self._end] = ts if trade_ms is None else trade_ms
+        self._end = (self._end + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def update_last(self, price, volume, trade_ms):
+        """마지막 봉에 체결 반영"""
+        row = self.values[self._end - 1]
+        if price > row[1]:
+            row[1] = price
+        if price < row[2]:
+            row[2] = price
+        row[3] = price
+        row[4] += volume
+        self.last_ms[self._end - 1] = max(self.last_ms[self._end - 1], trade_ms)
+
+    def merge(self, ts, price, volume, trade_ms):
+        """끊긴 구간 보충 체결 반영
+
+        고가/저가/거래량은 항상 반영하고, 시가는 봉의 첫 체결보다 이를 때만,
+        종가는 마지막 체결보다 늦을 때만 바꿈. 해당 봉이 없으면 시간 순서 자리에 새로 만듦.
+
+        Returns:
+            bool: 반영 여부 (버퍼가 가득 찼고 가장 오래된 봉보다 이전이면 False)
+        """
+        index = self._index()
+        found = np.nonzero(self.ts[index] == ts)[0]
+        if len(found):
+            i = index[found[0]]
+            row = self.values[i]
+            row[1] = max(row[1], price)
+            row[2] = min(row[2], price)
+            row[4] += volume
+            if trade_ms < self.first_ms[i]:
+                row[0] = price
+                self.first_ms[i] = trade_ms
+            if trade_ms >= self.last_ms[i]:
+                row[3] = price
+                self.last_ms[i] = trade_ms
+            return True
+
+        if not self.size or ts > self.last_ts:
+            self.append(ts, price, price, price, price, volume, trade_ms)
+            return True
+
+        # 중간에 빠진 봉 - 시간 순서대로 다시 채움 (가득 찼으면 가장 오래된 봉을 버림)
+        position = int(np.searchsorted(self.ts[index], ts))
+        if self.size == self.capacity:
+            if position == 0:
+                return False
+            index = index[1:]
+            position -= 1
+        ts_new = np.insert(self.ts[index], position, ts)
+        values_new = np.insert(self.values[index], position, (price, price, price, price, volume), axis=0)
+        first_new = np.insert(self.first_ms[index], position, trade_ms)
+        last_new = np.insert(self.last_ms[index], position, trade_ms)
+
+        size = len(ts_new)
+        self.ts[:size] = ts_new
+        self.values[:size] = values_new
+        self.first_ms[:size] = first_new
+        self.last_ms[:size] = last_new
+        self.size = size
+        self._end = size % self.capacity
+        return True
+
+    def update_at(self, ts, price, volume):
+        """지나간 봉에 늦게 도착한 체결 반영 (고가/저가/거래량만)
+
+        Returns:
+            bool: 해당 봉이 버퍼에 있었는지
+        """
+        index = self._index()
+        found = np.nonzero(self.ts[index] == ts)[0]
+        if not len(found):
+            return False
+        row = self.values[index[found[0]]]
+        row[1] = max(row[1], price)
+        row[2] = min(row[2], price)
+        row[4] += volume
+        return True
+
+    def columns(self, count=None):
+        """최근 count개 봉 → 시간 오름차순 컬럼 (복사본)"""
+        count = self.size if count is None else min(count, self.size)
+        index = (np.arange(self._end - count, self._end)) % self.capacity
+        values = self.values[index]
+        return {
+            'ts': self.ts[index],
+            'open': values[:, 0],
+            'high': values[:, 1],
+            'low': values[:, 2],
+            'close': values[:, 3],
+            'volume': values[:, 4],
+        }
+
+
+class CandleAggregator:
+    """마켓별 실시간 분봉 집계기 (스레드 안전)"""
+
+    def __init__(self, upbit, units=DEFAULT_UNITS, capacity=200):
+        """
+        Args:
+            upbit: UpbitAPI (시드/체결 폴링용)
+            units: 유지할 분봉 단위
+            capacity: 단위별 보관 봉 개수
+        """
+        self.upbit = upbit
+        self.units = tuple(units)
+        self.capacity = capacity
+
+        self._lock = threading.Lock()
+        self._rings = {}     # {(market, unit): CandleRing}
+        self._last_seq = {}  # {market: 마지막 반영 sequential_id}
+        self._seeded = set()
+
+        self.stats = {'trades': 0, 'duplicates': 0, 'late': 0, 'seed_requests': 0, 'poll_requests': 0,
+                      'missed': 0}  # missed: 끝까지 보충하지 못한 끊김/폴링 구간 수
+
+    # === 시드 ===
+
+    def seed(self, market):
+        """REST 분봉으로 링 버퍼 초기화 (마켓당 1회)"""
+        rings = {}
+        for unit in self.units:
+            candles = self.upbit.get_candles(market, "minutes", unit, self.capacity)
+            self.stats['seed_requests'] += 1
+            columns = decode_candles(candles)
+            if columns is None:
+                raise ValueError(f"캔들 시드 실패 ({market}, {unit}분): {candles}")
+
+            ring = CandleRing(self.capacity)
+            for i in range(len(columns['ts'])):
+                ring.append(*(columns[key][i] for key in CANDLE_COLUMNS))
+            # 응답 timestamp = 최신 봉의 마지막 체결 시각
+            ring.cutoff_ms = candles[0].get('timestamp', 0)
+            rings[unit] = ring
+
+        with self._lock:
+            for unit, ring in rings.items():
+                self._rings[(market, unit)] = ring
+            self._seeded.add(market)
+            self._last_seq.pop(market, None)
+
+    def is_seeded(self, market):
+        return market in self._seeded
+
+    # === 체결 반영 ===
+
+    def add_trade(self, market, price, volume, ts_ms, seq=None, backfill=False):
+        """체결 1건 반영
+
+        Args:
+            backfill: 끊긴 구간 보충 (sequential_id 순서 검사 생략, 시가/종가는 체결 시각으로 판단)
+
+        Returns:
+            bool: 반영 여부 (중복/시드 이전 체결이면 False)
+        """
+        with self._lock:
+            if market not in self._seeded:
+                return False
+
+            last_seq = self._last_seq.get(market)
+            if not backfill:
+                if seq is not None and last_seq is not None and seq <= last_seq:
+                    self.stats['duplicates'] += 1
+                    return False
+                if seq is not None:
+                    self._last_seq[market] = seq
+
+            applied = late = False
+            for unit in self.units:
+                ring = self._rings[(market, unit)]
+                if ts_ms <= ring.cutoff_ms:
+                    continue
+                applied = True
+                bar_ts = ts_ms - ts_ms % (unit * 60_000)
+                last_ts = ring.last_ts
+
+                if backfill:
+                    ring.merge(bar_ts, price, volume, ts_ms)
+                elif last_ts is None or bar_ts > last_ts:
+                    ring.append(bar_ts, price, price, price, price, volume, ts_ms)
+                elif bar_ts == last_ts:
+                    ring.update_last(price, volume, ts_ms)
+                else:
+                    ring.update_at(bar_ts, price, volume)
+                    late = True
+
+            if not applied:
+                self.stats['duplicates'] += 1
+                return False
+            if late:
+                self.stats['late'] += 1
+            self.stats['trades'] += 1
+            return True
+
+    def handle_message(self, message):
+        """UpbitWebSocketClient on_message 콜백 (trade 메시지만 사용)"""
+        if message.get('type') != 'trade':
+            return
+        self.add_trade(
+            message['code'],
+            message['trade_price'],
+            message['trade_volume'],
+            message['trade_timestamp'],
+            message.get('sequential_id')
+        )
+
+    def _fetch_ticks(self, market, reached, max_pages, count=TICKS_PAGE):
+        """최신 체결부터 cursor로 과거 방향 페이지 조회
+
+        Args:
+            reached: fn(가장 오래된 체결) - 참이면 필요한 구간까지 받은 것
+            max_pages: 최대 페이지 수
+
+        Returns:
+            (list, bool): (체결 목록, 필요한 구간을 다 받았는지)
+        """
+        ticks = []
+        cursor = None
+        for _ in range(max_pages):
+            page = self.upbit.get_trades_ticks(market, count, cursor=cursor)
+            self.stats['poll_requests'] += 1
+            if not isinstance(page, list):
+                return ticks, False
+            ticks.extend(page)
+            if len(page) < count:
+                return ticks, True  # 더 과거 체결 없음
+            oldest = min(page, key=lambda t: t['sequential_id'])
+            if reached(oldest):
+                return ticks, True
+            cursor = oldest['sequential_id']
+        return ticks, False
+
+    def handle_gap(self, gap):
+        """UpbitWebSocketClient on_gap 콜백 - 끊긴 동안의 체결을 REST로 보충"""
+        if gap.get('type') != 'trade':
+            return
+        try:
+            ticks, complete = self._fetch_ticks(
+                gap['code'], lambda t: t['timestamp'] <= gap['from_ms'], GAP_MAX_PAGES
+            )
+        except Exception as e:
+            print(f"⚠️ 체결 보충 실패 ({gap['code']}): {e}")
+            return
+        if not complete:
+            self.stats['missed'] += 1
+            print(f"⚠️ 체결 보충 불완전 ({gap['code']}) - {len(ticks)}건까지만 반영")
+
+        # gap 양 끝 체결은 이미 받았으므로 사이 구간만 반영
+        for tick in sorted(ticks, key=lambda t: t['sequential_id']):
+            if gap['from_ms'] < tick['timestamp'] < gap['to_ms']:
+                self.add_trade(gap['code'], tick['trade_price'], tick['trade_volume'],
+                               tick['timestamp'], tick['sequential_id'], backfill=True)
+
+    def poll_trades(self, market, count=200, max_pages=5):
+        """/v1/trades/ticks 폴링으로 새 체결 반영 (WebSocket 미사용 시)
+
+        응답의 가장 오래된 체결이 아직 마지막 반영 체결보다 새로우면
+        그 사이 체결이 빠진 것이므로 cursor로 과거 페이지를 더 조회
+
+        Args:
+            count: 페이지당 체결 개수 (최대 500)
+            max_pages: 최대 페이지 수 (다 못 채우면 stats['missed'] 증가)
+
+        Returns:
+            int: 반영된 체결 수
+        """
+        with self._lock:
+            last_seq = self._last_seq.get(market)
+            cutoff_ms = min((self._rings[(market, unit)].cutoff_ms for unit in self.units
+                             if (market, unit) in self._rings), default=None)
+        if last_seq is not None:
+            reached = lambda t: t['sequential_id'] <= last_seq
+        elif cutoff_ms is not None:
+            reached = lambda t: t['timestamp'] <= cutoff_ms  # 시드 직후: 시드 시점까지
+        else:
+            reached = lambda t: True
+
+        ticks, complete = self._fetch_ticks(market, reached, max_pages, count)
+        if not ticks:
+            return 0
+        if not complete:
+            self.stats['missed'] += 1
+            print(f"⚠️ 체결 폴링 누락 가능 ({market}) - 폴링 간격을 줄이거나 count를 늘리세요")
+
+        # 응답은 최신순 → 오래된 체결부터 반영
+        applied = 0
+        for tick in sorted(ticks, key=lambda t: t['sequential_id']):
+            applied += self.add_trade(
+                market, tick['trade_price'], tick['trade_volume'],
+                tick['timestamp'], tick['sequential_id']
+            )
+        return applied
+
+    # === 조회 ===
+
+    def get_columns(self, market, unit, count=None):
+        """시간 오름차순 컬럼 (candle_decoder 형식) 또는 None"""
+        with self._lock:
+            ring = self._rings.get((market, unit))
+            if ring is None or not ring.size:
+                return None
+            return ring.columns(count)
+
+    def get_dataframe(self, market, unit, count=None):
+        """DataFrame (timestamp[KST], open, high, low, close, volume) 또는 None"""
+        return to_dataframe(self.get_columns(market, unit, count))
+
+    def get_candles(self, market, unit, count=200):
+        """업비트 캔들 응답과 같은 형식 (최신순 dict 리스트)
+
+        Returns:
+            list 또는 None (시드 전이거나 봉이 count개 미만)
+        """
+        columns = self.get_columns(market, unit, count)
+        if columns is None or len(columns['ts']) < count:
+            return None
+
+        candles = []
+        for i in range(len(columns['ts']) - 1, -1, -1):
+            ts = int(columns['ts'][i])
+            candles.append({
+                'market': market,
+                'candle_date_time_utc': _format_ms(ts),
+                'candle_date_time_kst': _format_ms(ts + KST_OFFSET_MS),
+                'opening_price': float(columns['open'][i]),
+                'high_price': float(columns['high'][i]),
+                'low_price': float(columns['low'][i]),
+                'trade_price': float(columns['close'][i]),
+                'candle_acc_trade_volume': float(columns['volume'][i]),
+                'unit': unit,
+            })
+        return candles
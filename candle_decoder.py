@@ -0,0 +1,121 @@
+"""
+업비트 캔들 응답 디코더
+list-of-dict 응답을 한 번의 순회로 시간 오름차순 NumPy 컬럼에 채워 넣습니다.
+
+컬럼:
+- ts: 캔들 시작 시각 (UTC epoch ms, int64)
+- open/high/low/close/volume: float64
+"""
+from operator import itemgetter
+import numpy as np
+import pandas as pd
+
+# KST = UTC + 9시간 (밀리초)
+KST_OFFSET_MS = 9 * 60 * 60 * 1000
+
+CANDLE_COLUMNS = ('ts', 'open', 'high', 'low', 'close', 'volume')
+
+# DB 행 (ts, open, high, low, close, volume)
+_ROW_DTYPE = np.dtype([('ts', np.int64)] + [(name, np.float64) for name in CANDLE_COLUMNS[1:]])
+
+_PRICE_FIELDS = itemgetter(
+    'opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume'
+)
+
+
+def decode_candles(candles):
+    """캔들 응답(최신순) → 시간 오름차순 컬럼
+
+    Args:
+        candles: 업비트 캔들 API 응답 리스트
+
+    Returns:
+        dict: {'ts', 'open', 'high', 'low', 'close', 'volume'} 또는 None (빈 응답/에러 응답)
+    """
+    if not isinstance(candles, list) or not candles:
+        return None
+
+    n = len(candles)
+    ts = np.empty(n, dtype='datetime64[ms]')
+    values = np.empty((n, 5), dtype=np.float64)
+
+    # 응답은 최신순이므로 뒤에서부터 채움
+    for j, candle in zip(range(n - 1, -1, -1), candles):
+        ts[j] = candle['candle_date_time_utc']
+        values[j] = _PRICE_FIELDS(candle)
+
+    return {
+        'ts': ts.view(np.int64),
+        'open': values[:, 0],
+        'high': values[:, 1],
+        'low': values[:, 2],
+        'close': values[:, 3],
+        'volume': values[:, 4],
+    }
+
+
+def decode_rows(rows):
+    """DB 조회 결과 행 → 컬럼
+
+    Args:
+        rows: 시간 오름차순 (timestamp, open, high, low, close, volume) 행 리스트
+              timestamp는 UTC epoch ms 정수, KST 시각 문자열 또는 KST datetime
+    """
+    if not rows:
+        return None
+
+    if isinstance(rows[0][0], (int, np.integer)):
+        # v2 스키마 (정수 epoch): 행 튜플을 구조화 배열로 한 번에 변환
+        table = np.array(rows, dtype=_ROW_DTYPE)
+        return {key: np.ascontiguousarray(table[key]) for key in CANDLE_COLUMNS}
+
+    # v1 스키마: KST 시각 문자열 또는 datetime
+    timestamps = [row[0] for row in rows]
+    ts = np.array(timestamps, dtype='datetime64[ms]').view(np.int64) - KST_OFFSET_MS
+
+    values = np.array([row[1:6] for row in rows], dtype=np.float64)
+    return {
+        'ts': ts,
+        'open': values[:, 0],
+        'high': values[:, 1],
+        'low': values[:, 2],
+        'close': values[:, 3],
+        'volume': values[:, 4],
+    }
+
+
+def concat_columns(chunks):
+    """시간 오름차순 컬럼 청크들을 하나로 연결"""
+    chunks = [c for c in chunks if c is not None]
+    if not chunks:
+        return None
+    return {key: np.concatenate([c[key] for c in chunks]) for key in CANDLE_COLUMNS}
+
+
+def kst_datetimes(ts):
+    """UTC epoch ms → KST naive datetime64[ns] (문자열 파싱 없음)"""
+    return (ts + KST_OFFSET_MS).astype('datetime64[ms]').astype('datetime64[ns]')
+
+
+def to_dataframe(columns):
+    """컬럼 → 기존 봇/백테스트 형식 DataFrame
+
+    Returns:
+        DataFrame (timestamp[KST], open, high, low, close, volume) 또는 None
+    """
+    if columns is None:
+        return None
+
+    return pd.DataFrame({
+        'timestamp': kst_datetimes(columns['ts']),
+        'open': columns['open'],
+        'high': columns['high'],
+        'low': columns['low'],
+        'close': columns['close'],
+        'volume': columns['volume'],
+    })
+
+
+def candles_to_dataframe(candles):
+    """캔들 응답 → DataFrame (시간 오름차순)"""
+    return to_dataframe(decode_candles(candles))
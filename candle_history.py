@@ -0,0 +1,194 @@
+"""
+과거 캔들 읽기 캐시 (백테스트 데이터 수집용)
+DatabaseManager에 저장된 캔들(DataCollector 수집분 포함)을 먼저 읽고, 빠진 구간만
+업비트에서 받아 DB에 저장한 뒤 합쳐서 반환합니다.
+기간이 겹치는 백테스트를 반복 실행하면 네트워크 요청이 거의 없습니다.
+
+- 빠진 구간: 요청 범위에서 봉 간격이 끊긴 곳 - 이미 거래소에서 받은 구간(candle_coverage)
+  (거래가 없어 봉이 없는 구간을 매번 다시 받지 않음)
+- 가까운 빈 구간은 한 페이지 안에서 하나로 합쳐 요청 수를 줄임
+- 진행 중인 봉은 저장하지 않음 (범위 끝은 현재 봉 시작 시각)
+
+사용 예:
+    history = get_candle_history()
+    df = history.get_range('KRW-BTC', 5, start=datetime.now() - timedelta(days=90))
+"""
+import os
+import threading
+import time
+from datetime import datetime, timezone
+import numpy as np
+from candle_decoder import KST_OFFSET_MS, concat_columns, to_dataframe
+from database_manager import DatabaseManager, to_epoch_ms
+from upbit_api import UpbitAPI
+
+
+def _kst_datetime(ts_ms):
+    """UTC epoch ms → KST naive datetime (UpbitAPI.iter_candles 경계 형식)"""
+    return datetime.fromtimestamp((ts_ms + KST_OFFSET_MS) / 1000, timezone.utc).replace(tzinfo=None)
+
+
+def _subtract(intervals, covered):
+    """구간 목록에서 covered 구간들을 뺀 나머지"""
+    result = []
+    for lo, hi in intervals:
+        for c_lo, c_hi in covered:
+            if c_hi <= lo or c_lo >= hi:
+                continue
+            if c_lo > lo:
+                result.append((lo, c_lo))
+            lo = max(lo, c_hi)
+            if lo >= hi:
+                break
+        if lo < hi:
+            result.append((lo, hi))
+    return result
+
+
+def missing_intervals(ts, start, end, step, covered=(), merge_gap=0):
+    """[start, end) 범위에서 봉이 빠진 구간
+
+    Args:
+        ts: 저장된 봉 시각 (UTC epoch ms, 오름차순, 범위 안)
+        start/end: 봉 간격에 맞춘 범위
+        step: 봉 간격 (ms)
+        covered: 이미 거래소에서 받은 구간 [(start, end), ...] (제외)
+        merge_gap: 이 간격(ms) 이하로 떨어진 빈 구간은 하나로 합침
+
+    Returns:
+        list: [(start, end), ...] UTC epoch ms
+    """
+    ts = np.asarray(ts, dtype=np.int64)
+    prev = np.concatenate(([start - step], ts))
+    nxt = np.concatenate((ts, [end]))
+    hole = nxt - prev > step
+    gaps = _subtract(list(zip((prev[hole] + step).tolist(), nxt[hole].tolist())), covered)
+
+    merged = []
+    for lo, hi in gaps:
+        if merged and lo - merged[-1][1] <= merge_gap:
+            merged[-1] = (merged[-1][0], hi)
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+class CandleHistory:
+    """DB 우선 과거 분봉 조회 (빠진 구간만 거래소에서 받아 저장)"""
+
+    def __init__(self, db, upbit=None):
+        """
+        Args:
+            db: DatabaseManager
+            upbit: UpbitAPI (None이면 공개 API 전용 인스턴스)
+        """
+        self.db = db
+        self.upbit = upbit or UpbitAPI(None, None)
+        self._lock = threading.Lock()
+        self.stats = {'queries': 0, 'cached_bars': 0, 'fetched_bars': 0, 'fetched_intervals': 0,
+                      'fetch_errors': 0}
+
+    def get_range(self, market, unit, start, end=None, limit=None, as_frame=True):
+        """분봉 구간 조회
+
+        Args:
+            market: 마켓 (KRW-BTC 등)
+            unit: 분봉 단위
+            start: 시작 (KST datetime 또는 epoch ms, 포함)
+            end: 끝 (제외, None이면 현재 진행 중인 봉 전까지)
+            limit: 최근 N개만 (범위 시작을 그만큼 당김)
+            as_frame: True면 DataFrame (timestamp[KST], open ... volume), False면 컬럼 dict
+
+        Returns:
+            시간 오름차순 DataFrame/컬럼 또는 None
+        """
+        timeframe = f"{unit}m"
+        step = unit * 60 * 1000
+        now_bar = int(time.time() * 1000) // step * step
+
+        # 봉 간격에 맞춤 (start는 올림, end는 내림)
+        start_ms = -(-to_epoch_ms(start) // step) * step
+        end_ms = min(now_bar, to_epoch_ms(end) // step * step if end is not None else now_bar)
+        if limit:
+            start_ms = max(start_ms, end_ms - limit * step)
+        if start_ms >= end_ms:
+            return None
+
+        with self._lock:
+            self.stats['queries'] += 1
+            stored = self.db.query_candles(market, timeframe, start=start_ms, end=end_ms)
+            stored_ts = stored['ts'] if stored is not None else ()
+            self.stats['cached_bars'] += len(stored_ts)
+
+            gaps = missing_intervals(
+                stored_ts, start_ms, end_ms, step,
+                covered=self.db.get_candle_coverage(market, timeframe),
+                merge_gap=UpbitAPI.CANDLE_PAGE_SIZE * step
+            )
+            for lo, hi in gaps:
+                self._fetch_interval(market, unit, timeframe, lo, hi)
+
+        if gaps:
+            return self.db.query_candles(market, timeframe, start=start_ms, end=end_ms, as_frame=as_frame)
+        return to_dataframe(stored) if as_frame else stored
+
+    def _fetch_interval(self, market, unit, timeframe, lo, hi):
+        """[lo, hi) 구간을 거래소에서 받아 저장하고 수집 구간으로 기록"""
+        try:
+            chunks = list(self.upbit.iter_candles(
+                market, unit, start=_kst_datetime(lo), end=_kst_datetime(hi), as_arrays=True
+            ))
+        except Exception as e:
+            print(f"⚠️ 캔들 조회 실패 ({market} {timeframe} {_kst_datetime(lo)} ~ {_kst_datetime(hi)}): {e}")
+            self.stats['fetch_errors'] += 1
+            return
+
+        # 페이지는 최신 → 과거 순이므로 뒤집어서 연결
+        chunks.reverse()
+        columns = concat_columns(chunks)
+        if columns is not None:
+            inside = (columns['ts'] >= lo) & (columns['ts'] < hi)
+            columns = {key: values[inside] for key, values in columns.items()}
+            result = self.db.ingest_candle_columns(market, timeframe, columns)
+            if result['errors']:
+                # 저장이 일부 실패한 구간은 다음에 다시 받도록 기록하지 않음
+                self.stats['fetch_errors'] += 1
+                return
+            self.stats['fetched_bars'] += int(inside.sum())
+
+        self.stats['fetched_intervals'] += 1
+        self.db.add_candle_coverage(market, timeframe, lo, hi)
+
+
+_shared_history = None
+_shared_lock = threading.Lock()
+
+
+def get_candle_history():
+    """프로세스 전역 CandleHistory (DB는 USE_ORACLE_DB 설정에 따라, 열 수 없으면 None)"""
+    global _shared_history
+    with _shared_lock:
+        if _shared_history is None:
+            try:
+                use_oracle = os.environ.get('USE_ORACLE_DB', 'false').lower() == 'true'
+                _shared_history = CandleHistory(DatabaseManager(use_oracle=use_oracle))
+            except Exception as e:
+                print(f"⚠️ 캔들 DB 사용 불가, 거래소에서 직접 조회: {e}")
+                return None
+        return _shared_history
+
+
+def fetch_candles_df(market, unit, start, limit=None):
+    """백테스트용 분봉 DataFrame (DB 읽기 캐시, DB를 못 쓰면 거래소 직접 조회)
+
+    Args:
+        start: 시작 KST datetime
+        limit: 최근 N개만
+
+    Returns:
+        DataFrame (timestamp, open, high, low, close, volume) 또는 None
+    """
+    history = get_candle_history()
+    if history is None:
+        return UpbitAPI(None, None).get_candles_range_df(market, unit, start=start, limit=limit)
+    return history.get_range(market, unit, start, limit=limit)
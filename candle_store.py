@@ -0,0 +1,291 @@
+"""
+컬럼형 캔들 저장소 (백테스트용)
+마켓/타임프레임/월 단위 세그먼트에 컬럼별 .npy 파일로 저장하고 메모리 맵으로 읽습니다.
+매번 거래소에서 다시 받거나 CSV를 다시 파싱하지 않아도 1년치 1분봉을 수 ms에 열 수 있습니다.
+
+구조:
+    {CANDLE_STORE_DIR}/{market}/{timeframe}/{YYYY-MM}/{ts,open,high,low,close,volume}.npy
+    - ts: 봉 시작 UTC epoch ms (int64), 월 구분도 UTC 기준
+    - 나머지: float64
+    - 추가 전용: 저장된 마지막 봉보다 새로운 봉만 뒤에 붙임
+      (저장된 첫 봉보다 오래된 구간은 prepend로 앞에 채움 - 첫 달 세그먼트만 다시 씀)
+
+- 읽기는 np.load(mmap_mode='r') → 복사 없음, 여러 백테스트 프로세스가 같은 페이지 캐시를 공유
+- 쓰기 프로세스는 하나만 (데이터 수집/다운로드 스크립트)
+
+사용 예:
+    store = CandleStore()
+    store.append('KRW-BTC', '1m', columns)                 # candle_decoder 컬럼
+    columns = store.load('KRW-BTC', '1m', start=since_ms)  # 시간 오름차순 컬럼
+    df = store.load('KRW-BTC', '1m', as_frame=True)
+"""
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+import numpy as np
+from candle_decoder import CANDLE_COLUMNS, concat_columns, to_dataframe
+
+CANDLE_STORE_DIR = os.getenv(
+    'CANDLE_STORE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'crypto_trading', 'candles')
+)
+
+_DTYPES = {name: np.dtype('<i8') if name == 'ts' else np.dtype('<f8') for name in CANDLE_COLUMNS}
+
+
+def _month_key(ts_ms):
+    return datetime.fromtimestamp(ts_ms / 1000, timezone.utc).strftime('%Y-%m')
+
+
+def _month_range(key):
+    """'YYYY-MM' → [월 시작, 다음 달 시작) UTC epoch ms"""
+    year, month = map(int, key.split('-'))
+    start = datetime(year, month, 1, tzinfo=timezone.utc)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+    return int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+
+
+def _read_header(f):
+    if np.lib.format.read_magic(f) == (1, 0):
+        shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+    return shape[0], dtype, f.tell()
+
+
+def _append_npy(path, values, rows):
+    """1차원 .npy 파일의 rows번째 행 뒤에 values를 쓰고 헤더의 길이를 갱신
+
+    rows 뒤에 남은 바이트(중단된 이전 추가분)는 잘라냅니다.
+    """
+    if not os.path.exists(path):
+        np.save(path, values)
+        return
+
+    with open(path, 'r+b') as f:
+        _, dtype, offset = _read_header(f)
+        f.seek(offset + rows * dtype.itemsize)
+        f.write(values.astype(dtype, copy=False).tobytes())
+        f.truncate()
+
+        # 헤더는 64바이트 단위로 패딩되어 있어 길이 숫자가 늘어도 크기가 같음
+        f.seek(0)
+        np.lib.format.write_array_header_1_0(
+            f, {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False,
+                'shape': (rows + len(values),)}
+        )
+        if f.tell() != offset:
+            raise ValueError(f"npy 헤더 크기 변경: {path}")
+
+
+class CandleStore:
+    """마켓/타임프레임/월 세그먼트 컬럼 저장소 (메모리 맵 읽기 + 추가 전용 쓰기)"""
+
+    def __init__(self, root=None):
+        """
+        Args:
+            root: 저장 경로 (기본 CANDLE_STORE_DIR)
+        """
+        self.root = root or CANDLE_STORE_DIR
+        self._lock = threading.Lock()
+
+    def _dir(self, market, timeframe, month=None):
+        path = os.path.join(self.root, market, str(timeframe))
+        return os.path.join(path, month) if month else path
+
+    def months(self, market, timeframe):
+        """저장된 월 세그먼트 목록 (오름차순 'YYYY-MM')"""
+        try:
+            return sorted(name for name in os.listdir(self._dir(market, timeframe)) if len(name) == 7)
+        except FileNotFoundError:
+            return []
+
+    def _segment_rows(self, segment):
+        """세그먼트 행 수 (컬럼 길이가 다르면 중단된 추가 → 가장 짧은 길이)"""
+        rows = None
+        for name in CANDLE_COLUMNS:
+            try:
+                with open(os.path.join(segment, f"{name}.npy"), 'rb') as f:
+                    n, _, _ = _read_header(f)
+            except FileNotFoundError:
+                return 0
+            rows = n if rows is None else min(rows, n)
+        return rows or 0
+
+    def _open_segment(self, market, timeframe, month):
+        """세그먼트 컬럼을 메모리 맵으로 열기 (복사 없음)"""
+        segment = self._dir(market, timeframe, month)
+        rows = self._segment_rows(segment)
+        if rows == 0:
+            return None
+        return {
+            name: np.load(os.path.join(segment, f"{name}.npy"), mmap_mode='r')[:rows]
+            for name in CANDLE_COLUMNS
+        }
+
+    def last_ts(self, market, timeframe):
+        """저장된 마지막 봉 시각 (UTC epoch ms, 없으면 None)"""
+        for month in reversed(self.months(market, timeframe)):
+            columns = self._open_segment(market, timeframe, month)
+            if columns is not None:
+                return int(columns['ts'][-1])
+        return None
+
+    def first_ts(self, market, timeframe):
+        """저장된 첫 봉 시각 (UTC epoch ms, 없으면 None)"""
+        for month in self.months(market, timeframe):
+            columns = self._open_segment(market, timeframe, month)
+            if columns is not None:
+                return int(columns['ts'][0])
+        return None
+
+    def append(self, market, timeframe, columns):
+        """봉 추가 (저장된 마지막 봉 이후만)
+
+        Args:
+            columns: candle_decoder 형식 컬럼 dict (ts 순서/중복 무관)
+
+        Returns:
+            int: 추가된 봉 수
+        """
+        if columns is None or len(columns['ts']) == 0:
+            return 0
+
+        ts, index = np.unique(np.asarray(columns['ts'], dtype=np.int64), return_index=True)
+        with self._lock:
+            last = self.last_ts(market, timeframe)
+            if last is not None:
+                keep = ts > last
+                ts, index = ts[keep], index[keep]
+            if len(ts) == 0:
+                return 0
+
+            for month in self._split_months(ts):
+                lo, hi = _month_range(month)
+                mask = (ts >= lo) & (ts < hi)
+                if not mask.any():
+                    continue
+                segment = self._dir(market, timeframe, month)
+                os.makedirs(segment, exist_ok=True)
+                rows = self._segment_rows(segment)
+                # ts를 마지막에 써서 중단되더라도 ts 길이가 가격 컬럼보다 길어지지 않게 함
+                for name in CANDLE_COLUMNS[1:] + ('ts',):
+                    values = ts[mask] if name == 'ts' else np.asarray(columns[name])[index[mask]]
+                    _append_npy(os.path.join(segment, f"{name}.npy"),
+                                np.ascontiguousarray(values, dtype=_DTYPES[name]), rows)
+        return len(ts)
+
+    def prepend(self, market, timeframe, columns):
+        """저장된 첫 봉보다 오래된 봉을 앞에 채움 (다운로드 시작일을 앞당긴 경우)
+
+        저장된 첫 달 세그먼트는 임시 디렉터리에 합쳐 쓴 뒤 디렉터리째 교체하므로
+        중단되어도 기존 세그먼트의 컬럼이 서로 어긋나지 않습니다.
+
+        Returns:
+            int: 추가된 봉 수
+        """
+        if columns is None or len(columns['ts']) == 0:
+            return 0
+
+        ts, index = np.unique(np.asarray(columns['ts'], dtype=np.int64), return_index=True)
+        with self._lock:
+            first = self.first_ts(market, timeframe)
+            if first is not None:
+                keep = ts < first
+                ts, index = ts[keep], index[keep]
+            if len(ts) == 0:
+                return 0
+
+            for month in self._split_months(ts):
+                lo, hi = _month_range(month)
+                mask = (ts >= lo) & (ts < hi)
+                if not mask.any():
+                    continue
+                new = {name: ts[mask] if name == 'ts' else np.asarray(columns[name])[index[mask]]
+                       for name in CANDLE_COLUMNS}
+
+                segment = self._dir(market, timeframe, month)
+                existing = self._open_segment(market, timeframe, month)
+                if existing is not None:
+                    new = concat_columns([new, existing])
+                tmp = segment + '.tmp'
+                shutil.rmtree(tmp, ignore_errors=True)
+                os.makedirs(tmp)
+                for name in CANDLE_COLUMNS:
+                    np.save(os.path.join(tmp, f"{name}.npy"),
+                            np.ascontiguousarray(new[name], dtype=_DTYPES[name]))
+
+                if os.path.exists(segment):
+                    # 열려 있는 메모리 맵은 이전 파일을 계속 읽음
+                    old = segment + '.old'
+                    shutil.rmtree(old, ignore_errors=True)
+                    os.replace(segment, old)
+                    os.replace(tmp, segment)
+                    shutil.rmtree(old, ignore_errors=True)
+                else:
+                    os.replace(tmp, segment)
+        return len(ts)
+
+    @staticmethod
+    def _split_months(ts):
+        """ts 배열에 걸친 월 키 목록"""
+        months = []
+        start = int(ts[0])
+        while start <= ts[-1]:
+            key = _month_key(start)
+            months.append(key)
+            start = _month_range(key)[1]
+        return months
+
+    def segments(self, market, timeframe, start=None, end=None):
+        """월 세그먼트 단위로 컬럼 반환 (메모리 맵 슬라이스, 복사 없음)
+
+        Args:
+            start/end: [start, end) UTC epoch ms (None이면 제한 없음)
+
+        Yields:
+            dict: 시간 오름차순 컬럼 (읽기 전용)
+        """
+        for month in self.months(market, timeframe):
+            lo, hi = _month_range(month)
+            if (start is not None and hi <= start) or (end is not None and lo >= end):
+                continue
+            columns = self._open_segment(market, timeframe, month)
+            if columns is None:
+                continue
+            ts = columns['ts']
+            i = 0 if start is None else int(np.searchsorted(ts, start, 'left'))
+            j = len(ts) if end is None else int(np.searchsorted(ts, end, 'left'))
+            if i < j:
+                yield {name: values[i:j] for name, values in columns.items()}
+
+    def load(self, market, timeframe, start=None, end=None, last=None, as_frame=False):
+        """기간 조회
+
+        세그먼트가 하나면 메모리 맵 그대로(읽기 전용), 여러 개면 한 번 연결합니다.
+
+        Args:
+            start/end: [start, end) UTC epoch ms
+            last: 최근 N개만
+            as_frame: True면 to_dataframe() 형식 DataFrame
+
+        Returns:
+            dict: 시간 오름차순 컬럼 또는 DataFrame (데이터 없으면 None)
+        """
+        chunks = list(self.segments(market, timeframe, start, end))
+        if last:
+            # 뒤에서부터 필요한 세그먼트만 남김
+            needed, total = [], 0
+            for chunk in reversed(chunks):
+                needed.append(chunk)
+                total += len(chunk['ts'])
+                if total >= last:
+                    break
+            chunks = needed[::-1]
+
+        if not chunks:
+            return None
+        columns = chunks[0] if len(chunks) == 1 else concat_columns(chunks)
+        if last:
+            columns = {name: values[-last:] for name, values in columns.items()}
+        return to_dataframe(columns) if as_frame else columns
@@ -13,7 +13,7 @@
 3. 20MA 근처 (±3% 이내)
 4. 거래량 충분 (최소 거래대금)
 """
-import ccxt
+from exchange_provider import get_exchange, load_markets
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -29,14 +29,14 @@ class CoinScanner_20_200:
             min_volume_usdt: 최소 24시간 거래대금 (USDT) - 기본 1000만 USDT
             timeframe: 타임프레임 (기본 1분봉)
         """
-        self.exchange = ccxt.binance()
+        self.exchange = get_exchange('binance')
         self.min_volume_usdt = min_volume_usdt
         self.timeframe = timeframe
 
     def get_all_usdt_markets(self):
         """모든 USDT 마켓 가져오기"""
         try:
-            markets = self.exchange.load_markets()
+            markets = load_markets(self.exchange)
             usdt_pairs = [
                 symbol for symbol in markets.keys()
                 if symbol.endswith('/USDT') and markets[symbol]['active']
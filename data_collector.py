@@ -5,7 +5,7 @@
 import time
 from datetime import datetime
 from upbit_api import UpbitAPI
-from database_manager import DatabaseManager
+from db_replicator import open_trading_db
 from config import get_config
 
 
@@ -29,17 +29,10 @@ class DataCollector:
             all_markets = self.upbit.get_market_all()
             krw_markets = [m['market'] for m in all_markets if m['market'].startswith('KRW-')]
 
-            # 현재가 조회로 거래량 정보 가져오기
-            tickers = self.upbit.get_current_prices(krw_markets)
+            # 현재가 일괄 조회 (24시간 거래대금 내림차순 정렬)
+            tickers = self.upbit.get_ticker_columns(krw_markets, fields=('acc_trade_price_24h',))
 
-            # 24시간 거래대금 기준 정렬
-            sorted_tickers = sorted(
-                tickers,
-                key=lambda x: x.get('acc_trade_price_24h', 0),
-                reverse=True
-            )
-
-            return [t['market'] for t in sorted_tickers[:limit]]
+            return list(tickers['market'][:limit])
 
         except Exception as e:
             print(f"⚠️ 상위 마켓 조회 실패: {e}")
@@ -67,11 +60,14 @@ class DataCollector:
                 print(f"⚠️ {market} 캔들 데이터 없음")
                 return 0
 
-            # 데이터베이스에 저장
-            saved = self.db.save_candles(market, tf_key, candles)
+            # 데이터베이스에 일괄 저장 (페이지당 1회 executemany)
+            result = self.db.ingest_candles(market, tf_key, candles)
+            saved = result['inserted']
 
             if saved > 0:
-                print(f"✅ {market} {tf_key}: {saved}개 캔들 저장")
+                print(f"✅ {market} {tf_key}: {saved}개 캔들 저장 (중복 {result['duplicates']}개)")
+            if result['errors']:
+                print(f"⚠️ {market} {tf_key}: {result['errors']}개 저장 실패")
 
             return saved
 
@@ -103,7 +99,6 @@ class DataCollector:
             for tf in timeframes:
                 saved = self.collect_candles(market, tf, count=200)
                 total_saved += saved
-                time.sleep(0.1)  # API 요청 제한 방지
 
         print(f"\n{'='*60}")
         print(f"✅ 수집 완료: 총 {total_saved}개 캔들 저장")
@@ -151,8 +146,8 @@ if __name__ == "__main__":
     upbit = UpbitAPI(config['upbit_access_key'], config['upbit_secret_key'])
 
     # 데이터베이스 초기화
-    use_oracle = os.environ.get('USE_ORACLE_DB', 'false').lower() == 'true'
-    db = DatabaseManager(use_oracle=use_oracle)
+    # Oracle이면 로컬 저널에 저장하고 백그라운드로 복제
+    db = open_trading_db()
 
     # 데이터 수집기 생성
     collector = DataCollector(upbit, db)
@@ -4,122 +4,401 @@ Always Free Tier Autonomous Database 연동 및 데이터 관리
 """
 import os
 import json
-from datetime import datetime, timedelta
-import sqlite3  # 로컬 개발용
-# Oracle DB는 oracledb 사용 (배포 시)
+import time
+from datetime import datetime, timedelta, timezone
+from contextlib import contextmanager
+from candle_decoder import decode_rows, to_dataframe
+from candle_decoder import KST_OFFSET_MS
+from sqlite_pool import SQLiteWriter, SQLiteReaderPool
+from oracle_pool import get_oracle_pool
+from db_partitions import (SQLitePartitions, ORACLE_TRADES_PARTITIONS, month_key, month_range,
+                           oracle_candle_partitions, oracle_high_value_key)
+# Oracle DB는 oracledb 사용 (배포 시, oracle_pool에서 지연 import)
+
+# 캔들 테이블 v2: (market, timeframe, ts) 클러스터드 기본키 + 정수 epoch + 실수 가격
+# - SQLite: WITHOUT ROWID (기본키 B-tree에 행 저장, 별도 인덱스 없음)
+# - Oracle: 인덱스 구성 테이블(IOT) + 접두어 압축 (market, timeframe 반복 저장 제거)
+# ts = 봉 시작 시각 (UTC epoch ms)
+# 월별 파티션: SQLite는 {table}_pYYYYMM 테이블, Oracle은 ts range 파티션 (db_partitions)
+CANDLE_SCHEMA_VERSION = 2
+
+CANDLES_V2_DDL = {
+    'sqlite': '''
+        CREATE TABLE IF NOT EXISTS {table} (
+            market TEXT NOT NULL,
+            timeframe TEXT NOT NULL,
+            ts INTEGER NOT NULL,
+            open_price REAL,
+            high_price REAL,
+            low_price REAL,
+            close_price REAL,
+            volume REAL,
+            PRIMARY KEY (market, timeframe, ts)
+        ) WITHOUT ROWID
+    ''',
+    'oracle': '''
+        CREATE TABLE {table} (
+            market VARCHAR2(20) NOT NULL,
+            timeframe VARCHAR2(10) NOT NULL,
+            ts NUMBER(19) NOT NULL,
+            open_price BINARY_DOUBLE,
+            high_price BINARY_DOUBLE,
+            low_price BINARY_DOUBLE,
+            close_price BINARY_DOUBLE,
+            volume BINARY_DOUBLE,
+            CONSTRAINT pk_{table} PRIMARY KEY (market, timeframe, ts)
+        ) ORGANIZATION INDEX COMPRESS 2
+        {partitions}
+    ''',
+}
+
+# 거래 기록 (SQLite는 월별 파티션 테이블도 같은 DDL, timestamp = UTC 'YYYY-MM-DD HH:MM:SS')
+TRADES_DDL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        market VARCHAR(20) NOT NULL,
+        trade_type VARCHAR(10) NOT NULL,
+        price DECIMAL(20, 8),
+        amount DECIMAL(30, 8),
+        krw_amount DECIMAL(20, 2),
+        profit DECIMAL(20, 2),
+        profit_rate DECIMAL(10, 4),
+        reason VARCHAR(100),
+        hold_time_minutes INTEGER,
+        peak_profit DECIMAL(10, 4),
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+ORACLE_TRADES_DDL = f'''
+    CREATE TABLE trades (
+        id NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        market VARCHAR2(20) NOT NULL,
+        trade_type VARCHAR2(10) NOT NULL,
+        price NUMBER(20, 8),
+        amount NUMBER(30, 8),
+        krw_amount NUMBER(20, 2),
+        profit NUMBER(20, 2),
+        profit_rate NUMBER(10, 4),
+        reason VARCHAR2(100),
+        hold_time_minutes NUMBER(10),
+        peak_profit NUMBER(10, 4),
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+    ) {ORACLE_TRADES_PARTITIONS}
+'''
+
+
+def candle_ts_ms(candle):
+    """업비트 캔들 → 봉 시작 UTC epoch ms"""
+    utc = candle.get('candle_date_time_utc')
+    if utc:
+        return int(datetime.fromisoformat(utc).replace(tzinfo=timezone.utc).timestamp() * 1000)
+    kst = datetime.fromisoformat(candle['candle_date_time_kst']).replace(tzinfo=timezone.utc)
+    return int(kst.timestamp() * 1000) - KST_OFFSET_MS
+
+
+def to_epoch_ms(value):
+    """조회 경계 → UTC epoch ms
+
+    Args:
+        value: epoch ms 정수, datetime/Timestamp (시간대 없으면 KST로 간주) 또는 KST ISO 문자열
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            return int(value.replace(tzinfo=timezone.utc).timestamp() * 1000) - KST_OFFSET_MS
+        return int(value.timestamp() * 1000)
+    return int(value)
+
+
+def format_kst(ts_ms):
+    """UTC epoch ms → KST 'YYYY-MM-DDTHH:MM:SS' (업비트 candle_date_time_kst 형식)"""
+    return datetime.fromtimestamp((ts_ms + KST_OFFSET_MS) / 1000, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def rollup_metrics(trade_count, win_count, profit_sum, gross_profit, gross_loss, rate_sum, rate_sq_sum,
+                   hold_sum):
+    """trade_rollups 합계 → 성과 지표
+
+    Returns:
+        dict: total_trades, winning_trades, win_rate(%), total_profit, profit_factor,
+              avg_profit_rate, sharpe_ratio (거래당 수익률 평균/표준편차), avg_hold_time
+    """
+    trade_count = trade_count or 0
+    if trade_count == 0:
+        return None
+
+    mean = (rate_sum or 0) / trade_count
+    variance = max((rate_sq_sum or 0) / trade_count - mean * mean, 0)
+    return {
+        'total_trades': trade_count,
+        'winning_trades': win_count or 0,
+        'win_rate': (win_count or 0) / trade_count * 100,
+        'total_profit': profit_sum or 0,
+        'profit_factor': (gross_profit or 0) / gross_loss if gross_loss else None,
+        'avg_profit_rate': mean,
+        'sharpe_ratio': mean / variance ** 0.5 if variance > 0 else 0,
+        'avg_hold_time': (hold_sum or 0) / trade_count,
+    }
 
 
 class DatabaseManager:
     """데이터베이스 관리 (Oracle Cloud / SQLite)"""
 
-    def __init__(self, use_oracle=False):
+    def __init__(self, use_oracle=False, db_path=None, read_pool_size=4, journal=False):
         """
         Args:
             use_oracle: True면 Oracle DB, False면 로컬 SQLite
+            db_path: SQLite 파일 경로 (기본 SQLITE_DB_PATH 또는 trading_data.db)
+            read_pool_size: SQLite 읽기 전용 커넥션 수
+            journal: True면 거래/캔들 저장을 replication_log에도 기록 (SQLite 전용,
+                     db_replicator.OracleReplicator가 Oracle로 전송)
         """
         self.use_oracle = use_oracle
+        self.db_path = db_path or os.environ.get('SQLITE_DB_PATH', 'trading_data.db')
+        self.read_pool_size = read_pool_size
+        self.writer = None   # SQLite 전용 쓰기 커넥션
+        self.readers = None  # SQLite 읽기 전용 커넥션 풀
+        self.oracle = None   # Oracle 세션 풀 (프로세스 공유)
+        self.replicator = None  # 비동기 Oracle 복제기 (db_replicator)
+        self._conn = None
+        self._cursor = None
+        self.partitions = {}  # SQLite 월별 파티션 {'candles'/'trades': SQLitePartitions}
+        self._oracle_candle_high_ms = None  # Oracle 캔들 마지막 range 파티션 상한 (epoch ms)
 
         if use_oracle:
-            # Oracle Cloud Autonomous Database 연결
+            # Oracle Cloud Autonomous Database 연결 (wallet은 프로세스당 한 번만 풀고 풀 공유)
             try:
-                import oracledb
-                import base64
-
-                # Wallet 설정
-                wallet_base64 = os.environ.get('ORACLE_WALLET_BASE64')
-                if wallet_base64:
-                    # Base64 디코딩하여 임시 wallet 파일 생성
-                    wallet_dir = '/tmp/wallet'
-                    os.makedirs(wallet_dir, exist_ok=True)
-                    wallet_path = f'{wallet_dir}/wallet.zip'
-                    with open(wallet_path, 'wb') as f:
-                        f.write(base64.b64decode(wallet_base64))
-
-                    # Wallet 압축 해제
-                    import zipfile
-                    with zipfile.ZipFile(wallet_path, 'r') as zip_ref:
-                        zip_ref.extractall(wallet_dir)
-
-                    # sqlnet.ora 파일 수정 (WALLET_LOCATION을 실제 경로로 변경)
-                    sqlnet_path = f'{wallet_dir}/sqlnet.ora'
-                    with open(sqlnet_path, 'w') as f:
-                        f.write(f'WALLET_LOCATION = (SOURCE = (METHOD = file) (METHOD_DATA = (DIRECTORY="{wallet_dir}")))\n')
-                        f.write('SSL_SERVER_DN_MATCH=yes\n')
-
-                    # TNS_ADMIN 환경변수 설정 (wallet 위치)
-                    os.environ['TNS_ADMIN'] = wallet_dir
-
-                    # DSN은 tnsnames.ora의 별칭 사용 (기본값: cryptodb_tpurgent)
-                    dsn = os.environ.get('ORACLE_DB_DSN', 'cryptodb_tpurgent')
-
-                    # wallet_password 설정 (cwallet.sso 자동 로드)
-                    wallet_password = os.environ.get('ORACLE_WALLET_PASSWORD')
-                    if wallet_password:
-                        os.environ['ORACLE_WALLET_PASSWORD'] = wallet_password
-
-                    # 간단한 연결 (TNS_ADMIN 환경변수로 wallet 자동 탐지)
-                    self.conn = oracledb.connect(
-                        user=os.environ.get('ORACLE_DB_USER', 'ADMIN'),
-                        password=os.environ.get('ORACLE_DB_PASSWORD'),
-                        dsn=dsn
-                    )
-                else:
-                    # Wallet 없이 연결 (로컬 테스트용)
-                    self.conn = oracledb.connect(
-                        user=os.environ.get('ORACLE_DB_USER', 'ADMIN'),
-                        password=os.environ.get('ORACLE_DB_PASSWORD'),
-                        dsn=os.environ.get('ORACLE_DB_DSN')
-                    )
+                self.oracle = get_oracle_pool()
                 print("✅ Oracle Database 연결 성공")
             except Exception as e:
                 print(f"⚠️ Oracle DB 연결 실패, SQLite 사용: {e}")
                 self.use_oracle = False
-                self.conn = sqlite3.connect('trading_data.db')
+                self._connect_sqlite()
         else:
             # 로컬 SQLite
-            self.conn = sqlite3.connect('trading_data.db')
+            self._connect_sqlite()
             print("✅ SQLite Database 연결")
 
-        self.cursor = self.conn.cursor()
+        self.journal = journal and not self.use_oracle
         self.create_tables()
+        if self.oracle:
+            # 테이블 생성에 쓴 세션은 풀로 반납 (이후 작업은 호출마다 세션 대여)
+            self._release_session()
+
+    @property
+    def conn(self):
+        """전용 커넥션 (SQLite: 쓰기 커넥션, Oracle: DDL/유지보수 스크립트용 세션 - 처음 쓸 때 풀에서 대여)"""
+        if self._conn is None and self.oracle is not None:
+            self._conn = self.oracle.acquire()
+        return self._conn
+
+    @conn.setter
+    def conn(self, value):
+        self._conn = value
+
+    @property
+    def cursor(self):
+        """전용 커넥션의 커서 (스레드 간 공유 금지 - 봇/수집기 작업은 _read/_write 사용)"""
+        if self._cursor is None:
+            self._cursor = self.conn.cursor()
+        return self._cursor
+
+    def _release_session(self):
+        """Oracle 전용 세션 반납"""
+        if self._cursor is not None:
+            self._cursor.close()
+            self._cursor = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _connect_sqlite(self):
+        """SQLite 연결 (WAL 프로필, 쓰기 전용 커넥션 + 읽기 전용 풀)"""
+        self.writer = SQLiteWriter(self.db_path)
+        self.conn = self.writer.conn
+        self.readers = SQLiteReaderPool(self.db_path, size=self.read_pool_size)
+
+    @contextmanager
+    def _write(self):
+        """쓰기 트랜잭션 (SQLite는 전용 커넥션에서 스레드 간 직렬화, Oracle은 풀 세션마다 자기 커서)"""
+        transaction = self.writer.transaction() if self.writer else self.oracle.transaction()
+        with transaction as cursor:
+            yield cursor
+
+    def _read(self, sql, params=()):
+        """조회 (SQLite는 읽기 전용 풀 사용 → 쓰기 커밋과 서로 막지 않음, Oracle은 풀 세션)"""
+        if self.readers:
+            return self.readers.query(sql, params)
+        return self.oracle.query(self._oracle_binds(sql), params)
+
+    def stream_rows(self, sql, params=(), batch_size=50_000):
+        """큰 조회를 한 문장의 커서에서 batch_size행씩 받아옴 (전체 결과를 메모리에 올리지 않음)
+
+        SQLite는 읽기 전용 커넥션(WAL 스냅샷 → 쓰기를 막지 않음), Oracle은 풀 세션의
+        서버 측 커서(arraysize/prefetchrows = batch_size)를 끝까지 사용합니다.
+
+        Yields:
+            list: 최대 batch_size개 행
+        """
+        if self.readers:
+            with self.readers.connection() as conn:
+                cursor = conn.execute(sql, params)
+                try:
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            return
+                        yield rows
+                finally:
+                    cursor.close()
+
+        with self.oracle.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.arraysize = batch_size
+                cursor.prefetchrows = batch_size + 1
+                cursor.execute(self._oracle_binds(sql), params)
+                while True:
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        return
+                    yield rows
+
+    def execute_write(self, sql, params=()):
+        """쓰기 한 문장을 짧은 트랜잭션으로 실행 ('?' 자리표시자)
+
+        Returns:
+            int: 영향받은 행 수
+        """
+        if self.use_oracle:
+            sql = self._oracle_binds(sql)
+        with self._write() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+    def incremental_vacuum(self, step_pages=2000):
+        """SQLite 빈 페이지를 step_pages씩 짧은 트랜잭션으로 파일에서 반환
+
+        VACUUM처럼 파일 전체를 다시 쓰거나 오래 잠그지 않습니다.
+
+        Returns:
+            int: 반환한 페이지 수 (Oracle이거나 auto_vacuum=INCREMENTAL이 아니면 None)
+        """
+        if self.use_oracle or self._read("PRAGMA auto_vacuum")[0][0] != 2:
+            return None
+
+        freed = 0
+        while True:
+            with self._write() as cursor:
+                free_pages = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+                if free_pages:
+                    cursor.execute(f"PRAGMA incremental_vacuum({step_pages})").fetchall()
+                    step = free_pages - cursor.execute("PRAGMA freelist_count").fetchone()[0]
+                else:
+                    step = 0
+            if step <= 0:
+                break
+            freed += step
+
+        # 줄어든 파일 끝을 WAL에서 본 파일에 반영 (읽기/쓰기를 기다리지 않는 PASSIVE)
+        with self._write() as cursor:
+            cursor.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+        return freed
+
+    @staticmethod
+    def _oracle_binds(sql):
+        """'?' 자리표시자 → Oracle 위치 바인드 (:1, :2 ...)"""
+        parts = sql.split('?')
+        return ''.join(f"{part}:{i}" for i, part in enumerate(parts[:-1], 1)) + parts[-1]
+
+    def get_db_stats(self):
+        """잠금/대기 통계
+
+        Returns:
+            dict: SQLite면 {'writer': {'writes', 'lock_wait_ms', 'write_ms', 'busy_errors'},
+                           'readers': {'reads', 'pool_wait_ms', 'read_ms', 'busy_errors'},
+                           'pragmas': 적용된 PRAGMA}
+                  Oracle이면 {'oracle': {'acquires', 'acquire_wait_ms', 'queries', 'writes',
+                                        'opened', 'busy', 'max', 'connect_ms'}}
+        """
+        if self.oracle:
+            return {'oracle': self.oracle.get_stats()}
+        return {
+            'writer': dict(self.writer.stats),
+            'readers': dict(self.readers.stats),
+            'pragmas': dict(self.writer.pragmas),
+        }
+
+    def _detect_candle_schema(self):
+        """candles 테이블 버전 (없으면 None, timestamp 컬럼이면 1, ts 컬럼이면 2)"""
+        if self.use_oracle:
+            self.cursor.execute(
+                "SELECT column_name FROM user_tab_columns WHERE table_name = 'CANDLES'"
+            )
+            columns = {row[0].lower() for row in self.cursor.fetchall()}
+        else:
+            self.cursor.execute("PRAGMA table_info(candles)")
+            columns = {row[1].lower() for row in self.cursor.fetchall()}
+
+        if not columns:
+            return None
+        return 2 if 'ts' in columns else 1
+
+    def _table_layout(self, table):
+        """테이블 형태 (없으면 None, 단일 테이블이면 'table', 월별 파티션이면 'partitioned')"""
+        if self.use_oracle:
+            self.cursor.execute("SELECT partitioned FROM user_tables WHERE table_name = :1", (table.upper(),))
+            row = self.cursor.fetchone()
+            return None if row is None else ('partitioned' if row[0] == 'YES' else 'table')
+        # SQLite 파티션은 같은 이름의 UNION ALL 뷰로 표시
+        self.cursor.execute("SELECT type FROM sqlite_master WHERE name = ?", (table,))
+        row = self.cursor.fetchone()
+        return None if row is None else ('partitioned' if row[0] == 'view' else 'table')
+
+    def _table_exists(self, table):
+        """전용 커서로 테이블 존재 여부 확인"""
+        if self.use_oracle:
+            self.cursor.execute("SELECT 1 FROM user_tables WHERE table_name = :1", (table.upper(),))
+        else:
+            self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        return self.cursor.fetchone() is not None
 
     def create_tables(self):
         """테이블 생성"""
 
-        # 1. 캔들 데이터 테이블
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS candles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                market VARCHAR(20) NOT NULL,
-                timeframe VARCHAR(10) NOT NULL,
-                timestamp DATETIME NOT NULL,
-                open_price DECIMAL(20, 8),
-                high_price DECIMAL(20, 8),
-                low_price DECIMAL(20, 8),
-                close_price DECIMAL(20, 8),
-                volume DECIMAL(30, 8),
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(market, timeframe, timestamp)
-            )
-        ''')
+        # 1. 캔들 데이터 테이블 (v2, 기존 v1 테이블은 scripts/migrate_candles_v2.py로 변환)
+        #    새 DB는 월별 파티션, 기존 단일 테이블은 scripts/partition_tables.py로 변환
+        layouts = {'candles': self._table_layout('candles'), 'trades': self._table_layout('trades')}
+        self.candle_schema = self._detect_candle_schema()
+        if self.candle_schema is None:
+            if self.use_oracle:
+                self.cursor.execute(CANDLES_V2_DDL['oracle'].format(
+                    table='candles', partitions=oracle_candle_partitions()))
+            layouts['candles'] = 'partitioned'
+            self.candle_schema = CANDLE_SCHEMA_VERSION
+        elif self.candle_schema < CANDLE_SCHEMA_VERSION:
+            print("⚠️ candles 테이블이 v1 형식입니다 - scripts/migrate_candles_v2.py로 변환 권장")
 
         # 2. 거래 기록 테이블
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS trades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                market VARCHAR(20) NOT NULL,
-                trade_type VARCHAR(10) NOT NULL,
-                price DECIMAL(20, 8),
-                amount DECIMAL(30, 8),
-                krw_amount DECIMAL(20, 2),
-                profit DECIMAL(20, 2),
-                profit_rate DECIMAL(10, 4),
-                reason VARCHAR(100),
-                hold_time_minutes INTEGER,
-                peak_profit DECIMAL(10, 4),
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        if layouts['trades'] is None:
+            if self.use_oracle:
+                self.cursor.execute(ORACLE_TRADES_DDL)
+            layouts['trades'] = 'partitioned'
+        elif layouts['trades'] == 'table' and not self.use_oracle:
+            self.cursor.execute(TRADES_DDL.format(table='trades'))
+
+        self.partitioned = {table: layout == 'partitioned' for table, layout in layouts.items()}
+        if not self.use_oracle:
+            # 파티션 테이블 + 호환 뷰 (이번 달 파티션을 만들어 뷰가 항상 있도록)
+            ddls = {'candles': CANDLES_V2_DDL['sqlite'], 'trades': TRADES_DDL}
+            this_month = datetime.now(timezone.utc).strftime('%Y-%m')
+            for table, partitioned in self.partitioned.items():
+                if partitioned:
+                    self.partitions[table] = SQLitePartitions(table, ddls[table])
+                    self.partitions[table].ensure(self.cursor, this_month)
 
         # 3. 파라미터 최적화 기록
         self.cursor.execute('''
@@ -161,20 +440,99 @@ class DatabaseManager:
             )
         ''')
 
-        # 인덱스 생성
+        # 5. 거래소에서 받아 저장한 캔들 구간 (거래 없는 봉 때문에 같은 구간을 다시 받지 않도록)
         self.cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_candles_market_time
-            ON candles(market, timeframe, timestamp DESC)
+            CREATE TABLE IF NOT EXISTS candle_coverage (
+                market VARCHAR(20) NOT NULL,
+                timeframe VARCHAR(10) NOT NULL,
+                start_ts INTEGER NOT NULL,
+                end_ts INTEGER NOT NULL,
+                PRIMARY KEY (market, timeframe, start_ts)
+            )
         ''')
 
+        # 6. 매도 거래 롤업 (일/마켓/사유별 합계, save_trade와 같은 트랜잭션에서 갱신)
+        #    승률/손익비/샤프를 trades 전체를 훑지 않고 O(일수) 행에서 계산
+        rollups_exist = self._table_exists('trade_rollups')
         self.cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_trades_timestamp
-            ON trades(timestamp DESC)
+            CREATE TABLE IF NOT EXISTS trade_rollups (
+                trade_date DATE NOT NULL,
+                market VARCHAR(20) NOT NULL,
+                reason VARCHAR(100) NOT NULL,
+                trade_count INTEGER NOT NULL,
+                win_count INTEGER NOT NULL,
+                loss_count INTEGER NOT NULL,
+                profit_sum DOUBLE PRECISION NOT NULL,
+                gross_profit DOUBLE PRECISION NOT NULL,
+                gross_loss DOUBLE PRECISION NOT NULL,
+                rate_sum DOUBLE PRECISION NOT NULL,
+                rate_sq_sum DOUBLE PRECISION NOT NULL,
+                best_profit DOUBLE PRECISION,
+                worst_profit DOUBLE PRECISION,
+                best_rate DOUBLE PRECISION,
+                worst_rate DOUBLE PRECISION,
+                hold_sum DOUBLE PRECISION NOT NULL,
+                PRIMARY KEY (trade_date, market, reason)
+            )
         ''')
+        if not rollups_exist:
+            # 처음 만들 때 기존 거래로 한 번 채움
+            self._backfill_trade_rollups(self.cursor)
+
+        # 인덱스 생성 (v2는 기본키가 곧 (market, timeframe, ts) 인덱스)
+        if self.candle_schema == 1:
+            self.cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_candles_market_time
+                ON candles(market, timeframe, timestamp DESC)
+            ''')
+
+        if not self.partitions.get('trades'):
+            # SQLite 파티션은 한 달치라 인덱스 없이 스캔
+            self.cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_trades_timestamp
+                ON trades(timestamp DESC)
+            ''')
+
+        if self.journal:
+            # 7. 복제 저널 (쓰기와 같은 트랜잭션에 기록) + 대상별 전송 완료 위치
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS replication_log (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind VARCHAR(20) NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS replication_state (
+                    target VARCHAR(20) PRIMARY KEY,
+                    last_seq INTEGER NOT NULL,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            # 대상별 복제 담당 프로세스 (같은 DB 파일을 여는 봇/수집기 중 하나만 전송)
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS replication_lease (
+                    target VARCHAR(20) PRIMARY KEY,
+                    owner VARCHAR(100) NOT NULL,
+                    lease_until REAL NOT NULL
+                )
+            ''')
 
         self.conn.commit()
         print("✅ 테이블 생성 완료")
 
+    # Oracle: 배열 바인딩 MERGE (이미 있는 봉은 건너뜀), {ts} = 스키마별 시각 컬럼
+    ORACLE_CANDLE_MERGE = """
+        MERGE INTO candles c
+        USING (SELECT :1 AS market, :2 AS timeframe, :3 AS ts, :4 AS open_price, :5 AS high_price,
+                      :6 AS low_price, :7 AS close_price, :8 AS volume FROM dual) s
+        ON (c.market = s.market AND c.timeframe = s.timeframe AND c.{ts} = s.ts)
+        WHEN NOT MATCHED THEN INSERT
+            (market, timeframe, {ts}, open_price, high_price, low_price, close_price, volume)
+        VALUES (s.market, s.timeframe, s.ts, s.open_price, s.high_price, s.low_price, s.close_price, s.volume)
+    """
+
     def save_candles(self, market, timeframe, candles):
         """
         캔들 데이터 저장
@@ -183,18 +541,34 @@ class DatabaseManager:
             market: 마켓 (KRW-BTC 등)
             timeframe: 타임프레임 (1m, 5m, 15m, 1h, 4h, 1d)
             candles: 업비트 API 캔들 리스트
+
+        Returns:
+            int: 새로 저장된 캔들 수
+        """
+        return self.ingest_candles(market, timeframe, candles)['inserted']
+
+    def ingest_candles(self, market, timeframe, candles):
+        """
+        캔들 일괄 저장 (페이지 전체를 한 번의 executemany + 한 트랜잭션으로)
+
+        SQLite는 INSERT OR IGNORE, Oracle은 배열 바인딩 MERGE(batcherrors)로
+        이미 있는 봉은 건너뜁니다.
+
+        Returns:
+            dict: {'inserted': 새로 저장, 'duplicates': 이미 있던 봉, 'errors': 실패}
         """
-        saved = 0
+        v2 = self.candle_schema >= 2
+        rows = []
+        errors = 0
         for candle in candles:
             try:
-                timestamp = candle.get('candle_date_time_kst') or candle.get('candle_date_time_utc')
-
-                self.cursor.execute('''
-                    INSERT OR IGNORE INTO candles
-                    (market, timeframe, timestamp, open_price, high_price,
-                     low_price, close_price, volume)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                if v2:
+                    timestamp = candle_ts_ms(candle)
+                else:
+                    timestamp = candle.get('candle_date_time_kst') or candle.get('candle_date_time_utc')
+                    if self.use_oracle:
+                        timestamp = datetime.fromisoformat(timestamp)
+                rows.append((
                     market,
                     timeframe,
                     timestamp,
@@ -204,41 +578,155 @@ class DatabaseManager:
                     candle['trade_price'],
                     candle['candle_acc_trade_volume']
                 ))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"캔들 변환 실패: {e}")
+                errors += 1
 
-                if self.cursor.rowcount > 0:
-                    saved += 1
+        return self._insert_candle_rows(rows, errors)
 
-            except Exception as e:
-                print(f"캔들 저장 실패: {e}")
-                continue
+    def ingest_candle_columns(self, market, timeframe, columns):
+        """
+        컬럼 배열 캔들 일괄 저장 (candle_decoder 형식, ingest_candles와 동일한 중복 처리)
 
-        self.conn.commit()
-        return saved
+        Returns:
+            dict: {'inserted', 'duplicates', 'errors'}
+        """
+        if columns is None or len(columns['ts']) == 0:
+            return {'inserted': 0, 'duplicates': 0, 'errors': 0}
+
+        timestamps = [self._candle_bound(ts) for ts in columns['ts'].tolist()]
+        n = len(timestamps)
+        rows = list(zip(
+            [market] * n, [timeframe] * n, timestamps,
+            columns['open'].tolist(), columns['high'].tolist(), columns['low'].tolist(),
+            columns['close'].tolist(), columns['volume'].tolist()
+        ))
+        return self._insert_candle_rows(rows)
+
+    def _insert_candle_rows(self, rows, errors=0):
+        """(market, timeframe, 시각, open, high, low, close, volume) 행 일괄 저장"""
+        v2 = self.candle_schema >= 2
+        result = {'inserted': 0, 'duplicates': 0, 'errors': errors}
+        if not rows:
+            return result
+
+        try:
+            if self.use_oracle and self.partitioned['candles'] and v2:
+                self._ensure_oracle_candle_partitions(max(row[2] for row in rows))
+            with self._write() as cursor:
+                if self.use_oracle:
+                    cursor.executemany(self.ORACLE_CANDLE_MERGE.format(ts='ts' if v2 else 'timestamp'), rows,
+                                       batcherrors=True, arraydmlrowcounts=True)
+                    batch_errors = cursor.getbatcherrors()
+                    for error in batch_errors[:3]:
+                        print(f"캔들 저장 실패 (행 {error.offset}): {error.message}")
+                    inserted = sum(cursor.getarraydmlrowcounts())
+                    result['errors'] += len(batch_errors)
+                else:
+                    inserted = 0
+                    for table, table_rows in self._route_candle_rows(cursor, rows):
+                        cursor.executemany(f'''
+                            INSERT OR IGNORE INTO {table}
+                            (market, timeframe, {'ts' if v2 else 'timestamp'}, open_price, high_price,
+                             low_price, close_price, volume)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', table_rows)
+                        inserted += cursor.rowcount
+                    batch_errors = ()
+
+                if self.journal and inserted > 0:
+                    # 봉 자체는 로컬 candles에서 다시 읽으므로 구간만 기록
+                    bounds = [to_epoch_ms(row[2]) for row in rows]
+                    self._journal(cursor, 'candles', {
+                        'market': rows[0][0], 'timeframe': rows[0][1],
+                        'start': min(bounds), 'end': max(bounds),
+                    })
+        except Exception as e:
+            print(f"캔들 저장 실패: {e}")
+            result['errors'] += len(rows)
+            return result
+
+        result['inserted'] = inserted
+        result['duplicates'] = len(rows) - inserted - len(batch_errors)
+        return result
+
+    def _route_candle_rows(self, cursor, rows):
+        """SQLite 캔들 행을 월 파티션별로 나눔 (없는 파티션은 쓰기 트랜잭션 안에서 생성)
+
+        Returns:
+            list: [(테이블 이름, 행 리스트), ...]
+        """
+        parts = self.partitions.get('candles')
+        if parts is None:
+            return [('candles', rows)]
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(month_key(row[2]), []).append(row)
+        return [(parts.ensure(cursor, key), month_rows) for key, month_rows in sorted(by_month.items())]
+
+    def _oracle_candle_high(self):
+        """Oracle 캔들 마지막 range 파티션 상한 (UTC epoch ms)"""
+        rows = self.oracle.query('''
+            SELECT high_value FROM user_tab_partitions
+            WHERE table_name = 'CANDLES'
+            ORDER BY partition_position DESC
+            FETCH FIRST 1 ROWS ONLY
+        ''')
+        return int(str(rows[0][0]).strip())
+
+    def _ensure_oracle_candle_partitions(self, ts_ms):
+        """ts_ms가 들어갈 달까지 Oracle 캔들 월 파티션 추가 (IOT는 interval 파티션 불가)"""
+        high = self._oracle_candle_high_ms or self._oracle_candle_high()
+        if ts_ms >= high:
+            with self.oracle.connection() as conn:
+                with conn.cursor() as cursor:
+                    while ts_ms >= high:
+                        key = month_key(high)
+                        try:
+                            cursor.execute(f"ALTER TABLE candles ADD PARTITION p{key.replace('-', '')} "
+                                           f"VALUES LESS THAN ({month_range(key)[1]})")
+                            high = month_range(key)[1]
+                        except Exception:
+                            # 다른 프로세스가 먼저 추가했으면 상한을 다시 읽고 계속
+                            refreshed = self._oracle_candle_high()
+                            if refreshed <= high:
+                                raise
+                            high = refreshed
+        self._oracle_candle_high_ms = high
+
+    def _candle_tables(self, start=None, end=None):
+        """[start, end) 범위를 읽을 캔들 테이블 (오름차순)
+
+        SQLite 파티션이면 범위에 걸친 달의 테이블만, 그 외에는 candles
+        (Oracle은 ts 조건으로 파티션 프루닝)
+        """
+        parts = self.partitions.get('candles')
+        if parts is None:
+            return ['candles']
+        return [table for _, table in parts.route(self._read, start, end)]
 
-    def get_candles(self, market, timeframe, days=30):
+    def get_candles(self, market, timeframe, days=30, as_arrays=False):
         """
         저장된 캔들 데이터 조회
 
+        Args:
+            as_arrays: True면 candle_decoder 형식의 시간 오름차순 컬럼 반환
+
         Returns:
-            업비트 API 형식과 동일한 리스트
+            업비트 API 형식과 동일한 리스트 (as_arrays=True면 컬럼 dict)
         """
-        cutoff = datetime.now() - timedelta(days=days)
+        since = int((time.time() - days * 86400) * 1000)
+        if as_arrays:
+            return self.query_candles(market, timeframe, start=since)
 
-        self.cursor.execute('''
-            SELECT timestamp, open_price, high_price, low_price,
-                   close_price, volume
-            FROM candles
-            WHERE market = ? AND timeframe = ? AND timestamp >= ?
-            ORDER BY timestamp DESC
-        ''', (market, timeframe, cutoff.strftime('%Y-%m-%d %H:%M:%S')))
-
-        rows = self.cursor.fetchall()
+        rows = self._candle_rows(market, timeframe, start=since)
+        rows.reverse()
 
         # 업비트 API 형식으로 변환
         candles = []
         for row in rows:
             candles.append({
-                'candle_date_time_kst': row[0],
+                'candle_date_time_kst': format_kst(row[0]) if isinstance(row[0], int) else row[0],
                 'opening_price': float(row[1]),
                 'high_price': float(row[2]),
                 'low_price': float(row[3]),
@@ -248,14 +736,389 @@ class DatabaseManager:
 
         return candles
 
+    def _candle_bound(self, ts_ms):
+        """epoch ms → 스키마별 시각 컬럼 값 (v1은 KST 문자열/datetime)"""
+        if self.candle_schema >= 2:
+            return ts_ms
+        if self.use_oracle:
+            return datetime.fromisoformat(format_kst(ts_ms))
+        return format_kst(ts_ms)
+
+    def _candle_rows(self, market, timeframe, start=None, end=None, last=None):
+        """캔들 행 조회 (기본키 범위 스캔)
+
+        Returns:
+            list: 시간 오름차순 (ts, open, high, low, close, volume), last가 있으면 최근 last개
+        """
+        column = 'ts' if self.candle_schema >= 2 else 'timestamp'
+        where = ["market = ?", "timeframe = ?"]
+        params = [market, timeframe]
+        if start is not None:
+            where.append(f"{column} >= ?")
+            params.append(self._candle_bound(start))
+        if end is not None:
+            where.append(f"{column} < ?")
+            params.append(self._candle_bound(end))
+
+        sql = f"""
+            SELECT {column}, open_price, high_price, low_price, close_price, volume
+            FROM {{table}}
+            WHERE {' AND '.join(where)}
+            ORDER BY {column} {'DESC' if last else 'ASC'}
+        """
+        tables = self._candle_tables(start, end)
+        if not last:
+            rows = []
+            for table in tables:
+                rows.extend(self._read(sql.format(table=table), tuple(params)))
+            return rows
+
+        # 최근 N개: 최신 파티션부터 기본키를 뒤에서부터 필요한 만큼만 읽고 뒤집음
+        sql += " FETCH FIRST ? ROWS ONLY" if self.use_oracle else " LIMIT ?"
+        rows = []
+        for table in reversed(tables):
+            rows.extend(self._read(sql.format(table=table), tuple(params) + (int(last) - len(rows),)))
+            if len(rows) >= last:
+                break
+        rows.reverse()
+        return rows
+
+    def query_candles(self, market, timeframe, start=None, end=None, last=None, as_frame=False):
+        """
+        캔들 조회 → NumPy 컬럼 (행마다 dict를 만들지 않음)
+
+        Args:
+            start: 시작 (포함) - epoch ms, datetime(시간대 없으면 KST) 또는 KST 문자열
+            end: 끝 (제외), None이면 최신까지
+            last: 최근 N개 (start/end 범위 안에서)
+            as_frame: True면 to_dataframe() 형식 DataFrame (timestamp[KST], open ... volume)
+
+        Returns:
+            dict: {'ts', 'open', 'high', 'low', 'close', 'volume'} 시간 오름차순 또는 DataFrame
+                  (데이터 없으면 None)
+        """
+        rows = self._candle_rows(market, timeframe, to_epoch_ms(start), to_epoch_ms(end), last)
+        columns = decode_rows(rows)
+        return to_dataframe(columns) if as_frame else columns
+
+    def iter_candles(self, market, timeframe, start=None, end=None, chunk_size=100_000, as_frame=False):
+        """
+        긴 기간 캔들을 청크 단위로 조회 (메모리에 전체 행 목록을 만들지 않음)
+
+        마지막으로 받은 ts 다음부터 chunk_size개씩 기본키 범위 스캔을 반복합니다.
+
+        Args:
+            start/end: query_candles()와 동일 ([start, end))
+            chunk_size: 청크당 봉 개수
+
+        Yields:
+            시간 오름차순 컬럼 dict (as_frame=True면 DataFrame)
+        """
+        start, end = to_epoch_ms(start), to_epoch_ms(end)
+        column = 'ts' if self.candle_schema >= 2 else 'timestamp'
+        limit = " FETCH FIRST ? ROWS ONLY" if self.use_oracle else " LIMIT ?"
+        sql = f"""
+            SELECT {column}, open_price, high_price, low_price, close_price, volume
+            FROM {{table}}
+            WHERE market = ? AND timeframe = ? AND {column} {{op}} ?{{end}}
+            ORDER BY {column}
+        """ + limit
+
+        after = None  # 직전 청크 마지막 시각 (스키마별 값)
+        for table in self._candle_tables(start, end):
+            # SQLite 파티션이면 달마다 이어서 읽음 (청크가 달 경계에서 끊길 수 있음)
+            while True:
+                if after is None:
+                    bound, op = self._candle_bound(start if start is not None else 0), '>='
+                else:
+                    bound, op = after, '>'
+                params = [market, timeframe, bound]
+                if end is not None:
+                    params.append(self._candle_bound(end))
+                rows = self._read(sql.format(table=table, op=op,
+                                             end=f" AND {column} < ?" if end is not None else ''),
+                                  tuple(params) + (chunk_size,))
+                if not rows:
+                    break
+
+                after = rows[-1][0]
+                columns = decode_rows(rows)
+                yield to_dataframe(columns) if as_frame else columns
+
+                if len(rows) < chunk_size:
+                    break
+
+    def get_candle_coverage(self, market, timeframe):
+        """거래소에서 받아 저장한 구간 목록
+
+        Returns:
+            list: [(start_ts, end_ts), ...] UTC epoch ms [start, end), 시작 오름차순
+        """
+        rows = self._read('''
+            SELECT start_ts, end_ts FROM candle_coverage
+            WHERE market = ? AND timeframe = ?
+            ORDER BY start_ts
+        ''', (market, timeframe))
+        return [(int(start), int(end)) for start, end in rows]
+
+    def add_candle_coverage(self, market, timeframe, start, end):
+        """수집 구간 추가 (겹치거나 맞닿은 구간은 하나로 합침)"""
+        intervals = sorted(self.get_candle_coverage(market, timeframe) + [(int(start), int(end))])
+        merged = [intervals[0]]
+        for lo, hi in intervals[1:]:
+            if lo <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+            else:
+                merged.append((lo, hi))
+
+        delete_sql = "DELETE FROM candle_coverage WHERE market = ? AND timeframe = ?"
+        insert_sql = "INSERT INTO candle_coverage (market, timeframe, start_ts, end_ts) VALUES (?, ?, ?, ?)"
+        if self.use_oracle:
+            delete_sql, insert_sql = self._oracle_binds(delete_sql), self._oracle_binds(insert_sql)
+        with self._write() as cursor:
+            cursor.execute(delete_sql, (market, timeframe))
+            cursor.executemany(insert_sql, [(market, timeframe, lo, hi) for lo, hi in merged])
+
+    TRADE_COLUMNS = ('market', 'trade_type', 'price', 'amount', 'krw_amount', 'profit',
+                     'profit_rate', 'reason', 'hold_time_minutes', 'peak_profit', 'timestamp')
+
+    # Oracle: 거래 MERGE (같은 마켓/종류/시각/가격이면 이미 복제된 거래)
+    ORACLE_TRADE_MERGE = """
+        MERGE INTO trades t
+        USING (SELECT :1 AS market, :2 AS trade_type, :3 AS price, :4 AS amount, :5 AS krw_amount,
+                      :6 AS profit, :7 AS profit_rate, :8 AS reason, :9 AS hold_time_minutes,
+                      :10 AS peak_profit, :11 AS timestamp FROM dual) s
+        ON (t.market = s.market AND t.trade_type = s.trade_type AND t.timestamp = s.timestamp
+            AND t.price = s.price)
+        WHEN NOT MATCHED THEN INSERT
+            (market, trade_type, price, amount, krw_amount, profit, profit_rate, reason,
+             hold_time_minutes, peak_profit, timestamp)
+        VALUES (s.market, s.trade_type, s.price, s.amount, s.krw_amount, s.profit, s.profit_rate,
+                s.reason, s.hold_time_minutes, s.peak_profit, s.timestamp)
+    """
+
+    def _journal(self, cursor, kind, payload):
+        """복제 저널 기록 (호출한 쓰기 트랜잭션과 함께 커밋)"""
+        cursor.execute("INSERT INTO replication_log (kind, payload) VALUES (?, ?)",
+                       (kind, json.dumps(payload, default=str)))
+
+    def read_journal(self, target, limit=500):
+        """대상이 아직 받지 않은 저널 항목
+
+        Returns:
+            list: [(seq, kind, payload dict), ...] seq 오름차순
+        """
+        rows = self._read('''
+            SELECT seq, kind, payload FROM replication_log
+            WHERE seq > COALESCE((SELECT last_seq FROM replication_state WHERE target = ?), 0)
+            ORDER BY seq
+            LIMIT ?
+        ''', (target, limit))
+        return [(seq, kind, json.loads(payload)) for seq, kind, payload in rows]
+
+    def acquire_replication_lease(self, target, owner, ttl=60):
+        """대상 복제 담당 임대 획득/연장 (비어 있거나 만료됐거나 이미 owner면 성공)
+
+        Returns:
+            bool: owner가 ttl초 동안 담당하면 True
+        """
+        now = time.time()
+        with self._write() as cursor:
+            cursor.execute('''
+                INSERT INTO replication_lease (target, owner, lease_until) VALUES (?, ?, ?)
+                ON CONFLICT(target) DO UPDATE SET owner = excluded.owner, lease_until = excluded.lease_until
+                WHERE replication_lease.owner = excluded.owner OR replication_lease.lease_until < ?
+            ''', (target, owner, now + ttl, now))
+            row = cursor.execute("SELECT owner FROM replication_lease WHERE target = ?", (target,)).fetchone()
+        return row is not None and row[0] == owner
+
+    def release_replication_lease(self, target, owner):
+        """owner가 담당 중이면 임대 반납 (다른 프로세스가 바로 이어받음)"""
+        with self._write() as cursor:
+            cursor.execute("DELETE FROM replication_lease WHERE target = ? AND owner = ?", (target, owner))
+
+    def ack_journal(self, target, seq):
+        """seq까지 전송 완료 기록 (전송 위치는 로컬 DB에 영구 저장) 후 전송된 항목 삭제
+
+        전송 위치는 뒤로 가지 않음 (임대를 잃은 프로세스가 늦게 기록해도 안전)
+        """
+        with self._write() as cursor:
+            cursor.execute('''
+                INSERT INTO replication_state (target, last_seq, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(target) DO UPDATE SET last_seq = MAX(last_seq, excluded.last_seq),
+                                                  updated_at = excluded.updated_at
+            ''', (target, seq))
+            cursor.execute('''
+                DELETE FROM replication_log
+                WHERE seq <= (SELECT MIN(last_seq) FROM replication_state)
+            ''')
+
+    def journal_backlog(self, target):
+        """미전송 저널 항목 수와 가장 오래된 항목 시각"""
+        rows = self._read('''
+            SELECT COUNT(*), MIN(created_at) FROM replication_log
+            WHERE seq > COALESCE((SELECT last_seq FROM replication_state WHERE target = ?), 0)
+        ''', (target,))
+        return rows[0] if rows else (0, None)
+
+    def _trade_table(self, cursor, timestamp):
+        """SQLite 거래를 저장할 테이블 (월 파티션이면 timestamp의 달, 없으면 생성)"""
+        parts = self.partitions.get('trades')
+        return parts.ensure(cursor, str(timestamp)[:7]) if parts else 'trades'
+
+    def merge_trades(self, trades):
+        """복제된 거래 저장 (이미 있는 거래는 건너뜀 → 재전송해도 중복 없음)
+
+        Args:
+            trades: TRADE_COLUMNS 키를 가진 dict 리스트 (timestamp 포함)
+        """
+        rows = [tuple(trade.get(column) for column in self.TRADE_COLUMNS) for trade in trades]
+        if not rows:
+            return
+        with self._write() as cursor:
+            if self.use_oracle:
+                rows = [row[:-1] + (datetime.fromisoformat(str(row[-1])),) for row in rows]
+                cursor.executemany(self.ORACLE_TRADE_MERGE, rows, arraydmlrowcounts=True)
+                inserted = cursor.getarraydmlrowcounts()
+            else:
+                inserted = []
+                for row in rows:
+                    table = self._trade_table(cursor, row[-1])
+                    cursor.execute(f'''
+                        INSERT INTO {table}
+                        (market, trade_type, price, amount, krw_amount, profit,
+                         profit_rate, reason, hold_time_minutes, peak_profit, timestamp)
+                        SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM {table}
+                            WHERE market = ?1 AND trade_type = ?2 AND timestamp = ?11 AND price IS ?3
+                        )
+                    ''', row)
+                    inserted.append(cursor.rowcount)
+
+            # 새로 들어간 거래만 롤업에 더함 (재전송분은 이미 반영됨)
+            self._add_to_rollups(cursor, [trade for trade, count in zip(trades, inserted) if count])
+
+    # 롤업 갱신: 같은 (일, 마켓, 사유) 행이 있으면 합계에 더하고 없으면 새로 만듦
+    ROLLUP_UPSERT = '''
+        INSERT INTO trade_rollups
+        (trade_date, market, reason, trade_count, win_count, loss_count, profit_sum, gross_profit,
+         gross_loss, rate_sum, rate_sq_sum, best_profit, worst_profit, best_rate, worst_rate, hold_sum)
+        VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (trade_date, market, reason) DO UPDATE SET
+            trade_count = trade_count + 1,
+            win_count = win_count + excluded.win_count,
+            loss_count = loss_count + excluded.loss_count,
+            profit_sum = profit_sum + excluded.profit_sum,
+            gross_profit = gross_profit + excluded.gross_profit,
+            gross_loss = gross_loss + excluded.gross_loss,
+            rate_sum = rate_sum + excluded.rate_sum,
+            rate_sq_sum = rate_sq_sum + excluded.rate_sq_sum,
+            best_profit = MAX(best_profit, excluded.best_profit),
+            worst_profit = MIN(worst_profit, excluded.worst_profit),
+            best_rate = MAX(best_rate, excluded.best_rate),
+            worst_rate = MIN(worst_rate, excluded.worst_rate),
+            hold_sum = hold_sum + excluded.hold_sum
+    '''
+
+    ORACLE_ROLLUP_MERGE = """
+        MERGE INTO trade_rollups r
+        USING (SELECT :1 AS trade_date, :2 AS market, :3 AS reason, :4 AS win_count, :5 AS loss_count,
+                      :6 AS profit_sum, :7 AS gross_profit, :8 AS gross_loss, :9 AS rate_sum,
+                      :10 AS rate_sq_sum, :11 AS best_profit, :12 AS worst_profit, :13 AS best_rate,
+                      :14 AS worst_rate, :15 AS hold_sum FROM dual) s
+        ON (r.trade_date = s.trade_date AND r.market = s.market AND r.reason = s.reason)
+        WHEN MATCHED THEN UPDATE SET
+            r.trade_count = r.trade_count + 1,
+            r.win_count = r.win_count + s.win_count,
+            r.loss_count = r.loss_count + s.loss_count,
+            r.profit_sum = r.profit_sum + s.profit_sum,
+            r.gross_profit = r.gross_profit + s.gross_profit,
+            r.gross_loss = r.gross_loss + s.gross_loss,
+            r.rate_sum = r.rate_sum + s.rate_sum,
+            r.rate_sq_sum = r.rate_sq_sum + s.rate_sq_sum,
+            r.best_profit = GREATEST(r.best_profit, s.best_profit),
+            r.worst_profit = LEAST(r.worst_profit, s.worst_profit),
+            r.best_rate = GREATEST(r.best_rate, s.best_rate),
+            r.worst_rate = LEAST(r.worst_rate, s.worst_rate),
+            r.hold_sum = r.hold_sum + s.hold_sum
+        WHEN NOT MATCHED THEN INSERT
+            (trade_date, market, reason, trade_count, win_count, loss_count, profit_sum, gross_profit,
+             gross_loss, rate_sum, rate_sq_sum, best_profit, worst_profit, best_rate, worst_rate, hold_sum)
+        VALUES (s.trade_date, s.market, s.reason, 1, s.win_count, s.loss_count, s.profit_sum,
+                s.gross_profit, s.gross_loss, s.rate_sum, s.rate_sq_sum, s.best_profit, s.worst_profit,
+                s.best_rate, s.worst_rate, s.hold_sum)
+    """
+
+    def _rollup_date(self, value):
+        """거래 시각/날짜 → trade_date 바인드 값 (SQLite: 'YYYY-MM-DD', Oracle: date)"""
+        if isinstance(value, datetime):
+            value = value.date()
+        elif not hasattr(value, 'isoformat'):
+            value = datetime.fromisoformat(str(value)[:10]).date()
+        return value if self.use_oracle else value.isoformat()
+
+    def _add_to_rollups(self, cursor, trades):
+        """저장된 매도 거래를 롤업에 더함 (호출한 쓰기 트랜잭션과 함께 커밋)
+
+        Args:
+            trades: TRADE_COLUMNS 키를 가진 dict 리스트 (timestamp 포함)
+        """
+        rows = []
+        for trade in trades:
+            if trade.get('trade_type') != 'SELL':
+                continue
+            profit = float(trade.get('profit') or 0)
+            rate = float(trade.get('profit_rate') or 0)
+            rows.append((
+                self._rollup_date(trade['timestamp']),
+                trade['market'],
+                trade.get('reason') or '-',
+                int(profit > 0), int(profit < 0),
+                profit, max(profit, 0), max(-profit, 0),
+                rate, rate * rate,
+                profit, profit, rate, rate,
+                float(trade.get('hold_time_minutes') or 0),
+            ))
+        if rows:
+            cursor.executemany(self.ORACLE_ROLLUP_MERGE if self.use_oracle else self.ROLLUP_UPSERT, rows)
+
+    def _backfill_trade_rollups(self, cursor):
+        """trades 전체를 한 번 집계해 롤업 채우기 (테이블을 처음 만들 때/재구성용)"""
+        trade_date = 'TRUNC(timestamp)' if self.use_oracle else 'DATE(timestamp)'
+        cursor.execute(f'''
+            INSERT INTO trade_rollups
+            (trade_date, market, reason, trade_count, win_count, loss_count, profit_sum, gross_profit,
+             gross_loss, rate_sum, rate_sq_sum, best_profit, worst_profit, best_rate, worst_rate, hold_sum)
+            SELECT trade_date, market, reason, COUNT(*),
+                   SUM(CASE WHEN profit > 0 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN profit < 0 THEN 1 ELSE 0 END),
+                   SUM(profit),
+                   SUM(CASE WHEN profit > 0 THEN profit ELSE 0 END),
+                   SUM(CASE WHEN profit < 0 THEN -profit ELSE 0 END),
+                   SUM(profit_rate), SUM(profit_rate * profit_rate),
+                   MAX(profit), MIN(profit), MAX(profit_rate), MIN(profit_rate),
+                   SUM(hold_time_minutes)
+            FROM (
+                SELECT {trade_date} AS trade_date, market, COALESCE(NULLIF(reason, ''), '-') AS reason,
+                       COALESCE(profit, 0) AS profit, COALESCE(profit_rate, 0) AS profit_rate,
+                       COALESCE(hold_time_minutes, 0) AS hold_time_minutes
+                FROM trades
+                WHERE trade_type = 'SELL'
+            ) t
+            GROUP BY trade_date, market, reason
+        ''')
+
+    def rebuild_trade_rollups(self):
+        """롤업을 trades에서 다시 계산 (수동 수정/삭제 후 맞추기용)"""
+        with self._write() as cursor:
+            cursor.execute("DELETE FROM trade_rollups")
+            self._backfill_trade_rollups(cursor)
+
     def save_trade(self, trade_data):
-        """거래 기록 저장"""
-        self.cursor.execute('''
-            INSERT INTO trades
-            (market, trade_type, price, amount, krw_amount, profit,
-             profit_rate, reason, hold_time_minutes, peak_profit)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        """거래 기록 저장 (매도는 같은 트랜잭션에서 trade_rollups 갱신)"""
+        values = (
             trade_data.get('market'),
             trade_data.get('type'),  # BUY or SELL
             trade_data.get('price'),
@@ -266,49 +1129,75 @@ class DatabaseManager:
             trade_data.get('reason', ''),
             trade_data.get('hold_time_minutes', 0),
             trade_data.get('peak_profit', 0)
-        ))
-
-        self.conn.commit()
+        )
+        with self._write() as cursor:
+            if self.use_oracle:
+                # 시각을 직접 넣어 롤업 날짜/복제 시각이 저장된 행과 일치
+                stored = dict(zip(self.TRADE_COLUMNS, values + (datetime.now(),)))
+                cursor.execute(self._oracle_binds('''
+                    INSERT INTO trades
+                    (market, trade_type, price, amount, krw_amount, profit,
+                     profit_rate, reason, hold_time_minutes, peak_profit, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                '''), values + (stored['timestamp'],))
+            else:
+                # CURRENT_TIMESTAMP와 같은 UTC 형식으로 직접 넣어 저장할 월 파티션을 정함
+                timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+                table = self._trade_table(cursor, timestamp)
+                cursor.execute(f'''
+                    INSERT INTO {table}
+                    (market, trade_type, price, amount, krw_amount, profit,
+                     profit_rate, reason, hold_time_minutes, peak_profit, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', values + (timestamp,))
+
+                # 저장된 행 그대로 → 롤업 날짜/복제 시각이 trades와 일치
+                cursor.execute(f"SELECT {', '.join(self.TRADE_COLUMNS)} FROM {table} WHERE id = ?",
+                               (cursor.lastrowid,))
+                stored = dict(zip(self.TRADE_COLUMNS, cursor.fetchone()))
+
+            self._add_to_rollups(cursor, [stored])
+            if self.journal:
+                self._journal(cursor, 'trade', stored)
 
     def save_optimization_result(self, market, params, backtest_result):
         """파라미터 최적화 결과 저장"""
 
-        # 기존 active 파라미터 비활성화
-        self.cursor.execute('''
-            UPDATE parameter_history
-            SET is_active = 0
-            WHERE market = ? AND is_active = 1
-        ''', (market,))
-
-        # 새 파라미터 저장
-        self.cursor.execute('''
-            INSERT INTO parameter_history
-            (market, optimization_date, quick_profit, take_profit_1,
-             take_profit_2, stop_loss, trailing_stop_tight,
-             trailing_stop_medium, trailing_stop_wide,
-             backtest_return, backtest_winrate, backtest_sharpe, score)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            market,
-            datetime.now(),
-            params.get('quick_profit'),
-            params.get('take_profit_1'),
-            params.get('take_profit_2', 0.025),
-            params.get('stop_loss'),
-            params.get('trailing_stop_tight'),
-            params.get('trailing_stop_medium', 0.005),
-            params.get('trailing_stop_wide', 0.008),
-            backtest_result.get('total_return'),
-            backtest_result.get('win_rate'),
-            backtest_result.get('sharpe_ratio'),
-            backtest_result.get('score')
-        ))
-
-        self.conn.commit()
+        with self._write() as cursor:
+            # 기존 active 파라미터 비활성화
+            cursor.execute('''
+                UPDATE parameter_history
+                SET is_active = 0
+                WHERE market = ? AND is_active = 1
+            ''', (market,))
+
+            # 새 파라미터 저장
+            cursor.execute('''
+                INSERT INTO parameter_history
+                (market, optimization_date, quick_profit, take_profit_1,
+                 take_profit_2, stop_loss, trailing_stop_tight,
+                 trailing_stop_medium, trailing_stop_wide,
+                 backtest_return, backtest_winrate, backtest_sharpe, score)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                market,
+                datetime.now(),
+                params.get('quick_profit'),
+                params.get('take_profit_1'),
+                params.get('take_profit_2', 0.025),
+                params.get('stop_loss'),
+                params.get('trailing_stop_tight'),
+                params.get('trailing_stop_medium', 0.005),
+                params.get('trailing_stop_wide', 0.008),
+                backtest_result.get('total_return'),
+                backtest_result.get('win_rate'),
+                backtest_result.get('sharpe_ratio'),
+                backtest_result.get('score')
+            ))
 
     def get_active_parameters(self, market):
         """현재 활성화된 최적 파라미터 조회"""
-        self.cursor.execute('''
+        rows = self._read('''
             SELECT quick_profit, take_profit_1, take_profit_2, stop_loss,
                    trailing_stop_tight, trailing_stop_medium, trailing_stop_wide,
                    optimization_date
@@ -318,7 +1207,7 @@ class DatabaseManager:
             LIMIT 1
         ''', (market,))
 
-        row = self.cursor.fetchone()
+        row = rows[0] if rows else None
 
         if row:
             return {
@@ -334,67 +1223,205 @@ class DatabaseManager:
 
         return None
 
+    # 롤업 합계 (rollup_metrics() 인자 순서)
+    ROLLUP_SUMS = ("SUM(trade_count), SUM(win_count), SUM(profit_sum), SUM(gross_profit), SUM(gross_loss), "
+                   "SUM(rate_sum), SUM(rate_sq_sum), SUM(hold_sum)")
+
+    DAILY_PERFORMANCE_UPSERT = '''
+        INSERT OR REPLACE INTO daily_performance
+        (date, total_trades, winning_trades, win_rate, total_profit,
+         best_trade, worst_trade, avg_hold_time_minutes, sharpe_ratio)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    # Oracle: 같은 날짜 행이 있으면 갱신 (INSERT OR REPLACE 대신)
+    ORACLE_DAILY_PERFORMANCE_MERGE = """
+        MERGE INTO daily_performance d
+        USING (SELECT :1 AS perf_date, :2 AS total_trades, :3 AS winning_trades, :4 AS win_rate,
+                      :5 AS total_profit, :6 AS best_trade, :7 AS worst_trade,
+                      :8 AS avg_hold_time_minutes, :9 AS sharpe_ratio FROM dual) s
+        ON (d.date = s.perf_date)
+        WHEN MATCHED THEN UPDATE SET
+            d.total_trades = s.total_trades, d.winning_trades = s.winning_trades,
+            d.win_rate = s.win_rate, d.total_profit = s.total_profit,
+            d.best_trade = s.best_trade, d.worst_trade = s.worst_trade,
+            d.avg_hold_time_minutes = s.avg_hold_time_minutes, d.sharpe_ratio = s.sharpe_ratio
+        WHEN NOT MATCHED THEN INSERT
+            (date, total_trades, winning_trades, win_rate, total_profit,
+             best_trade, worst_trade, avg_hold_time_minutes, sharpe_ratio)
+        VALUES (s.perf_date, s.total_trades, s.winning_trades, s.win_rate, s.total_profit,
+                s.best_trade, s.worst_trade, s.avg_hold_time_minutes, s.sharpe_ratio)
+    """
+
     def update_daily_performance(self, date=None):
-        """일일 성과 집계"""
+        """일일 성과 집계 (trade_rollups의 해당 날짜 행만 읽음)"""
         if date is None:
             date = datetime.now().date()
+        date = self._rollup_date(date)
+
+        # 집계와 저장을 한 트랜잭션으로 (쓰기 커넥션에서 조회)
+        select_sql = f'''
+            SELECT {self.ROLLUP_SUMS}, MAX(best_profit), MIN(worst_profit)
+            FROM trade_rollups
+            WHERE trade_date = ?
+        '''
+        if self.use_oracle:
+            select_sql = self._oracle_binds(select_sql)
+        with self._write() as cursor:
+            cursor.execute(select_sql, (date,))
+
+            row = cursor.fetchone()
+            metrics = rollup_metrics(*row[:8]) if row else None
+            if metrics is None:
+                return False
+
+            cursor.execute(self.ORACLE_DAILY_PERFORMANCE_MERGE if self.use_oracle
+                           else self.DAILY_PERFORMANCE_UPSERT, (
+                date,
+                metrics['total_trades'],
+                metrics['winning_trades'],
+                metrics['win_rate'],
+                metrics['total_profit'],
+                row[8] or 0,
+                row[9] or 0,
+                int(metrics['avg_hold_time']),
+                metrics['sharpe_ratio']
+            ))
 
-        # 해당 날짜의 거래 집계
-        self.cursor.execute('''
-            SELECT
-                COUNT(*) as total_trades,
-                SUM(CASE WHEN profit > 0 THEN 1 ELSE 0 END) as winning_trades,
-                SUM(profit) as total_profit,
-                MAX(profit) as best_trade,
-                MIN(profit) as worst_trade,
-                AVG(hold_time_minutes) as avg_hold_time
-            FROM trades
-            WHERE DATE(timestamp) = ? AND trade_type = 'SELL'
-        ''', (date,))
+        return True
 
-        row = self.cursor.fetchone()
+    def get_performance_report(self, days=30):
+        """성과 리포트 조회 (trade_rollups를 일별로 합산)
 
-        if row and row[0] > 0:
-            total_trades = row[0]
-            winning_trades = row[1] or 0
-            win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+        Returns:
+            list: [(date, total_trades, win_rate, total_profit), ...] 최근 날짜부터
+        """
+        cutoff = self._rollup_date(datetime.now().date() - timedelta(days=days))
+
+        return self._read('''
+            SELECT trade_date, SUM(trade_count), SUM(win_count) * 100.0 / SUM(trade_count), SUM(profit_sum)
+            FROM trade_rollups
+            WHERE trade_date >= ?
+            GROUP BY trade_date
+            ORDER BY trade_date DESC
+        ''', (cutoff,))
 
-            self.cursor.execute('''
-                INSERT OR REPLACE INTO daily_performance
-                (date, total_trades, winning_trades, win_rate, total_profit,
-                 best_trade, worst_trade, avg_hold_time_minutes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                date,
-                total_trades,
-                winning_trades,
-                win_rate,
-                row[2] or 0,
-                row[3] or 0,
-                row[4] or 0,
-                int(row[5] or 0)
-            ))
+    def get_trade_stats(self, days=30, market=None, group_by=None):
+        """최근 N일 매도 성과 (승률/손익비/샤프 포함, trade_rollups만 읽음)
 
-            self.conn.commit()
-            return True
+        Args:
+            days: 오늘 포함 최근 N일 (None이면 전체)
+            market: 특정 마켓만
+            group_by: None, 'trade_date', 'market', 'reason'
 
-        return False
+        Returns:
+            group_by가 None이면 rollup_metrics() dict (+ best_trade/worst_trade: 최고/최저 수익률),
+            아니면 {그룹 값: dict}. 거래가 없으면 None / {}
+        """
+        if group_by not in (None, 'trade_date', 'market', 'reason'):
+            raise ValueError(f"지원하지 않는 group_by: {group_by}")
+
+        conditions, params = [], []
+        if days is not None:
+            conditions.append("trade_date >= ?")
+            params.append(self._rollup_date(datetime.now().date() - timedelta(days=days - 1)))
+        if market:
+            conditions.append("market = ?")
+            params.append(market)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        key = f"{group_by}, " if group_by else ''
+        group = f"GROUP BY {group_by}" if group_by else ''
+
+        rows = self._read(f'''
+            SELECT {key}{self.ROLLUP_SUMS}, MAX(best_rate), MIN(worst_rate)
+            FROM trade_rollups
+            {where}
+            {group}
+        ''', tuple(params))
+
+        result = {}
+        for row in rows:
+            name, row = (row[0], row[1:]) if group_by else (None, row)
+            metrics = rollup_metrics(*row[:8])
+            if metrics:
+                metrics.update(best_trade=row[8], worst_trade=row[9])
+                result[name] = metrics
+        return result.get(None) if group_by is None else result
+
+    def _oracle_partitions(self, table):
+        """Oracle 월 파티션 [(파티션 이름, 'YYYY-MM'), ...] (p_min 제외)"""
+        rows = self.oracle.query('''
+            SELECT partition_name, high_value FROM user_tab_partitions
+            WHERE table_name = :1
+            ORDER BY partition_position
+        ''', (table.upper(),))
+        return [(name, oracle_high_value_key(high)) for name, high in rows if name != 'P_MIN']
+
+    def get_partitions(self, table):
+        """월 파티션 목록
 
-    def get_performance_report(self, days=30):
-        """성과 리포트 조회"""
-        cutoff = datetime.now().date() - timedelta(days=days)
+        Args:
+            table: 'candles' 또는 'trades'
 
-        self.cursor.execute('''
-            SELECT date, total_trades, win_rate, total_profit
-            FROM daily_performance
-            WHERE date >= ?
-            ORDER BY date DESC
-        ''', (cutoff,))
+        Returns:
+            list: 'YYYY-MM' 오름차순 (UTC 월, 월별 파티션 테이블이 아니면 None)
+        """
+        if not self.partitioned.get(table):
+            return None
+        if self.use_oracle:
+            return [key for _, key in self._oracle_partitions(table)]
+        return self.partitions[table].months(self._read)
 
-        return self.cursor.fetchall()
+    def drop_partitions(self, table, before, dry_run=False):
+        """보관 기간 정리: before('YYYY-MM') 이전 달 파티션을 통째로 삭제
+
+        행 단위 DELETE/VACUUM 없이 파티션(SQLite 테이블 / Oracle 파티션)만 지우므로
+        오래 잠그지 않습니다. 거래 롤업(trade_rollups)은 그대로 남고, 캔들은 수집 구간
+        기록(candle_coverage)도 잘라서 candle_history가 다시 받을 수 있게 합니다.
+
+        Returns:
+            list: 삭제한(dry_run이면 삭제할) 월 키, 월별 파티션 테이블이 아니면 None
+        """
+        if not self.partitioned.get(table):
+            return None
+
+        if self.use_oracle:
+            targets = [(name, key) for name, key in self._oracle_partitions(table) if key < before]
+            if not dry_run and targets:
+                with self.oracle.connection() as conn:
+                    with conn.cursor() as cursor:
+                        for name, _ in targets:
+                            cursor.execute(f"ALTER TABLE {table} DROP PARTITION {name} UPDATE INDEXES")
+            keys = [key for _, key in targets]
+        else:
+            keys = [key for key in self.partitions[table].months(self._read) if key < before]
+            if not dry_run and keys:
+                with self._write() as cursor:
+                    self.partitions[table].drop(cursor, keys)
+
+        if table == 'candles' and keys and not dry_run:
+            self._trim_candle_coverage(month_range(before)[0])
+        return keys
+
+    def _trim_candle_coverage(self, cutoff):
+        """cutoff(UTC epoch ms) 이전 수집 구간 기록 제거"""
+        delete_sql = "DELETE FROM candle_coverage WHERE end_ts <= ?"
+        update_sql = "UPDATE candle_coverage SET start_ts = ? WHERE start_ts < ?"
+        if self.use_oracle:
+            delete_sql, update_sql = self._oracle_binds(delete_sql), self._oracle_binds(update_sql)
+        with self._write() as cursor:
+            cursor.execute(delete_sql, (cutoff,))
+            cursor.execute(update_sql, (cutoff, cutoff))
 
     def close(self):
-        """연결 종료"""
+        """연결 종료 (Oracle 풀은 프로세스 공유이므로 전용 세션만 반납)"""
+        if self.replicator:
+            self.replicator.stop()
+        if self.oracle:
+            self._release_session()
+            return
+        if self.readers:
+            self.readers.close()
         self.conn.close()
 
 
@@ -0,0 +1,285 @@
+"""
+DB 아카이브 (오래된 거래/캔들을 압축 컬럼 파일로 내보낸 뒤 삭제)
+서버 측 커서에서 chunk_rows행씩 받아 바로 파일로 쓰므로 1년치 1분봉도 일정한 메모리로 처리하고,
+삭제는 짧은 트랜잭션/파티션 단위로 나눠 봇과 수집기의 쓰기를 오래 막지 않습니다.
+
+구조:
+    {DB_ARCHIVE_DIR}/manifest.jsonl   청크마다 한 줄 (파일, 테이블, 마켓/타임프레임, 월, 행 수, 범위, sha256)
+    {DB_ARCHIVE_DIR}/candles/{market}/{timeframe}/{YYYY-MM}/{첫 ts}-{마지막 ts}.npz
+    {DB_ARCHIVE_DIR}/trades/{YYYY-MM}/{첫 id}-{마지막 id}.npz
+    - .npz: 컬럼별 배열 (np.savez_compressed, allow_pickle 없이 np.load로 읽기)
+    - 캔들: ts(UTC epoch ms, int64), open/high/low/close/volume(float64)
+    - 거래: id + DatabaseManager.TRADE_COLUMNS (숫자 float64, 문자열 str)
+
+순서 (중간에 죽어도 데이터 유실 없음):
+    임시 파일에 쓰기 → fsync → 이름 변경 → manifest 기록 → 삭제
+    - 같은 구간은 같은 파일 이름이므로 다시 실행하면 덮어씀
+    - 월별 파티션: 한 달을 모두 내보낸 뒤 그 달 파티션 삭제
+    - 단일 테이블: 청크마다 delete_batch행씩 나눠 DELETE
+    - SQLite 공간 회수는 incremental_vacuum (auto_vacuum=INCREMENTAL)
+
+사용 예:
+    archiver = DBArchiver(db)
+    archiver.pending('candles', '2025-10')    # 2025-10 이전 행 수
+    archiver.archive('candles', '2025-10')    # 내보내고 삭제
+    archiver.verify()                         # manifest 체크섬 확인
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+import numpy as np
+from candle_decoder import CANDLE_COLUMNS
+from db_partitions import month_key, month_range
+
+DB_ARCHIVE_DIR = os.getenv(
+    'DB_ARCHIVE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'crypto_trading', 'archive')
+)
+
+_CANDLE_SELECT = "SELECT market, timeframe, ts, open_price, high_price, low_price, close_price, volume"
+_TEXT_COLUMNS = ('market', 'trade_type', 'reason', 'timestamp')
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _runs(rows, key):
+    """정렬된 행에서 key가 같은 연속 구간 [(key 값, 행 리스트), ...]"""
+    runs = []
+    for row in rows:
+        value = key(row)
+        if runs and runs[-1][0] == value:
+            runs[-1][1].append(row)
+        else:
+            runs.append((value, [row]))
+    return runs
+
+
+def _candle_run_key():
+    """캔들 행 → (market, timeframe, 월) (정렬된 행이라 월 경계를 넘을 때만 월 키 계산)"""
+    bounds = [0, 0, None]
+
+    def key(row):
+        if not bounds[0] <= row[2] < bounds[1]:
+            bounds[2] = month_key(row[2])
+            bounds[0], bounds[1] = month_range(bounds[2])
+        return row[0], row[1], bounds[2]
+    return key
+
+
+class DBArchiver:
+    """오래된 candles/trades → 압축 컬럼 파일 + manifest, 이후 삭제"""
+
+    def __init__(self, db, root=None, chunk_rows=100_000, delete_batch=5_000):
+        """
+        Args:
+            db: DatabaseManager
+            root: 아카이브 경로 (기본 DB_ARCHIVE_DIR)
+            chunk_rows: 커서에서 한 번에 받는 행 수 (= 파일 하나의 최대 행 수)
+            delete_batch: 단일 테이블에서 한 트랜잭션에 지우는 최대 행 수
+        """
+        self.db = db
+        self.root = root or DB_ARCHIVE_DIR
+        self.chunk_rows = chunk_rows
+        self.delete_batch = delete_batch
+        self.manifest_path = os.path.join(self.root, 'manifest.jsonl')
+        self.stats = {'files': 0, 'rows': 0, 'deleted_rows': 0, 'dropped_partitions': 0, 'bytes': 0}
+
+    # ---- 대상 ----
+
+    def _trade_cutoff(self, before):
+        """'YYYY-MM' → trades.timestamp 비교 값"""
+        if self.db.use_oracle:
+            return datetime.strptime(f"{before}-01", '%Y-%m-%d')
+        return f"{before}-01 00:00:00"
+
+    def _sources(self, table, before):
+        """내보낼 조회 목록
+
+        Returns:
+            list: [(SQL, params, 다 내보낸 뒤 drop_partitions에 줄 다음 달 키 또는 None), ...]
+        """
+        partitions = self.db.get_partitions(table)
+        order = "ORDER BY market, timeframe, ts" if table == 'candles' else "ORDER BY id"
+        columns = _CANDLE_SELECT if table == 'candles' else f"SELECT id, {', '.join(self.db.TRADE_COLUMNS)}"
+
+        if partitions is None:
+            # 단일 테이블: 기준 이전 전체를 한 커서로
+            if table == 'candles':
+                where, params = "ts < ?", (month_range(before)[0],)
+            else:
+                where, params = "timestamp < ?", (self._trade_cutoff(before),)
+            return [(f"{columns} FROM {table} WHERE {where} {order}", params, None)]
+
+        sources = []
+        for key in partitions:
+            if key >= before:
+                break
+            next_key = month_key(month_range(key)[1])
+            if not self.db.use_oracle:
+                # SQLite 파티션 테이블은 그 달 데이터뿐
+                sources.append((f"{columns} FROM {self.db.partitions[table].name(key)} {order}", (), next_key))
+            elif table == 'candles':
+                sources.append((f"{columns} FROM candles WHERE ts >= ? AND ts < ? {order}",
+                                month_range(key), next_key))
+            else:
+                sources.append((f"{columns} FROM trades WHERE timestamp >= ? AND timestamp < ? {order}",
+                                (self._trade_cutoff(key), self._trade_cutoff(next_key)), next_key))
+        return sources
+
+    def pending(self, table, before):
+        """before('YYYY-MM') 이전 행 수 (DRY RUN용)"""
+        total = 0
+        for sql, params, _ in self._sources(table, before):
+            count_sql = "SELECT COUNT(*) FROM " + sql.split(" FROM ", 1)[1].rsplit(" ORDER BY ", 1)[0]
+            total += self.db._read(count_sql, params)[0][0]
+        return total
+
+    # ---- 내보내기 ----
+
+    def archive(self, table, before):
+        """before('YYYY-MM') 이전 행을 내보내고 삭제
+
+        Returns:
+            dict: 이번 실행 통계 {'files', 'rows', 'deleted_rows', 'dropped_partitions', 'bytes'}
+        """
+        started = dict(self.stats)
+        run_key = _candle_run_key()
+        for sql, params, next_key in self._sources(table, before):
+            for rows in self.db.stream_rows(sql, params, batch_size=self.chunk_rows):
+                if table == 'candles':
+                    for (market, timeframe, month), run in _runs(rows, run_key):
+                        self._write_candles(market, timeframe, month, run, delete=next_key is None)
+                else:
+                    for month, run in _runs(rows, lambda r: str(r[-1])[:7]):
+                        self._write_trades(month, run, delete=next_key is None)
+
+            if next_key is not None:
+                # 그 달을 모두 내보낸 뒤 파티션째 삭제
+                dropped = self.db.drop_partitions(table, next_key) or []
+                self.stats['dropped_partitions'] += len(dropped)
+
+        if table == 'candles' and self.stats['deleted_rows'] > started['deleted_rows']:
+            # 행 단위로 지운 캔들도 candle_history가 다시 받을 수 있게 수집 구간 기록 정리
+            self.db._trim_candle_coverage(month_range(before)[0])
+        return {name: self.stats[name] - started[name] for name in self.stats}
+
+    def _write_candles(self, market, timeframe, month, rows, delete):
+        ts = np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows))
+        arrays = {'ts': ts}
+        for i, name in enumerate(CANDLE_COLUMNS[1:], start=3):
+            arrays[name] = np.fromiter((np.nan if row[i] is None else row[i] for row in rows),
+                                       dtype=np.float64, count=len(rows))
+
+        path = os.path.join('candles', market, str(timeframe), month, f"{ts[0]}-{ts[-1]}.npz")
+        self._write_chunk(path, arrays, {
+            'table': 'candles', 'market': market, 'timeframe': timeframe, 'month': month,
+            'start': int(ts[0]), 'end': int(ts[-1]),
+        })
+
+        if delete:
+            for i in range(0, len(ts), self.delete_batch):
+                lo, hi = int(ts[i]), int(ts[min(i + self.delete_batch, len(ts)) - 1])
+                self.stats['deleted_rows'] += self.db.execute_write(
+                    "DELETE FROM candles WHERE market = ? AND timeframe = ? AND ts >= ? AND ts <= ?",
+                    (market, timeframe, lo, hi)
+                )
+
+    def _write_trades(self, month, rows, delete):
+        columns = ('id',) + tuple(self.db.TRADE_COLUMNS)
+        arrays = {}
+        for i, name in enumerate(columns):
+            values = [row[i] for row in rows]
+            if name in _TEXT_COLUMNS:
+                arrays[name] = np.array(['' if value is None else str(value) for value in values])
+            elif name == 'id':
+                arrays[name] = np.array(values, dtype=np.int64)
+            else:
+                arrays[name] = np.array([np.nan if value is None else float(value) for value in values])
+
+        ids = arrays['id']
+        path = os.path.join('trades', month, f"{ids[0]}-{ids[-1]}.npz")
+        self._write_chunk(path, arrays, {
+            'table': 'trades', 'month': month, 'start': str(rows[0][-1]), 'end': str(rows[-1][-1]),
+            'id_start': int(ids[0]), 'id_end': int(ids[-1]),
+        })
+
+        if delete:
+            # 같은 id 범위라도 다른 달 거래는 아직 내보내지 않았을 수 있으므로 월 범위로 제한
+            month_start = self._trade_cutoff(month)
+            month_end = self._trade_cutoff(month_key(month_range(month)[1]))
+            for i in range(0, len(ids), self.delete_batch):
+                lo, hi = int(ids[i]), int(ids[min(i + self.delete_batch, len(ids)) - 1])
+                self.stats['deleted_rows'] += self.db.execute_write(
+                    "DELETE FROM trades WHERE id >= ? AND id <= ? AND timestamp >= ? AND timestamp < ?",
+                    (lo, hi, month_start, month_end)
+                )
+
+    def _write_chunk(self, relative_path, arrays, entry):
+        """임시 파일 → fsync → 이름 변경 → manifest 한 줄 추가"""
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        rows = len(next(iter(arrays.values())))
+        size = os.path.getsize(path)
+        entry = dict(entry, file=relative_path, rows=rows, bytes=size, sha256=_sha256(path),
+                     columns=list(arrays), archived_at=datetime.now().isoformat(timespec='seconds'))
+        with open(self.manifest_path, 'a') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.stats['files'] += 1
+        self.stats['rows'] += rows
+        self.stats['bytes'] += size
+
+    # ---- 확인 ----
+
+    def entries(self):
+        """manifest 항목 (같은 파일은 마지막 기록만)"""
+        latest = {}
+        try:
+            with open(self.manifest_path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        latest[entry['file']] = entry
+        except FileNotFoundError:
+            pass
+        return list(latest.values())
+
+    def verify(self):
+        """manifest의 체크섬/행 수 확인
+
+        Returns:
+            list: 문제가 있는 파일 [(파일, 사유), ...] (없으면 빈 리스트)
+        """
+        problems = []
+        for entry in self.entries():
+            path = os.path.join(self.root, entry['file'])
+            if not os.path.exists(path):
+                problems.append((entry['file'], '파일 없음'))
+            elif _sha256(path) != entry['sha256']:
+                problems.append((entry['file'], '체크섬 불일치'))
+            else:
+                with np.load(path) as data:
+                    if len(data[entry['columns'][0]]) != entry['rows']:
+                        problems.append((entry['file'], '행 수 불일치'))
+        return problems
+
+    @staticmethod
+    def load(path):
+        """아카이브 청크 → 컬럼 dict"""
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
@@ -0,0 +1,153 @@
+"""
+월별 파티션 (캔들/거래)
+보관 기간 정리를 DELETE + VACUUM 대신 오래된 달의 파티션을 통째로 삭제하고,
+조회는 필요한 달의 파티션만 읽습니다. 월 구분은 UTC 기준 (candle_store와 동일).
+
+- SQLite: 달마다 별도 테이블 {table}_pYYYYMM + 기존 이름의 UNION ALL 뷰 {table} (임시 조회/통계용)
+  DatabaseManager는 뷰를 거치지 않고 범위에 해당하는 파티션 테이블만 직접 조회
+- Oracle 캔들: IOT는 interval 파티션을 쓸 수 없으므로 월별 range 파티션을 미리 만들고 쓰기 전에 다음 달을 추가
+- Oracle 거래: interval 파티션 (새 달 파티션은 Oracle이 자동 생성)
+
+사용 예:
+    parts = SQLitePartitions('candles', CANDLES_V2_DDL['sqlite'])
+    for key, table in parts.route(fetch, start=since_ms):   # [('2026-09', 'candles_p202609'), ...]
+        ...
+"""
+import re
+import threading
+from datetime import datetime, timezone
+
+# 첫 월 파티션 (업비트 개장 이전, 그 전 데이터는 p_min 하나에)
+PARTITION_START = '2017-01'
+
+
+def month_key(ts_ms):
+    """UTC epoch ms → 'YYYY-MM' (UTC)"""
+    return datetime.fromtimestamp(ts_ms / 1000, timezone.utc).strftime('%Y-%m')
+
+
+def month_range(key):
+    """'YYYY-MM' → [월 시작, 다음 달 시작) UTC epoch ms"""
+    year, month = map(int, key.split('-'))
+    start = datetime(year, month, 1, tzinfo=timezone.utc)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+    return int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+
+
+def months_between(first, last):
+    """first ~ last 월 키 목록 (양 끝 포함)"""
+    keys = []
+    key = first
+    while key <= last:
+        keys.append(key)
+        key = month_key(month_range(key)[1])
+    return keys
+
+
+def oracle_candle_partitions(until=None):
+    """Oracle 캔들 IOT 파티션 절 (p_min + PARTITION_START부터 until(기본 다음 달)까지 월별 range)"""
+    if until is None:
+        until = month_key(month_range(month_key(datetime.now(timezone.utc).timestamp() * 1000))[1])
+    parts = [f"PARTITION p_min VALUES LESS THAN ({month_range(PARTITION_START)[0]})"]
+    for key in months_between(PARTITION_START, until):
+        parts.append(f"PARTITION p{key.replace('-', '')} VALUES LESS THAN ({month_range(key)[1]})")
+    return "PARTITION BY RANGE (ts) (\n            " + ",\n            ".join(parts) + "\n        )"
+
+
+# Oracle 거래: 월 interval 파티션 (p_min은 interval 기준점이라 삭제하지 않음)
+ORACLE_TRADES_PARTITIONS = (
+    "PARTITION BY RANGE (timestamp) INTERVAL (NUMTOYMINTERVAL(1, 'MONTH')) "
+    f"(PARTITION p_min VALUES LESS THAN (TO_DATE('{PARTITION_START}-01', 'YYYY-MM-DD')))"
+)
+
+
+def oracle_high_value_key(high_value):
+    """user_tab_partitions.high_value → 그 파티션이 담는 마지막 달 'YYYY-MM'
+
+    캔들은 epoch ms 숫자, 거래는 TIMESTAMP' 2024-02-01 00:00:00' / TO_DATE(' 2024-02-01 ...') 형식
+    """
+    text = str(high_value).strip()
+    if text.isdigit():
+        return month_key(int(text) - 1)
+    year, month = map(int, re.search(r'(\d{4})-(\d{2})-\d{2}', text).groups())
+    return f"{year - (month == 1)}-{(month - 2) % 12 + 1:02d}"
+
+
+class SQLitePartitions:
+    """SQLite 월별 파티션 테이블 ({table}_pYYYYMM) 목록 관리 + 호환 뷰 갱신
+
+    파티션 목록은 PRAGMA schema_version이 바뀔 때만 다시 읽습니다 (다른 프로세스가
+    파티션을 만들거나 지워도 다음 조회에서 반영).
+    fetch: (sql, params) → 행 리스트 (읽기 풀 또는 쓰기 커서)
+    """
+
+    def __init__(self, table, ddl):
+        """
+        Args:
+            table: 논리 테이블 이름 (candles, trades)
+            ddl: {table} 자리에 파티션 이름을 넣는 CREATE TABLE 문
+        """
+        self.table = table
+        self.ddl = ddl
+        self._lock = threading.Lock()
+        self._version = None
+        self._months = []
+
+    def name(self, key):
+        """'YYYY-MM' → 파티션 테이블 이름"""
+        return f"{self.table}_p{key.replace('-', '')}"
+
+    def months(self, fetch):
+        """저장된 파티션 월 (오름차순 'YYYY-MM')"""
+        version = fetch("PRAGMA schema_version", ())[0][0]
+        with self._lock:
+            if version != self._version:
+                rows = fetch("SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ?",
+                             (f"{self.table}_p[0-9][0-9][0-9][0-9][0-9][0-9]",))
+                suffix = len(self.table) + 2
+                self._months = sorted(f"{name[suffix:suffix + 4]}-{name[suffix + 4:]}" for (name,) in rows)
+                self._version = version
+            return list(self._months)
+
+    def route(self, fetch, start=None, end=None):
+        """[start, end) UTC epoch ms에 걸친 파티션만
+
+        Returns:
+            list: [(월 키, 테이블 이름), ...] 오름차순
+        """
+        routed = []
+        for key in self.months(fetch):
+            lo, hi = month_range(key)
+            if (start is not None and hi <= start) or (end is not None and lo >= end):
+                continue
+            routed.append((key, self.name(key)))
+        return routed
+
+    def ensure(self, cursor, key):
+        """쓰기 트랜잭션 안에서 파티션이 없으면 만들고 뷰 갱신
+
+        Returns:
+            str: 파티션 테이블 이름
+        """
+        if key not in self.months(lambda sql, params: cursor.execute(sql, params).fetchall()):
+            cursor.execute(self.ddl.format(table=self.name(key)))
+            self._rebuild_view(cursor)
+        return self.name(key)
+
+    def drop(self, cursor, keys):
+        """쓰기 트랜잭션 안에서 파티션 삭제 후 뷰 갱신"""
+        for key in keys:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.name(key)}")
+        self._rebuild_view(cursor)
+
+    def _rebuild_view(self, cursor):
+        """{table} 뷰 = 모든 파티션 UNION ALL"""
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ? ORDER BY name",
+                       (f"{self.table}_p[0-9][0-9][0-9][0-9][0-9][0-9]",))
+        names = [name for (name,) in cursor.fetchall()]
+        cursor.execute(f"DROP VIEW IF EXISTS {self.table}")
+        if names:
+            cursor.execute(f"CREATE VIEW {self.table} AS " +
+                           " UNION ALL ".join(f"SELECT * FROM {name}" for name in names))
+        with self._lock:
+            self._version = None
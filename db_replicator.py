@@ -0,0 +1,185 @@
+"""
+로컬 우선 저장 + 비동기 Oracle 복제
+봇은 로컬 SQLite에만 커밋하고(거래 경로에 WAN 왕복 없음), 백그라운드 스레드가
+replication_log를 배치로 읽어 Oracle에 MERGE로 반영합니다.
+
+- 저널: save_trade/ingest_candles와 같은 로컬 트랜잭션에 기록 (쓰기와 저널이 함께 커밋)
+- 전송 위치(high-water mark): 로컬 replication_state에 영구 저장 → 재시작해도 이어서 전송
+- 멱등: 거래/캔들 모두 MERGE(이미 있으면 건너뜀)이므로 전송 후 위치 기록 전에 죽어도 중복 없음
+- Oracle 장애: 지수 백오프로 재시도, 그동안 저널은 로컬에 쌓임 (다른 SQLite 파일로 바뀌지 않음)
+- 단일 담당: 같은 DB 파일을 여는 프로세스(봇, 수집기)가 각자 복제 스레드를 띄워도 로컬
+  replication_lease 임대를 가진 하나만 전송 (Oracle 거래 MERGE는 동시 실행 시 중복 삽입될 수 있음)
+  담당 프로세스가 죽으면 lease_ttl 후 다른 프로세스가 이어받음
+
+환경변수:
+- USE_ORACLE_DB=true: Oracle 사용
+- ORACLE_REPLICATION: async(기본, 로컬 저널 + 복제) / sync(기존처럼 Oracle에 직접 커밋)
+
+사용 예:
+    db = open_trading_db()       # 로컬 저널 DB + 복제 스레드 (Oracle 미사용이면 일반 SQLite)
+    db.save_trade({...})         # 로컬 커밋만 (< 1ms)
+    db.replicator.get_stats()
+"""
+import os
+import threading
+import time
+import uuid
+from database_manager import DatabaseManager
+
+
+class OracleReplicator:
+    """replication_log → Oracle 배치 복제 스레드"""
+
+    def __init__(self, local, target_factory=None, target='oracle', interval=1.0, batch_size=500,
+                 max_backoff=300, lease_ttl=60):
+        """
+        Args:
+            local: 저널을 쓰는 로컬 DatabaseManager (journal=True)
+            target_factory: 복제 대상 DatabaseManager 생성 함수 (기본 Oracle)
+            target: 전송 위치를 기록할 대상 이름
+            interval: 저널 확인 주기 (초)
+            batch_size: 한 번에 전송할 저널 항목 수
+            max_backoff: 실패 시 최대 재시도 대기 (초)
+            lease_ttl: 복제 담당 임대 시간 (초, 배치마다 연장)
+        """
+        self.local = local
+        self.target_factory = target_factory or (lambda: DatabaseManager(use_oracle=True))
+        self.target = target
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_backoff = max_backoff
+        self.lease_ttl = lease_ttl
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        self._db = None
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._backoff = 0
+
+        self.stats = {'batches': 0, 'trades': 0, 'candle_ranges': 0, 'failures': 0,
+                      'last_error': None, 'last_success': None, 'leader': False}
+
+    def start(self):
+        """복제 스레드 시작"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='oracle-replicator', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=10):
+        """남은 저널을 timeout 안에서 전송 시도 후 종료"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                return
+        if self.stats['leader']:
+            self.local.release_replication_lease(self.target, self.owner)
+            self.stats['leader'] = False
+        if self._db:
+            self._db.close()
+            self._db = None
+
+    def notify(self):
+        """다음 주기를 기다리지 않고 바로 전송"""
+        self._wakeup.set()
+
+    def _target_db(self):
+        if self._db is None:
+            db = self.target_factory()
+            if not db.use_oracle and self.target == 'oracle':
+                # DatabaseManager는 Oracle 연결 실패 시 SQLite로 바꾸므로 여기서는 실패로 처리
+                db.close()
+                raise ConnectionError("Oracle 연결 실패")
+            self._db = db
+        return self._db
+
+    def _run(self):
+        while True:
+            try:
+                while self._hold_lease() and self.ship_batch():
+                    pass
+                self._backoff = 0
+            except Exception as e:
+                self.stats['failures'] += 1
+                self.stats['last_error'] = str(e)
+                self._backoff = min(max(self._backoff * 2, self.interval * 2), self.max_backoff)
+                print(f"⚠️ Oracle 복제 실패 ({self._backoff:.0f}초 후 재시도): {e}")
+                if self._db:
+                    self._db.close()
+                    self._db = None
+
+            if self._stop.is_set():
+                break
+            self._wakeup.wait(self._backoff or self.interval)
+            self._wakeup.clear()
+
+    def _hold_lease(self):
+        """복제 담당 임대 획득/연장 (다른 프로세스가 담당 중이면 대기)"""
+        leader = self.local.acquire_replication_lease(self.target, self.owner, self.lease_ttl)
+        if leader != self.stats['leader']:
+            print("✅ Oracle 복제 담당" if leader else "ℹ️ 다른 프로세스가 Oracle 복제 담당 - 대기")
+            self.stats['leader'] = leader
+        return leader
+
+    def ship_batch(self):
+        """저널 한 배치 전송
+
+        Returns:
+            bool: 전송한 항목이 있으면 True (실패 시 예외)
+        """
+        entries = self.local.read_journal(self.target, limit=self.batch_size)
+        if not entries:
+            return False
+
+        trades = []
+        ranges = {}  # {(market, timeframe): [start, end]} - 같은 마켓 구간은 합쳐 한 번에
+        for _, kind, payload in entries:
+            if kind == 'trade':
+                trades.append(payload)
+            elif kind == 'candles':
+                key = (payload['market'], payload['timeframe'])
+                bounds = ranges.setdefault(key, [payload['start'], payload['end']])
+                bounds[0] = min(bounds[0], payload['start'])
+                bounds[1] = max(bounds[1], payload['end'])
+
+        db = self._target_db()
+        for (market, timeframe), (start, end) in ranges.items():
+            columns = self.local.query_candles(market, timeframe, start=start, end=end + 1)
+            result = db.ingest_candle_columns(market, timeframe, columns)
+            if result['errors']:
+                raise RuntimeError(f"캔들 복제 실패 ({market} {timeframe}): {result['errors']}건")
+        db.merge_trades(trades)
+
+        # 대상에 커밋된 뒤에만 전송 위치 이동
+        self.local.ack_journal(self.target, entries[-1][0])
+        self.stats['batches'] += 1
+        self.stats['trades'] += len(trades)
+        self.stats['candle_ranges'] += len(ranges)
+        self.stats['last_success'] = time.time()
+        return True
+
+    def get_stats(self):
+        """복제 통계 (+ 미전송 항목 수, 가장 오래된 미전송 시각)"""
+        pending, oldest = self.local.journal_backlog(self.target)
+        return dict(self.stats, pending=pending, oldest_pending=oldest, backoff=self._backoff)
+
+
+def open_trading_db(read_pool_size=4):
+    """봇/수집기용 DB
+
+    USE_ORACLE_DB=true이고 ORACLE_REPLICATION이 sync가 아니면 로컬 저널 SQLite +
+    Oracle 복제 스레드, 그 외에는 기존과 같은 DatabaseManager.
+    """
+    use_oracle = os.environ.get('USE_ORACLE_DB', 'false').lower() == 'true'
+    mode = os.environ.get('ORACLE_REPLICATION', 'async').lower()
+    if not use_oracle or mode == 'sync':
+        return DatabaseManager(use_oracle=use_oracle, read_pool_size=read_pool_size)
+
+    db = DatabaseManager(use_oracle=False, read_pool_size=read_pool_size, journal=True)
+    db.replicator = OracleReplicator(db).start()
+    print("✅ 로컬 저널 + Oracle 비동기 복제")
+    return db
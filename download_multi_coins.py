@@ -3,87 +3,86 @@
 여러 코인 데이터 다운로드 (업비트)
 BTC, ETH, SOL, XRP 등
 """
-import requests
 import pandas as pd
 from datetime import datetime
 import time
+from upbit_api import UpbitAPI
+from candle_decoder import KST_OFFSET_MS, concat_columns
+from candle_store import CandleStore
 
 
-def download_upbit_candles(market='KRW-BTC', unit=240, start_date='2022-01-01'):
-    """업비트 캔들 데이터 다운로드"""
+def download_upbit_candles(market='KRW-BTC', unit=240, start_date='2022-01-01', store=None):
+    """업비트 캔들 데이터 다운로드 (캔들 저장소에 없는 구간만 받아 추가)
+
+    저장소 마지막 봉 이후를 받아 뒤에 붙이고, start_date가 저장된 첫 봉보다 이르면
+    그 앞 구간도 받아 앞에 채웁니다.
+
+    Returns:
+        DataFrame (시간 오름차순) 또는 None
+    """
     print(f"\n{'='*80}")
     print(f"{market} {unit}분봉 다운로드 중...")
     print(f"{'='*80}")
 
-    base_url = f"https://api.upbit.com/v1/candles/minutes/{unit}"
-    all_data = []
-    to_timestamp = None
-    request_count = 0
+    store = store or CandleStore()
+    timeframe = f"{unit}m"
     target_start = datetime.strptime(start_date, '%Y-%m-%d')
+    target_start_ms = int(pd.Timestamp(target_start).value // 10**6) - KST_OFFSET_MS
+
+    api = UpbitAPI(None, None)
+    first = store.first_ts(market, timeframe)
+    last = store.last_ts(market, timeframe)
+
+    def fetch(start, end=None):
+        # 페이지를 컬럼 배열로 받아 연결 (다음 페이지는 선요청, 요청 제한은 UpbitAPI가 관리)
+        # 페이지는 최신 → 과거 순이므로 뒤집어서 연결
+        chunks = list(api.iter_candles(
+            market, unit, start=start, end=end, limit=500 * UpbitAPI.CANDLE_PAGE_SIZE, as_arrays=True
+        ))
+        chunks.reverse()
+        return concat_columns(chunks)
+
+    try:
+        # 저장된 첫 봉 이전 구간 (start_date를 앞당긴 경우)
+        if first is not None and target_start_ms < first:
+            first_kst = pd.Timestamp(first + KST_OFFSET_MS, unit='ms').to_pydatetime()
+            print(f"  📦 저장소 첫 봉: {first_kst} (이전 구간 다운로드)")
+            prepended = store.prepend(market, timeframe, fetch(target_start, first_kst))
+            print(f"  ⏪ 저장소 앞에 {prepended}개 추가")
+
+        # 저장된 마지막 봉 이후
+        fetch_start = target_start
+        if last is not None:
+            fetch_start = max(target_start, pd.Timestamp(last + KST_OFFSET_MS, unit='ms').to_pydatetime())
+            print(f"  📦 저장소 마지막 봉: {fetch_start} (이후만 다운로드)")
+        columns = fetch(fetch_start)
+    except Exception as e:
+        print(f"  ❌ 오류: {e}")
+        return None
 
-    while True:
-        params = {
-            'market': market,
-            'count': 200
-        }
-
-        if to_timestamp:
-            params['to'] = to_timestamp
-
-        try:
-            response = requests.get(base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            if not data:
-                break
-
-            request_count += 1
-            all_data.extend(data)
-
-            oldest_candle_time = data[-1]['candle_date_time_kst']
-            oldest_dt = datetime.fromisoformat(oldest_candle_time.replace('Z', '+00:00'))
-
-            if request_count % 20 == 0:
-                print(f"  {len(all_data)}개 수집 중...")
-
-            if oldest_dt.replace(tzinfo=None) <= target_start:
-                print(f"  ✅ 목표 날짜 도달! 총 {len(all_data)}개")
-                break
-
-            to_timestamp = oldest_candle_time
-            time.sleep(0.12)
-
-            if request_count >= 500:
-                print(f"  ⚠️ 최대 요청 도달")
-                break
-
-        except Exception as e:
-            print(f"  ❌ 오류: {e}")
-            break
-
-    return all_data
+    if columns is not None:
+        # 진행 중인 봉은 추가 후 고칠 수 없으므로 완성된 봉만 저장
+        closed = columns['ts'] + unit * 60000 <= int(time.time() * 1000)
+        columns = {key: values[closed] for key, values in columns.items()}
+    added = store.append(market, timeframe, columns)
+    print(f"  ➕ 저장소에 {added}개 추가")
+
+    df = store.load(market, timeframe, start=target_start_ms, as_frame=True)
+    if df is not None:
+        print(f"  ✅ 총 {len(df)}개")
+        first = store.first_ts(market, timeframe)
+        if first - target_start_ms >= unit * 60000:
+            # 상장 이전이거나 다운로드 한도(limit)에 걸린 경우
+            first_kst = pd.Timestamp(first + KST_OFFSET_MS, unit='ms')
+            print(f"  ⚠️ 요청 시작일({start_date})보다 짧은 기록: {first_kst}부터")
+    return df
 
 
-def process_and_save(data, filename):
-    """데이터 처리 및 저장"""
-    if not data:
+def process_and_save(df, filename):
+    """데이터 저장"""
+    if df is None or df.empty:
         return None
 
-    df = pd.DataFrame(data)
-    df = df[[
-        'candle_date_time_kst',
-        'opening_price',
-        'high_price',
-        'low_price',
-        'trade_price',
-        'candle_acc_trade_volume'
-    ]].copy()
-
-    df.columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df = df.sort_values('timestamp').reset_index(drop=True)
-
     df.to_csv(filename, index=False, encoding='utf-8-sig')
     print(f"  💾 저장: {filename}")
     print(f"     기간: {df['timestamp'].min()} ~ {df['timestamp'].max()}")
@@ -114,7 +113,7 @@ def main():
             start_date='2022-01-01'
         )
 
-        if data:
+        if data is not None:
             filename = f'upbit_{symbol}_4h.csv'
             process_and_save(data, filename)
 
@@ -0,0 +1,142 @@
+"""
+ccxt 거래소 인스턴스 공유
+거래소(+API 키/옵션)마다 인스턴스를 프로세스에서 하나만 만들어 요청 제한 상태와
+마켓 정보를 공유하고, load_markets() 결과를 디스크에 TTL 캐시로 저장합니다.
+
+- 마켓 캐시: CCXT_CACHE_DIR (기본 ~/.cache/crypto_trading), TTL 기본 6시간
+- fetch_ohlcv_range(): 페이지 시작 시각을 미리 계산해 여러 페이지를 동시에 요청
+
+사용 예:
+    exchange = get_exchange('binance')
+    markets = load_markets(exchange)              # 캐시 있으면 수 ms
+    ohlcv = fetch_ohlcv_range(exchange, 'BTC/USDT', '5m', since)
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import ccxt
+
+MARKET_CACHE_DIR = os.getenv('CCXT_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'crypto_trading'))
+MARKET_CACHE_TTL = 6 * 3600
+
+_exchanges = {}  # {(exchange_id, apiKey, options): ccxt 인스턴스}
+_lock = threading.Lock()
+_market_locks = {}
+
+
+def get_exchange(exchange_id='binance', config=None):
+    """공유 ccxt 인스턴스 (같은 거래소/키/옵션이면 같은 인스턴스)
+
+    Args:
+        exchange_id: ccxt 거래소 id ('binance', 'upbit' ...)
+        config: ccxt 생성 옵션 (apiKey, secret, options ...)
+    """
+    config = dict(config or {})
+    config.setdefault('enableRateLimit', True)
+    key = (
+        exchange_id,
+        config.get('apiKey'),
+        json.dumps(config.get('options') or {}, sort_keys=True),
+    )
+    with _lock:
+        exchange = _exchanges.get(key)
+        if exchange is None:
+            exchange = getattr(ccxt, exchange_id)(config)
+            _exchanges[key] = exchange
+            _market_locks[id(exchange)] = threading.Lock()
+    # 마켓 정보를 디스크 캐시에서 미리 채워 fetch_ohlcv 등의 암묵적 load_markets 요청을 막음
+    try:
+        load_markets(exchange)
+    except Exception as e:
+        print(f"⚠️ 마켓 로딩 실패 ({exchange_id}): {e}")
+    return exchange
+
+
+def _cache_path(exchange):
+    default_type = (exchange.options or {}).get('defaultType', 'spot')
+    return os.path.join(MARKET_CACHE_DIR, f"{exchange.id}_{default_type}_markets.json")
+
+
+def load_markets(exchange, ttl=MARKET_CACHE_TTL, reload=False):
+    """load_markets() + 디스크 캐시
+
+    Args:
+        ttl: 캐시 유효 시간 (초)
+        reload: True면 캐시 무시하고 새로 조회
+
+    Returns:
+        dict: {symbol: market} (조회 실패 시 예외)
+    """
+    lock = _market_locks.get(id(exchange)) or threading.Lock()
+    with lock:
+        if exchange.markets and not reload:
+            return exchange.markets
+
+        path = _cache_path(exchange)
+        if not reload:
+            try:
+                if time.time() - os.path.getmtime(path) < ttl:
+                    with open(path, encoding='utf-8') as f:
+                        cached = json.load(f)
+                    return exchange.set_markets(cached['markets'], cached.get('currencies'))
+            except (OSError, ValueError, KeyError):
+                pass
+
+        markets = exchange.load_markets(reload=True)
+        try:
+            os.makedirs(MARKET_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'markets': list(markets.values()), 'currencies': exchange.currencies}, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ 마켓 캐시 저장 실패: {e}")
+        return markets
+
+
+def fetch_ohlcv_range(exchange, symbol, timeframe, since, until=None, limit=1000, max_workers=4):
+    """기간 OHLCV 조회 (페이지 병렬 요청)
+
+    봉 간격이 고정이므로 페이지 i의 시작 시각은 since + i × limit × 봉길이로 미리 알 수 있습니다.
+    max_workers개 페이지를 동시에 요청하고 결과는 시간순으로 이어 붙입니다.
+
+    Args:
+        since: 시작 epoch ms
+        until: 끝 epoch ms (None이면 현재)
+        limit: 페이지당 봉 개수
+        max_workers: 동시 요청 수 (1이면 순차)
+
+    Returns:
+        list: [[timestamp, open, high, low, close, volume], ...] 시간 오름차순
+              (중간 페이지 실패 시 그 앞까지만)
+    """
+    try:
+        # 페이지 스레드들이 각자 load_markets를 부르지 않도록 먼저 채움
+        load_markets(exchange)
+    except Exception as e:
+        print(f"❌ {e}")
+        return []
+
+    step = exchange.parse_timeframe(timeframe) * 1000 * limit
+    until = until or exchange.milliseconds()
+    starts = list(range(int(since), int(until), step))
+
+    def fetch(start):
+        rows = exchange.fetch_ohlcv(symbol, timeframe, start, limit)
+        # 빈 구간이 있으면 다음 페이지 범위까지 내려오므로 이 페이지 구간만 사용
+        return [row for row in rows if start <= row[0] < min(start + step, until)]
+
+    all_ohlcv = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [executor.submit(fetch, start) for start in starts]
+        for future in futures:
+            try:
+                all_ohlcv.extend(future.result())
+            except Exception as e:
+                print(f"❌ {e}")
+                for pending in futures:
+                    pending.cancel()
+                break
+    return all_ohlcv
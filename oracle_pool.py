@@ -0,0 +1,177 @@
+"""
+Oracle 커넥션 풀
+프로세스마다 wallet을 한 번만 풀고, oracledb 세션 풀을 공유해 봇/수집기/스크립트가
+시작할 때마다 수 초짜리 TLS 연결을 새로 맺지 않도록 합니다.
+작업마다 풀에서 세션을 빌려 자기 커서로 실행하므로 여러 스레드에서 동시에 써도 안전합니다.
+
+환경변수:
+- ORACLE_DB_USER / ORACLE_DB_PASSWORD / ORACLE_DB_DSN
+- ORACLE_WALLET_BASE64: wallet.zip (base64), ORACLE_WALLET_DIR: 압축 해제 위치 (기본 /tmp/wallet)
+- ORACLE_WALLET_PASSWORD: ewallet.pem 비밀번호 (없으면 ORACLE_DB_PASSWORD)
+- ORACLE_POOL_MIN / ORACLE_POOL_MAX: 세션 수 (기본 1 / 4)
+- ORACLE_STMT_CACHE_SIZE: 세션당 문장 캐시 크기 (기본 40)
+
+사용 예:
+    pool = get_oracle_pool()
+    rows = pool.query("SELECT ... WHERE market = :1", ('KRW-BTC',))
+    with pool.transaction() as cursor:
+        cursor.executemany(...)
+"""
+import base64
+import hashlib
+import os
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+
+_wallet_dir = None
+_wallet_lock = threading.Lock()
+
+_shared_pool = None
+_pool_lock = threading.Lock()
+
+
+def materialize_wallet():
+    """ORACLE_WALLET_BASE64를 한 번만 풀어 TNS_ADMIN으로 설정
+
+    같은 wallet이 이미 풀려 있으면 (다른 프로세스 포함) 다시 풀지 않습니다.
+
+    Returns:
+        str: wallet 디렉터리 (wallet 설정이 없으면 None)
+    """
+    global _wallet_dir
+    with _wallet_lock:
+        if _wallet_dir is not None:
+            return _wallet_dir
+
+        wallet_base64 = os.environ.get('ORACLE_WALLET_BASE64')
+        if not wallet_base64:
+            return None
+
+        wallet_dir = os.environ.get('ORACLE_WALLET_DIR', '/tmp/wallet')
+        data = base64.b64decode(wallet_base64)
+        digest = hashlib.sha256(data).hexdigest()
+        marker = os.path.join(wallet_dir, '.wallet_sha256')
+
+        try:
+            with open(marker) as f:
+                extracted = f.read().strip() == digest
+        except OSError:
+            extracted = False
+
+        if not extracted:
+            os.makedirs(wallet_dir, exist_ok=True)
+            wallet_path = os.path.join(wallet_dir, 'wallet.zip')
+            with open(wallet_path, 'wb') as f:
+                f.write(data)
+            with zipfile.ZipFile(wallet_path, 'r') as zip_ref:
+                zip_ref.extractall(wallet_dir)
+
+            # sqlnet.ora 파일 수정 (WALLET_LOCATION을 실제 경로로 변경)
+            with open(os.path.join(wallet_dir, 'sqlnet.ora'), 'w') as f:
+                f.write(f'WALLET_LOCATION = (SOURCE = (METHOD = file) (METHOD_DATA = (DIRECTORY="{wallet_dir}")))\n')
+                f.write('SSL_SERVER_DN_MATCH=yes\n')
+            with open(marker, 'w') as f:
+                f.write(digest)
+
+        # TNS_ADMIN 환경변수 설정 (tnsnames.ora 별칭 DSN 사용)
+        os.environ['TNS_ADMIN'] = wallet_dir
+        _wallet_dir = wallet_dir
+        return wallet_dir
+
+
+class OraclePool:
+    """oracledb 세션 풀 (작업마다 세션 대여 + 대기 시간 측정)"""
+
+    def __init__(self, user=None, password=None, dsn=None, min_sessions=None, max_sessions=None,
+                 stmtcachesize=None):
+        import oracledb
+
+        wallet_dir = materialize_wallet()
+        params = {
+            'user': user or os.environ.get('ORACLE_DB_USER', 'ADMIN'),
+            'password': password or os.environ.get('ORACLE_DB_PASSWORD'),
+            # DSN은 tnsnames.ora의 별칭 사용 (wallet 사용 시 기본값: cryptodb_tpurgent)
+            'dsn': dsn or os.environ.get('ORACLE_DB_DSN', 'cryptodb_tpurgent' if wallet_dir else None),
+            'min': min_sessions or int(os.environ.get('ORACLE_POOL_MIN', 1)),
+            'max': max_sessions or int(os.environ.get('ORACLE_POOL_MAX', 4)),
+            'increment': 1,
+            'getmode': oracledb.POOL_GETMODE_WAIT,
+            'stmtcachesize': stmtcachesize or int(os.environ.get('ORACLE_STMT_CACHE_SIZE', 40)),
+            'ping_interval': 60,
+        }
+        if wallet_dir:
+            params.update(
+                config_dir=wallet_dir,
+                wallet_location=wallet_dir,
+                wallet_password=os.environ.get('ORACLE_WALLET_PASSWORD') or os.environ.get('ORACLE_DB_PASSWORD'),
+            )
+
+        started = time.perf_counter()
+        self.pool = oracledb.create_pool(**params)
+        self.connect_ms = (time.perf_counter() - started) * 1000
+        self.stats = {'acquires': 0, 'acquire_wait_ms': 0.0, 'queries': 0, 'writes': 0}
+
+    def acquire(self):
+        """세션 대여 (close()하면 풀로 반납)"""
+        started = time.perf_counter()
+        conn = self.pool.acquire()
+        self.stats['acquires'] += 1
+        self.stats['acquire_wait_ms'] += (time.perf_counter() - started) * 1000
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """세션 대여 (블록이 끝나면 반납)"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.pool.release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """쓰기 트랜잭션 (커밋/롤백 포함)
+
+        사용 예:
+            with pool.transaction() as cursor:
+                cursor.executemany(...)
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+                self.stats['writes'] += 1
+
+    def query(self, sql, params=()):
+        """SELECT 실행 후 전체 행 반환"""
+        with self.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(sql, params)
+                self.stats['queries'] += 1
+                return cursor.fetchall()
+
+    def get_stats(self):
+        """풀 상태 (열린/사용 중 세션 포함)"""
+        return dict(self.stats, opened=self.pool.opened, busy=self.pool.busy,
+                    max=self.pool.max, connect_ms=self.connect_ms)
+
+    def close(self):
+        self.pool.close(force=True)
+
+
+def get_oracle_pool():
+    """프로세스 전역 Oracle 풀 (처음 호출할 때 생성, 연결 실패 시 예외)"""
+    global _shared_pool
+    with _pool_lock:
+        if _shared_pool is None:
+            _shared_pool = OraclePool()
+            print(f"✅ Oracle 커넥션 풀 생성 ({_shared_pool.connect_ms:.0f}ms)")
+        return _shared_pool
@@ -0,0 +1,254 @@
+"""
+주문 체결 추적기
+주문 uuid를 등록하면 백그라운드 스레드가 적응형 간격으로 상태를 조회하고,
+체결 완료(done/cancel) 또는 시간 초과 시 Future/콜백으로 체결 요약을 전달합니다.
+
+- 조회 간격: min_interval부터 backoff 배수로 늘려 max_interval까지
+  (체결량이 늘면 다시 min_interval로)
+- 체결가: trades의 funds/volume 합으로 VWAP 계산 (부분 체결 포함)
+- 여러 주문이 동시에 조회 시점이 되면 /v1/orders/uuids 한 번으로 상태를 확인하고,
+  완료된 주문만 단건 조회로 trades를 가져옴
+
+사용 예:
+    tracker = OrderTracker(upbit)
+    result = upbit.order_market_buy('KRW-BTC', 10000)
+    future = tracker.track(result['uuid'], callback=on_fill)   # 즉시 반환
+    fill = future.result(timeout=10)                          # 필요하면 대기
+    fill['avg_price'], fill['executed_volume']
+"""
+import threading
+import time
+from concurrent.futures import Future
+
+FINAL_STATES = ('done', 'cancel')
+
+
+def summarize_order(order_info):
+    """주문 조회 응답 → 체결 요약
+
+    Returns:
+        dict: {
+            'uuid', 'market', 'side', 'state',
+            'executed_volume': 체결 수량,
+            'funds': 체결 금액 (KRW, 수수료 제외),
+            'avg_price': VWAP 체결가 (체결 없으면 None),
+            'paid_fee': 수수료,
+            'remaining_volume': 미체결 수량,
+            'filled': 체결 여부 (부분 포함),
+            'final': done/cancel 여부,
+            'timed_out': 추적 시간 초과 여부
+        }
+    """
+    trades = order_info.get('trades') or []
+    volume = sum(float(t['volume']) for t in trades)
+    funds = sum(float(t['funds']) for t in trades)
+    executed = float(order_info.get('executed_volume') or 0)
+
+    if volume > 0:
+        avg_price = funds / volume
+    elif executed > 0 and order_info.get('price'):
+        # trades 없이 체결량만 있으면 (지정가) 주문가 사용
+        avg_price = float(order_info['price'])
+        funds = avg_price * executed
+    else:
+        avg_price = None
+
+    return {
+        'uuid': order_info.get('uuid'),
+        'market': order_info.get('market'),
+        'side': order_info.get('side'),
+        'state': order_info.get('state'),
+        'executed_volume': executed or volume,
+        'funds': funds,
+        'avg_price': avg_price,
+        'paid_fee': float(order_info.get('paid_fee') or 0),
+        'remaining_volume': float(order_info.get('remaining_volume') or 0),
+        'filled': (executed or volume) > 0,
+        'final': order_info.get('state') in FINAL_STATES,
+        'timed_out': False,
+    }
+
+
+class _TrackedOrder:
+    def __init__(self, uuid, callback, deadline, interval):
+        self.uuid = uuid
+        self.callback = callback
+        self.deadline = deadline
+        self.interval = interval
+        self.next_poll = time.monotonic()
+        self.last_executed = None
+        self.last_info = None
+        self.future = Future()
+
+
+class OrderTracker:
+    """주문 체결 추적기 (백그라운드 스레드 1개로 모든 주문 조회)"""
+
+    def __init__(self, upbit, min_interval=0.1, max_interval=2.0, backoff=1.5, timeout=30, batch=True):
+        """
+        Args:
+            upbit: UpbitAPI (get_order, get_orders_by_uuids 사용)
+            min_interval: 첫 조회 및 체결 진행 시 조회 간격 (초)
+            max_interval: 최대 조회 간격 (초)
+            backoff: 변화 없을 때 간격 증가 배수
+            timeout: 주문당 최대 추적 시간 (초, 초과 시 마지막 상태로 완료)
+            batch: 2건 이상 동시 조회 시 일괄 조회 사용
+        """
+        self.upbit = upbit
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self.batch = batch and hasattr(upbit, 'get_orders_by_uuids')
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._orders = {}  # {uuid: _TrackedOrder}
+        self._thread = None
+        self._running = False
+
+        self.stats = {'tracked': 0, 'polls': 0, 'batch_polls': 0, 'filled': 0, 'timeouts': 0}
+
+    def track(self, uuid, callback=None, timeout=None):
+        """주문 추적 등록 (즉시 반환)
+
+        Args:
+            uuid: 주문 uuid
+            callback: 완료 시 호출 fn(fill) - 추적 스레드에서 실행
+            timeout: 추적 시간 (None이면 기본값)
+
+        Returns:
+            Future: 결과는 summarize_order() 형식의 체결 요약
+        """
+        order = _TrackedOrder(
+            uuid, callback,
+            time.monotonic() + (timeout or self.timeout),
+            self.min_interval
+        )
+        with self._wakeup:
+            existing = self._orders.get(uuid)
+            if existing is not None:
+                return existing.future
+            self._orders[uuid] = order
+            self.stats['tracked'] += 1
+            self._ensure_thread()
+            self._wakeup.notify()
+        return order.future
+
+    def wait(self, uuid, timeout=None):
+        """주문 추적 후 체결 요약이 나올 때까지 대기 (동기 코드용)"""
+        timeout = timeout or self.timeout
+        return self.track(uuid, timeout=timeout).result(timeout=timeout + self.max_interval + 5)
+
+    def pending(self):
+        """추적 중인 주문 uuid 목록"""
+        with self._lock:
+            return list(self._orders)
+
+    def stop(self):
+        """추적 스레드 종료 (남은 주문은 마지막 상태로 완료)"""
+        with self._wakeup:
+            self._running = False
+            self._wakeup.notify()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name='order-tracker', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                if not self._running:
+                    remaining = list(self._orders.values())
+                    self._orders.clear()
+                    break
+                if not self._orders:
+                    self._wakeup.wait()
+                    continue
+
+                now = time.monotonic()
+                due = [o for o in self._orders.values() if o.next_poll <= now]
+                if not due:
+                    next_poll = min(o.next_poll for o in self._orders.values())
+                    self._wakeup.wait(next_poll - now)
+                    continue
+
+            if self.batch and len(due) > 1:
+                self._poll_batch(due)
+            else:
+                for order in due:
+                    self._poll(order)
+
+        for order in remaining:
+            self._complete(order, timed_out=True)
+
+    def _poll(self, order):
+        try:
+            info = self.upbit.get_order(order.uuid)
+        except Exception as e:
+            print(f"⚠️ 주문 조회 실패 ({order.uuid}): {e}")
+            info = None
+        self.stats['polls'] += 1
+        self._update(order, info)
+
+    def _poll_batch(self, due):
+        try:
+            infos = self.upbit.get_orders_by_uuids([order.uuid for order in due])
+        except Exception as e:
+            print(f"⚠️ 주문 일괄 조회 실패: {e}")
+            infos = {}
+        self.stats['polls'] += 1
+        self.stats['batch_polls'] += 1
+
+        for order in due:
+            info = infos.get(order.uuid)
+            if info and info.get('state') in FINAL_STATES:
+                # 목록 응답에는 trades가 없으므로 완료된 주문만 단건 조회 (VWAP)
+                self._poll(order)
+            else:
+                self._update(order, info)
+
+    def _update(self, order, info):
+        now = time.monotonic()
+        if isinstance(info, dict) and 'error' not in info:
+            order.last_info = info
+            if info.get('state') in FINAL_STATES:
+                self._complete(order)
+                return
+
+            # 체결이 진행 중이면 빠르게, 변화가 없으면 점점 느리게
+            executed = info.get('executed_volume')
+            if executed != order.last_executed:
+                order.last_executed = executed
+                order.interval = self.min_interval
+            else:
+                order.interval = min(order.interval * self.backoff, self.max_interval)
+        else:
+            order.interval = min(order.interval * self.backoff, self.max_interval)
+
+        if now >= order.deadline:
+            self._complete(order, timed_out=True)
+        else:
+            order.next_poll = now + order.interval
+
+    def _complete(self, order, timed_out=False):
+        with self._lock:
+            self._orders.pop(order.uuid, None)
+
+        fill = summarize_order(order.last_info or {'uuid': order.uuid})
+        fill['timed_out'] = timed_out
+        if timed_out:
+            self.stats['timeouts'] += 1
+        if fill['filled']:
+            self.stats['filled'] += 1
+
+        if order.callback:
+            try:
+                order.callback(fill)
+            except Exception as e:
+                print(f"⚠️ 체결 콜백 오류 ({order.uuid}): {e}")
+        order.future.set_result(fill)
@@ -0,0 +1,223 @@
+"""
+지연 민감 현재가 조회 (손절/익절 판단용)
+티커 요청 1건이 느리면 청산 판단이 그만큼 늦어지므로 응답 시간 꼬리를 잘라냅니다.
+
+- 헤지 요청: 첫 요청이 최근 지연 p95 안에 안 오면 같은 요청을 한 번 더 보내 먼저 온 응답 사용
+- stale-while-revalidate: 갱신이 늦어지면 마지막 가격을 나이(초)와 함께 바로 반환하고
+  갱신은 백그라운드에서 계속
+- 서킷 브레이커: 연속 실패 시 일정 시간 요청을 멈추고 마지막 가격만 반환
+
+사용 예:
+    reader = HedgedPriceReader(upbit)
+    price, age = reader.get_price('KRW-BTC')   # age: 가격이 조회된 뒤 지난 초
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class CircuitBreaker:
+    """연속 실패 기반 서킷 브레이커 (closed → open → half-open)"""
+
+    def __init__(self, failure_threshold=3, reset_timeout=15):
+        """
+        Args:
+            failure_threshold: 열림으로 전환할 연속 실패 횟수
+            reset_timeout: 열린 뒤 시험 요청을 허용할 때까지 대기 (초)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+        self.trips = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half-open'
+            return 'open'
+
+    def allow(self):
+        """요청 허용 여부 (half-open이면 시험 요청 1건만 허용)"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._trial:
+                    self.trips += 1
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+
+class HedgedPriceReader:
+    """헤지 요청 + stale-while-revalidate + 서킷 브레이커 현재가 조회기 (스레드 안전)"""
+
+    def __init__(self, upbit, fresh_age=1.0, max_stale=30.0, max_wait=0.5, timeout=3.0,
+                 default_hedge_delay=0.3, min_hedge_delay=0.05, failure_threshold=3, reset_timeout=15):
+        """
+        Args:
+            upbit: UpbitAPI (get_current_price_fresh 사용)
+            fresh_age: 이 나이(초) 이하인 가격은 요청 없이 반환
+            max_stale: 이 나이(초)를 넘은 가격은 반환하지 않음
+            max_wait: 마지막 가격이 있을 때 갱신을 기다리는 최대 시간 (초)
+            timeout: 가격이 없을 때 기다리는 최대 시간 (초)
+            default_hedge_delay: 지연 표본이 부족할 때 헤지 요청 지연 (초)
+            min_hedge_delay: 헤지 요청 지연 하한 (초)
+            failure_threshold/reset_timeout: 서킷 브레이커 설정
+        """
+        self.upbit = upbit
+        self.fresh_age = fresh_age
+        self.max_stale = max_stale
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self._lock = threading.Lock()
+        self._prices = {}     # {market: (price, monotonic 조회 시각)}
+        self._inflight = {}   # {market: Future}
+        self._latencies = deque(maxlen=200)
+        # 갱신 작업과 개별 요청은 풀을 나눠 갱신 작업이 요청 슬롯을 막지 않게 함
+        self._refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='price-refresh')
+        self._request_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='price-request')
+
+        self.stats = {'requests': 0, 'hedged': 0, 'hedge_wins': 0, 'stale_served': 0,
+                      'failures': 0, 'rejected': 0}
+
+    def hedge_delay(self):
+        """헤지 요청을 보낼 지연 (최근 성공 요청 지연의 p95)"""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < 20:
+            return self.default_hedge_delay
+        return max(self.min_hedge_delay, samples[int(len(samples) * 0.95) - 1])
+
+    def get_price(self, market, max_wait=None):
+        """현재가와 나이
+
+        Args:
+            max_wait: 마지막 가격이 있을 때 갱신 대기 시간 (None이면 기본값)
+
+        Returns:
+            tuple: (price, age초) - 쓸 수 있는 가격이 없으면 (None, None)
+        """
+        price, age = self._cached(market)
+        if price is not None and age <= self.fresh_age:
+            return price, age
+
+        if not self.breaker.allow():
+            self.stats['rejected'] += 1
+            return self._stale(price, age)
+
+        future = self._refresh(market)
+        wait_time = self.timeout if price is None else (self.max_wait if max_wait is None else max_wait)
+        try:
+            return future.result(timeout=wait_time), 0.0
+        except Exception:
+            # 시간 초과면 갱신은 계속 진행되고, 그동안 마지막 가격 사용
+            return self._stale(*self._cached(market))
+
+    def _cached(self, market):
+        with self._lock:
+            entry = self._prices.get(market)
+        if entry is None:
+            return None, None
+        return entry[0], time.monotonic() - entry[1]
+
+    def _stale(self, price, age):
+        if price is None or age > self.max_stale:
+            return None, None
+        self.stats['stale_served'] += 1
+        return price, age
+
+    def _refresh(self, market):
+        """마켓별 갱신 작업 (진행 중이면 그 작업 공유)"""
+        with self._lock:
+            future = self._inflight.get(market)
+            if future is None or future.done():
+                future = self._refresh_pool.submit(self._hedged_fetch, market)
+                self._inflight[market] = future
+            return future
+
+    def _request(self, market):
+        started = time.perf_counter()
+        ticker = self.upbit.get_current_price_fresh(market, timeout=self.timeout)
+        return float(ticker['trade_price']), time.perf_counter() - started
+
+    def _record_latency(self, future):
+        # 헤지에 진 느린 요청도 기록해야 p95가 실제 꼬리 지연을 따라감
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._lock:
+            self._latencies.append(future.result()[1])
+
+    def _submit(self, market):
+        future = self._request_pool.submit(self._request, market)
+        future.add_done_callback(self._record_latency)
+        return future
+
+    def _hedged_fetch(self, market):
+        self.stats['requests'] += 1
+        deadline = time.monotonic() + self.timeout
+        primary = self._submit(market)
+        futures = [primary]
+
+        done, _ = wait(futures, timeout=self.hedge_delay())
+        if not done:
+            self.stats['hedged'] += 1
+            futures.append(self._submit(market))
+
+        error = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                error = TimeoutError(f"현재가 조회 시간 초과 ({market})")
+                break
+            for future in done:
+                try:
+                    price, _ = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is not primary:
+                    self.stats['hedge_wins'] += 1
+                with self._lock:
+                    self._prices[market] = (price, time.monotonic())
+                self.breaker.record_success()
+                return price
+
+        self.stats['failures'] += 1
+        self.breaker.record_failure()
+        raise error
+
+    def get_stats(self):
+        """조회 통계 (+ 현재 헤지 지연, 브레이커 상태)"""
+        return dict(self.stats, hedge_delay=self.hedge_delay(), breaker=self.breaker.state,
+                    breaker_trips=self.breaker.trips)
+
+    def close(self):
+        self._refresh_pool.shutdown(wait=False)
+        self._request_pool.shutdown(wait=False)
@@ -18,9 +18,8 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import time
-import requests
-import ccxt
+from exchange_provider import get_exchange, fetch_ohlcv_range
+from candle_history import fetch_candles_df
 
 
 class RangeTradingStrategy:
@@ -41,24 +40,9 @@ class RangeTradingStrategy:
         """바이낸스 데이터 수집"""
         print(f"\n📊 바이낸스 {symbol} {days}일 데이터 수집 ({timeframe})...")
 
-        exchange = ccxt.binance()
-        limit = 1000
+        exchange = get_exchange('binance')
         since = exchange.parse8601((datetime.now() - timedelta(days=days)).isoformat())
-        all_ohlcv = []
-
-        while True:
-            try:
-                ohlcv = exchange.fetch_ohlcv(symbol, timeframe, since, limit)
-                if not ohlcv:
-                    break
-                all_ohlcv.extend(ohlcv)
-                since = ohlcv[-1][0] + 1
-                if len(ohlcv) < limit:
-                    break
-                time.sleep(exchange.rateLimit / 1000)
-            except Exception as e:
-                print(f"❌ {e}")
-                break
+        all_ohlcv = fetch_ohlcv_range(exchange, symbol, timeframe, since)
 
         if not all_ohlcv:
             return None
@@ -80,50 +64,19 @@ class RangeTradingStrategy:
         """업비트 데이터 수집"""
         print(f"\n📊 업비트 {market} {days}일 데이터 수집 ({timeframe}분봉)...")
 
-        candles_per_request = 200
         total_candles_needed = min((days * 24 * 60) // timeframe, 10000)
 
-        all_candles = []
-        to_time = None
-
-        while len(all_candles) < total_candles_needed:
-            try:
-                url = f"https://api.upbit.com/v1/candles/minutes/{timeframe}"
-                params = {'market': market, 'count': candles_per_request}
-                if to_time:
-                    params['to'] = to_time
-
-                response = requests.get(url, params=params)
-                if response.status_code != 200:
-                    break
-
-                candles = response.json()
-                if not candles:
-                    break
-
-                all_candles.extend(candles)
-                to_time = candles[-1]['candle_date_time_kst']
-                time.sleep(0.1)
-
-                if len(candles) < candles_per_request:
-                    break
-            except Exception as e:
-                break
-
-        if not all_candles:
+        try:
+            # DB에 저장된 구간은 재사용하고 빠진 구간만 조회
+            df_clean = fetch_candles_df(
+                market, timeframe, start=datetime.now() - timedelta(days=days),
+                limit=total_candles_needed
+            )
+        except Exception as e:
             return None
 
-        df = pd.DataFrame(all_candles)
-        df = df.iloc[::-1].reset_index(drop=True)
-
-        df_clean = pd.DataFrame({
-            'timestamp': pd.to_datetime(df['candle_date_time_kst']),
-            'open': df['opening_price'],
-            'high': df['high_price'],
-            'low': df['low_price'],
-            'close': df['trade_price'],
-            'volume': df['candle_acc_trade_volume']
-        })
+        if df_clean is None:
+            return None
 
         print(f"✅ {len(df_clean)}개 캔들 수집 완료 ({df_clean['timestamp'].min().date()} ~ {df_clean['timestamp'].max().date()})")
         return df_clean
@@ -3,9 +3,12 @@
 10개 코인 실시간 스캔 → 최고 기회에 90% 집중 투자
 """
 import os
+import threading
 import time
 from upbit_api import UpbitAPI
-from database_manager import DatabaseManager
+from db_replicator import open_trading_db
+from order_tracker import OrderTracker
+from price_reader import HedgedPriceReader
 from dynamic_coin_scanner import DynamicCoinScanner
 from volatility_strategy import VolatilityScalpingStrategy
 from ma_crossover_strategy import MACrossoverStrategy
@@ -85,6 +88,16 @@ class SingleCoinBot:
         self.position = None
         self.position_peak = 0
 
+        # 주문 체결 추적 (체결 확인 중에는 신규 매수/매도 보류)
+        self.order_tracker = OrderTracker(upbit)
+        self.pending_order = None  # 체결 확인 중인 주문 uuid
+        # position/통계/pending_order는 체결 콜백(추적 스레드)과 메인 루프가 함께 바꾸므로 같은 락으로 보호
+        # (콜백은 position을 먼저 바꾸고 pending_order를 마지막에 해제)
+        self.state_lock = threading.Lock()
+
+        # 청산 판단용 현재가 (느린 응답은 헤지 요청, 갱신 중에는 직전 가격 사용)
+        self.price_reader = HedgedPriceReader(upbit)
+
         # 통계
         self.total_trades = 0
         self.winning_trades = 0
@@ -197,54 +210,15 @@ class SingleCoinBot:
             result = self.upbit.order_market_buy(market, invest_krw)
 
             if result and 'uuid' in result:
-                uuid = result['uuid']
-                time.sleep(0.5)
-
-                # 체결 정보 조회
-                order_info = self.upbit.get_order(uuid)
-
-                if order_info and float(order_info.get('executed_volume', 0)) > 0:
-                    trades = order_info.get('trades', [])
-                    if trades:
-                        total_funds = sum(float(t['funds']) for t in trades)
-                        total_volume = sum(float(t['volume']) for t in trades)
-                        executed_price = total_funds / total_volume
-                        amount = total_volume
-                    else:
-                        executed_price = float(order_info.get('avg_price', 0))
-                        amount = float(order_info.get('executed_volume', 0))
-
-                    # 포지션 등록
-                    from datetime import datetime
-                    self.position = {
-                        'market': market,
-                        'buy_price': executed_price,
-                        'buy_time': datetime.now(),
-                        'amount': amount,
-                        'strategy': strategy
-                    }
-                    self.position_peak = 0
-
-                    self.log(f"✅ 매수 완료: {amount:.8f}개 @ {executed_price:,.0f}원")
-
-                    self.telegram.send_message(
-                        f"💰 <b>매수 완료</b>\\n"
-                        f"━━━━━━━━━━━━━━━━━\\n\\n"
-                        f"코인: {market}\\n"
-                        f"전략: {strategy}\\n"
-                        f"수량: {amount:.8f}\\n"
-                        f"가격: {executed_price:,.0f}원\\n"
-                        f"금액: {invest_krw:,.0f}원\\n\\n"
-                        f"사유: {signal['reason']}\\n\\n"
-                        f"🎯 목표: +0.8% / +1.5% (보수적)\\n"
-                        f"🛑 손절: -0.5%\\n"
-                        f"⏱️  최대: 120분"
-                    )
-
-                    return True
-                else:
-                    self.log(f"❌ 체결 실패")
-                    return False
+                # 주문은 즉시 반환, 포지션은 체결 콜백에서 실제 체결가로 등록
+                with self.state_lock:
+                    self.pending_order = result['uuid']
+                self.order_tracker.track(
+                    result['uuid'],
+                    callback=lambda fill: self._on_buy_fill(fill, opportunity, invest_krw)
+                )
+                self.log(f"📨 매수 주문 접수: {result['uuid'][:8]}... (체결 확인 중)")
+                return True
             else:
                 error = result.get('error', {}).get('message', '알 수 없음') if result else '응답 없음'
                 self.log(f"❌ 주문 실패: {error}")
@@ -256,6 +230,50 @@ class SingleCoinBot:
             traceback.print_exc()
             return False
 
+    def _on_buy_fill(self, fill, opportunity, invest_krw):
+        """매수 체결 콜백 (주문 추적 스레드)"""
+        market = opportunity['market']
+        signal = opportunity['signal']
+        strategy = opportunity['strategy']
+
+        if not fill['filled']:
+            with self.state_lock:
+                self.pending_order = None
+            self.log(f"❌ 체결 실패 ({fill['state']})")
+            return
+
+        executed_price = fill['avg_price']
+        amount = fill['executed_volume']
+
+        # 포지션 등록 후 보류 해제 (메인 루프가 포지션 없이 보류만 풀린 상태를 보지 않도록)
+        from datetime import datetime
+        with self.state_lock:
+            self.position = {
+                'market': market,
+                'buy_price': executed_price,
+                'buy_time': datetime.now(),
+                'amount': amount,
+                'strategy': strategy
+            }
+            self.position_peak = 0
+            self.pending_order = None
+
+        self.log(f"✅ 매수 완료: {amount:.8f}개 @ {executed_price:,.0f}원")
+
+        self.telegram.send_message(
+            f"💰 <b>매수 완료</b>\\n"
+            f"━━━━━━━━━━━━━━━━━\\n\\n"
+            f"코인: {market}\\n"
+            f"전략: {strategy}\\n"
+            f"수량: {amount:.8f}\\n"
+            f"가격: {executed_price:,.0f}원\\n"
+            f"금액: {invest_krw:,.0f}원\\n\\n"
+            f"사유: {signal['reason']}\\n\\n"
+            f"🎯 목표: +0.8% / +1.5% (보수적)\\n"
+            f"🛑 손절: -0.5%\\n"
+            f"⏱️  최대: 120분"
+        )
+
     def execute_sell(self, sell_signal):
         """매도 실행"""
         try:
@@ -271,35 +289,14 @@ class SingleCoinBot:
             result = self.upbit.order_market_sell(market, amount)
 
             if result and 'uuid' in result:
-                profit_krw = (amount * buy_price) * (profit_pct / 100)
-
-                # 통계 업데이트
-                self.total_trades += 1
-                self.total_pnl += profit_krw
-                if profit_krw > 0:
-                    self.winning_trades += 1
-
-                win_rate = (self.winning_trades / self.total_trades * 100) if self.total_trades > 0 else 0
-
-                self.log(f"✅ 매도 완료: {profit_krw:+,.0f}원 ({profit_pct:+.2f}%)")
-
-                self.telegram.send_message(
-                    f"💸 <b>매도 완료</b>\\n"
-                    f"━━━━━━━━━━━━━━━━━\\n\\n"
-                    f"코인: {market}\\n"
-                    f"수량: {amount:.8f}\\n"
-                    f"손익: {profit_krw:+,.0f}원 ({profit_pct:+.2f}%)\\n\\n"
-                    f"사유: {reason}\\n\\n"
-                    f"📊 <b>누적 통계</b>\\n"
-                    f"총 거래: {self.total_trades}회\\n"
-                    f"승률: {win_rate:.1f}%\\n"
-                    f"총 손익: {self.total_pnl:+,.0f}원"
+                # 손익은 체결 콜백에서 실제 체결가(VWAP) 기준으로 확정
+                with self.state_lock:
+                    self.pending_order = result['uuid']
+                self.order_tracker.track(
+                    result['uuid'],
+                    callback=lambda fill: self._on_sell_fill(fill, sell_signal, market, amount, buy_price)
                 )
-
-                # 포지션 해제
-                self.position = None
-                self.position_peak = 0
-
+                self.log(f"📨 매도 주문 접수: {result['uuid'][:8]}... (체결 확인 중)")
                 return True
             else:
                 error = result.get('error', {}).get('message', '알 수 없음') if result else '응답 없음'
@@ -312,6 +309,61 @@ class SingleCoinBot:
             traceback.print_exc()
             return False
 
+    def _on_sell_fill(self, fill, sell_signal, market, amount, buy_price):
+        """매도 체결 콜백 (주문 추적 스레드)"""
+        reason = sell_signal['reason']
+
+        if not fill['filled']:
+            with self.state_lock:
+                self.pending_order = None
+            self.log(f"❌ 매도 체결 실패 ({fill['state']}) - 포지션 유지")
+            return
+
+        if fill['avg_price']:
+            sold = fill['executed_volume']
+            profit_krw = fill['funds'] - fill['paid_fee'] - sold * buy_price
+            profit_pct = (fill['avg_price'] - buy_price) / buy_price * 100
+        else:
+            sold = amount
+            profit_pct = sell_signal['profit_pct']
+            profit_krw = (amount * buy_price) * (profit_pct / 100)
+
+        # 포지션/통계 갱신 후 보류 해제 (알림 전송 중에도 메인 루프는 갱신된 포지션을 봄)
+        with self.state_lock:
+            self.total_trades += 1
+            self.total_pnl += profit_krw
+            if profit_krw > 0:
+                self.winning_trades += 1
+
+            # 부분 체결이면 잔량 유지
+            partial = fill['remaining_volume'] > 0 and sold < amount
+            if partial:
+                self.position['amount'] = amount - sold
+            else:
+                self.position = None
+                self.position_peak = 0
+            self.pending_order = None
+
+        win_rate = (self.winning_trades / self.total_trades * 100) if self.total_trades > 0 else 0
+
+        self.log(f"✅ 매도 완료: {profit_krw:+,.0f}원 ({profit_pct:+.2f}%)")
+
+        self.telegram.send_message(
+            f"💸 <b>매도 완료</b>\\n"
+            f"━━━━━━━━━━━━━━━━━\\n\\n"
+            f"코인: {market}\\n"
+            f"수량: {sold:.8f}\\n"
+            f"손익: {profit_krw:+,.0f}원 ({profit_pct:+.2f}%)\\n\\n"
+            f"사유: {reason}\\n\\n"
+            f"📊 <b>누적 통계</b>\\n"
+            f"총 거래: {self.total_trades}회\\n"
+            f"승률: {win_rate:.1f}%\\n"
+            f"총 손익: {self.total_pnl:+,.0f}원"
+        )
+
+        if partial:
+            self.log(f"⚠️ 부분 체결: 잔량 {amount - sold:.8f}개 보유")
+
     def run(self, check_interval=30):
         """봇 실행"""
         self.log("=" * 70)
@@ -382,11 +434,25 @@ class SingleCoinBot:
                             "/help 또는 /도움말 - 명령어 도움말"
                         )
 
+                # 체결 콜백과 같은 락으로 상태를 한 번에 읽음
+                with self.state_lock:
+                    pending_order = self.pending_order
+                    has_position = self.position is not None
+
+                # 주문 체결 대기 중이면 매수/매도 판단 보류
+                if pending_order:
+                    self.log(f"⏳ 주문 체결 대기 중: {pending_order[:8]}...")
+
                 # 포지션 있으면 매도 체크
-                if self.position:
+                elif has_position:
                     market = self.position['market']
-                    ticker = self.upbit.get_current_price(market)
-                    current_price = ticker['trade_price']
+                    current_price, price_age = self.price_reader.get_price(market)
+                    if current_price is None:
+                        self.log(f"⚠️ [{market}] 현재가 조회 실패 - 다음 주기에 재시도")
+                        time.sleep(check_interval)
+                        continue
+                    if price_age > 5:
+                        self.log(f"⚠️ [{market}] {price_age:.0f}초 전 가격으로 판단")
 
                     sell_signal = self.check_sell_signal(market, current_price)
 
@@ -431,8 +497,9 @@ if __name__ == "__main__":
         db = None
         if use_oracle or os.environ.get('USE_DB', 'false').lower() == 'true':
             try:
-                db = DatabaseManager(use_oracle=use_oracle)
-                print(f"✅ 데이터베이스: {'Oracle Cloud' if use_oracle else 'SQLite'}")
+                # Oracle이면 로컬 저널에 커밋하고 백그라운드로 복제 (거래 경로에 WAN 왕복 없음)
+                db = open_trading_db()
+                print(f"✅ 데이터베이스: {'SQLite → Oracle Cloud 복제' if db.replicator else 'Oracle Cloud' if db.use_oracle else 'SQLite'}")
             except Exception as e:
                 print(f"⚠️ DB 연동 실패: {e}")
                 db = None
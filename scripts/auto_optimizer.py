@@ -7,10 +7,10 @@ import os
 import sys
 import json
 from datetime import datetime, timedelta
-import oracledb
-import base64
-import zipfile
-import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from oracle_pool import get_oracle_pool
+from database_manager import rollup_metrics
 
 # 성과 기준
 MIN_WIN_RATE = 50.0  # 최소 승률 50%
@@ -20,28 +20,9 @@ MIN_TRADES = 10  # 최소 거래 횟수
 
 
 def connect_oracle_db():
-    """Oracle DB 연결"""
+    """Oracle DB 연결 (공유 커넥션 풀에서 세션 대여, close()하면 반납)"""
     try:
-        # Wallet 설정
-        wallet_base64 = os.environ.get('ORACLE_WALLET_BASE64')
-        wallet_dir = tempfile.mkdtemp()
-        wallet_path = f'{wallet_dir}/wallet.zip'
-
-        with open(wallet_path, 'wb') as f:
-            f.write(base64.b64decode(wallet_base64))
-
-        with zipfile.ZipFile(wallet_path, 'r') as zip_ref:
-            zip_ref.extractall(wallet_dir)
-
-        conn = oracledb.connect(
-            user=os.environ.get('ORACLE_DB_USER', 'ADMIN'),
-            password=os.environ.get('ORACLE_DB_PASSWORD'),
-            dsn=os.environ.get('ORACLE_DB_DSN'),
-            config_dir=wallet_dir,
-            wallet_location=wallet_dir,
-            wallet_password=os.environ.get('ORACLE_DB_PASSWORD')
-        )
-
+        conn = get_oracle_pool().acquire()
         print("✅ Oracle DB 연결 성공")
         return conn
     except Exception as e:
@@ -50,45 +31,43 @@ def connect_oracle_db():
 
 
 def analyze_recent_trades(conn, days=7):
-    """최근 거래 분석"""
+    """최근 거래 분석 (trade_rollups에서 오늘 포함 최근 N일 합산 - trades 전체를 훑지 않음)"""
     cursor = conn.cursor()
 
-    # 최근 N일 거래 조회
-    cutoff_date = datetime.now() - timedelta(days=days)
-
-    cursor.execute("""
-        SELECT
-            COUNT(*) as total_trades,
-            SUM(CASE WHEN profit > 0 THEN 1 ELSE 0 END) as winning_trades,
-            AVG(profit_rate) as avg_profit_rate,
-            AVG(hold_time_minutes) as avg_hold_time,
-            MIN(profit_rate) as worst_trade,
-            MAX(profit_rate) as best_trade
-        FROM trades
-        WHERE timestamp >= :cutoff_date
-        AND trade_type = 'SELL'
-    """, cutoff_date=cutoff_date)
-
-    row = cursor.fetchone()
+    cutoff_date = datetime.combine(datetime.now().date() - timedelta(days=days - 1), datetime.min.time())
+
+    try:
+        cursor.execute("""
+            SELECT
+                SUM(trade_count), SUM(win_count), SUM(profit_sum), SUM(gross_profit), SUM(gross_loss),
+                SUM(rate_sum), SUM(rate_sq_sum), SUM(hold_sum), MIN(worst_rate), MAX(best_rate)
+            FROM trade_rollups
+            WHERE trade_date >= :cutoff_date
+        """, cutoff_date=cutoff_date)
+        row = cursor.fetchone()
+    except Exception as e:
+        # 롤업 테이블이 아직 없는 DB (DatabaseManager가 처음 열 때 생성 + 기존 거래로 채움)
+        print(f"⚠️ trade_rollups 조회 실패, trades 직접 집계: {e}")
+        cursor.execute("""
+            SELECT
+                COUNT(*), SUM(CASE WHEN profit > 0 THEN 1 ELSE 0 END), SUM(profit),
+                SUM(CASE WHEN profit > 0 THEN profit ELSE 0 END),
+                SUM(CASE WHEN profit < 0 THEN -profit ELSE 0 END),
+                SUM(profit_rate), SUM(profit_rate * profit_rate), SUM(hold_time_minutes),
+                MIN(profit_rate), MAX(profit_rate)
+            FROM trades
+            WHERE timestamp >= :cutoff_date
+            AND trade_type = 'SELL'
+        """, cutoff_date=cutoff_date)
+        row = cursor.fetchone()
     cursor.close()
 
-    if not row or row[0] == 0:
+    # 승률/평균/샤프는 DatabaseManager 리포트와 같은 계산
+    metrics = rollup_metrics(*row[:8]) if row else None
+    if metrics is None:
         return None
 
-    total_trades, winning_trades, avg_profit_rate, avg_hold_time, worst_trade, best_trade = row
-
-    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-
-    return {
-        'total_trades': total_trades,
-        'winning_trades': winning_trades,
-        'win_rate': win_rate,
-        'avg_profit_rate': avg_profit_rate or 0,
-        'avg_hold_time': avg_hold_time or 0,
-        'worst_trade': worst_trade or 0,
-        'best_trade': best_trade or 0,
-        'period_days': days
-    }
+    return dict(metrics, worst_trade=row[8] or 0, best_trade=row[9] or 0, period_days=days)
 
 
 def generate_optimization_plan(performance):
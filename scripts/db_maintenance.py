@@ -3,11 +3,16 @@
 데이터베이스 유지보수 스크립트
 - 오래된 거래 데이터 아카이빙
 - 공간 확보를 위한 자동 정리
+- 월별 파티션 테이블은 오래된 달의 파티션을 통째로 삭제 (DELETE/VACUUM 없음)
+- 삭제 전 압축 아카이브로 내보내기 (db_archive, DB_ARCHIVE_DIR)
 """
 import os
 import sys
 from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from database_manager import DatabaseManager
+from db_archive import DBArchiver
 
 
 def analyze_database_size(db):
@@ -95,76 +100,72 @@ def get_trade_statistics(db):
         return None
 
 
-def archive_old_trades(db, months_to_keep=6, dry_run=True):
-    """오래된 거래 아카이빙
+def archive_old_rows(db, table, months_to_keep=6, dry_run=True):
+    """오래된 거래/캔들 아카이빙 (압축 파일로 내보낸 뒤 삭제)
+
+    월 단위로 잘라 보관 기간 이전 달 전체를 내보냅니다. 월별 파티션이면 그 달 파티션을 삭제하고,
+    단일 테이블이면 짧은 트랜잭션으로 나눠 DELETE합니다.
 
     Args:
         db: DatabaseManager 인스턴스
-        months_to_keep: 보관할 개월 수 (기본 6개월)
+        table: 'trades' 또는 'candles'
+        months_to_keep: 보관할 개월 수
         dry_run: True면 실제 삭제하지 않고 시뮬레이션
+
+    Returns:
+        int: 아카이빙한(대상) 행 수
     """
+    before = (datetime.now() - timedelta(days=months_to_keep * 30)).strftime('%Y-%m')
+    archiver = DBArchiver(db)
     try:
-        cutoff_date = datetime.now() - timedelta(days=months_to_keep * 30)
-
-        cursor = db.conn.cursor()
-
-        # 삭제 대상 조회 (Oracle/SQLite 호환)
-        if db.use_oracle:
-            cursor.execute("""
-                SELECT COUNT(*) FROM trades
-                WHERE timestamp < :cutoff_date
-            """, cutoff_date=cutoff_date)
-        else:
-            cursor.execute("""
-                SELECT COUNT(*) FROM trades
-                WHERE timestamp < ?
-            """, (cutoff_date,))
-
-        count_to_delete = cursor.fetchone()[0]
-
-        if count_to_delete == 0:
-            print(f"✅ 삭제할 오래된 거래 없음 ({cutoff_date.strftime('%Y-%m-%d')} 이전)")
-            cursor.close()
+        count = archiver.pending(table, before)
+        if count == 0:
+            print(f"✅ 아카이빙할 {table} 없음 ({before} 이전)")
             return 0
 
-        print(f"\n📦 아카이빙 대상: {count_to_delete}건 ({cutoff_date.strftime('%Y-%m-%d')} 이전)")
-
+        print(f"\n📦 아카이빙 대상: {table} {count:,}행 ({before} 이전)")
         if dry_run:
             print("🔍 DRY RUN 모드 - 실제 삭제하지 않음")
-            cursor.close()
-            return count_to_delete
-
-        # 실제 삭제 (Oracle/SQLite 호환)
-        if db.use_oracle:
-            cursor.execute("""
-                DELETE FROM trades
-                WHERE timestamp < :cutoff_date
-            """, cutoff_date=cutoff_date)
-        else:
-            cursor.execute("""
-                DELETE FROM trades
-                WHERE timestamp < ?
-            """, (cutoff_date,))
-
-        db.conn.commit()
-        cursor.close()
+            return count
 
-        print(f"✅ {count_to_delete}건 삭제 완료")
-        return count_to_delete
+        result = archiver.archive(table, before)
+        print(f"✅ {result['rows']:,}행 → {result['files']}개 파일 ({result['bytes'] / 1024 / 1024:.2f} MB, {archiver.root})")
+        if result['dropped_partitions']:
+            print(f"✅ {table} 파티션 {result['dropped_partitions']}개 삭제")
+        if result['deleted_rows']:
+            print(f"✅ {result['deleted_rows']:,}행 삭제")
+        return result['rows']
 
     except Exception as e:
-        print(f"❌ 아카이빙 실패: {e}")
-        if db.conn:
-            db.conn.rollback()
+        print(f"❌ {table} 아카이빙 실패: {e}")
         return 0
 
 
+def archive_old_trades(db, months_to_keep=6, dry_run=True):
+    """오래된 거래 아카이빙
+
+    Args:
+        db: DatabaseManager 인스턴스
+        months_to_keep: 보관할 개월 수 (기본 6개월)
+        dry_run: True면 실제 삭제하지 않고 시뮬레이션
+    """
+    return archive_old_rows(db, 'trades', months_to_keep=months_to_keep, dry_run=dry_run)
+
+
 def vacuum_database(db):
-    """데이터베이스 최적화 (공간 회수)"""
+    """데이터베이스 최적화 (공간 회수)
+
+    auto_vacuum=INCREMENTAL인 SQLite는 빈 페이지만 조금씩 반환하고, 그 전에 만든 파일은
+    한 번 전체 VACUUM (이때 INCREMENTAL로 바뀜)
+    """
     try:
-        if not db.use_oracle:
-            # SQLite만 VACUUM 지원
+        freed = db.incremental_vacuum()
+        if freed is not None:
+            print(f"✅ 데이터베이스 최적화 완료 (incremental vacuum {freed:,}페이지)")
+        elif not db.use_oracle:
+            # SQLite만 VACUUM 지원 (WAL 내용을 본 파일에 반영 후 정리)
             cursor = db.conn.cursor()
+            cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
             cursor.execute("VACUUM")
             cursor.close()
             print("✅ 데이터베이스 최적화 완료 (VACUUM)")
@@ -187,6 +188,7 @@ def main():
     use_oracle = os.environ.get('USE_ORACLE_DB', 'false').lower() == 'true'
     dry_run = len(sys.argv) < 2 or sys.argv[1] != '--apply'
     months_to_keep = int(os.environ.get('DB_ARCHIVE_MONTHS', '6'))
+    candle_months_to_keep = int(os.environ.get('DB_CANDLE_ARCHIVE_MONTHS', '12'))
 
     if dry_run:
         print("\n🔍 DRY RUN 모드 (실제 삭제 안함)")
@@ -239,17 +241,20 @@ def main():
     # 3. 아카이빙
     print(f"\n🗄️ 데이터 아카이빙 ({months_to_keep}개월 이전 데이터)")
     print("-" * 60)
+    archived_count = archive_old_trades(db, months_to_keep=months_to_keep, dry_run=dry_run)
 
-    deleted_count = archive_old_trades(db, months_to_keep=months_to_keep, dry_run=dry_run)
+    print(f"\n🗄️ 캔들 보관 기간 정리 ({candle_months_to_keep}개월 이전 데이터)")
+    print("-" * 60)
+    archived_count += archive_old_rows(db, 'candles', months_to_keep=candle_months_to_keep, dry_run=dry_run)
 
     # 4. 최적화
-    if not dry_run and deleted_count > 0:
+    if not dry_run and archived_count > 0:
         print(f"\n🔧 데이터베이스 최적화")
         print("-" * 60)
         vacuum_database(db)
 
     # 5. 최종 크기
-    if not dry_run and deleted_count > 0:
+    if not dry_run and archived_count > 0:
         print(f"\n📊 최종 상태")
         print("-" * 60)
         new_size_mb = analyze_database_size(db)
@@ -258,6 +263,15 @@ def main():
         if saved_mb > 0:
             print(f"✅ 절약된 공간: {saved_mb:.2f} MB")
 
+    # 6. 잠금 대기 통계 (SQLite)
+    db_stats = db.get_db_stats()
+    if 'writer' in db_stats:
+        writer, readers = db_stats['writer'], db_stats['readers']
+        print(f"\n🔒 잠금 대기 (journal_mode={db_stats['pragmas'].get('journal_mode')})")
+        print("-" * 60)
+        print(f"쓰기: {writer['writes']}회, 대기 {writer['lock_wait_ms']:.1f}ms, busy {writer['busy_errors']}회")
+        print(f"읽기: {readers['reads']}회, 대기 {readers['pool_wait_ms']:.1f}ms, busy {readers['busy_errors']}회")
+
     db.close()
 
     print("\n" + "=" * 60)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+캔들 테이블 v2 변환 스크립트
+- v1: id AUTOINCREMENT + DATETIME 문자열 + DECIMAL + UNIQUE + 별도 인덱스
+- v2: (market, timeframe, ts) 클러스터드 기본키 (SQLite WITHOUT ROWID / Oracle IOT)
+      + UTC epoch ms 정수 + REAL/BINARY_DOUBLE
+
+순서: candles_v2 생성 → 구간별 복사 → 건수 확인 → candles를 candles_v1로, candles_v2를 candles로 이름 변경
+(--drop-old면 candles_v1 삭제 후 SQLite는 VACUUM)
+
+사용법:
+    python scripts/migrate_candles_v2.py            # DRY RUN (건수/예상만 출력)
+    python scripts/migrate_candles_v2.py --apply    # 실제 변환
+    python scripts/migrate_candles_v2.py --apply --drop-old
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database_manager import DatabaseManager, CANDLES_V2_DDL, CANDLE_SCHEMA_VERSION
+from db_partitions import oracle_candle_partitions
+
+# 한 번에 복사할 v1 행 수 (id 구간)
+BATCH_ROWS = 50_000
+
+# v1 timestamp(KST 문자열) → UTC epoch ms
+SQLITE_TS_EXPR = "(CAST(strftime('%s', timestamp) AS INTEGER) - 9 * 3600) * 1000"
+ORACLE_TS_EXPR = {
+    # DATE/TIMESTAMP 컬럼
+    'date': "ROUND((CAST(timestamp AS DATE) - DATE '1970-01-01') * 86400000) - 9 * 3600000",
+    # 'YYYY-MM-DDTHH24:MI:SS' 문자열 컬럼
+    'text': "ROUND((TO_DATE(REPLACE(SUBSTR(timestamp, 1, 19), 'T', ' '), 'YYYY-MM-DD HH24:MI:SS')"
+            " - DATE '1970-01-01') * 86400000) - 9 * 3600000",
+}
+
+
+def table_size_mb(db, table):
+    """테이블 크기 (MB, 알 수 없으면 None)"""
+    cursor = db.conn.cursor()
+    try:
+        if db.use_oracle:
+            cursor.execute("""
+                SELECT SUM(s.bytes) / 1024 / 1024
+                FROM user_segments s
+                WHERE s.segment_name = :name
+                   OR s.segment_name IN (SELECT index_name FROM user_indexes WHERE table_name = :name)
+            """, name=table.upper())
+        else:
+            cursor.execute("SELECT SUM(pgsize) / 1024.0 / 1024.0 FROM dbstat WHERE name = ? OR tbl_name = ?",
+                           (table, table))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    except Exception:
+        return None  # dbstat 미지원 빌드 등
+    finally:
+        cursor.close()
+
+
+def _oracle_ts_expr(cursor):
+    cursor.execute("""
+        SELECT data_type FROM user_tab_columns
+        WHERE table_name = 'CANDLES' AND column_name = 'TIMESTAMP'
+    """)
+    row = cursor.fetchone()
+    data_type = row[0] if row else 'DATE'
+    return ORACLE_TS_EXPR['date' if data_type.startswith(('DATE', 'TIMESTAMP')) else 'text']
+
+
+def copy_candles(db):
+    """candles(v1) → candles_v2 구간별 복사
+
+    Returns:
+        int: 복사된 행 수
+    """
+    cursor = db.conn.cursor()
+    columns = "market, timeframe, ts, open_price, high_price, low_price, close_price, volume"
+
+    if db.use_oracle:
+        cursor.execute(CANDLES_V2_DDL['oracle'].format(table='candles_v2', partitions=oracle_candle_partitions()))
+        ts_expr = _oracle_ts_expr(cursor)
+        select = f"""
+            SELECT market, timeframe, {ts_expr},
+                   CAST(open_price AS BINARY_DOUBLE), CAST(high_price AS BINARY_DOUBLE),
+                   CAST(low_price AS BINARY_DOUBLE), CAST(close_price AS BINARY_DOUBLE),
+                   CAST(volume AS BINARY_DOUBLE)
+            FROM candles
+            WHERE id > :lo AND id <= :hi
+        """
+        # v1의 UNIQUE(market, timeframe, timestamp)로 중복 봉이 없으므로 그대로 삽입
+        insert = f"INSERT INTO candles_v2 ({columns}) {select}"
+    else:
+        cursor.execute(CANDLES_V2_DDL['sqlite'].format(table='candles_v2'))
+        insert = f"""
+            INSERT OR IGNORE INTO candles_v2 ({columns})
+            SELECT market, timeframe, {SQLITE_TS_EXPR},
+                   CAST(open_price AS REAL), CAST(high_price AS REAL),
+                   CAST(low_price AS REAL), CAST(close_price AS REAL),
+                   CAST(volume AS REAL)
+            FROM candles
+            WHERE id > ? AND id <= ?
+        """
+
+    cursor.execute("SELECT MIN(id), MAX(id) FROM candles")
+    min_id, max_id = cursor.fetchone()
+    if min_id is None:
+        cursor.close()
+        return 0
+
+    copied = 0
+    started = time.time()
+    for lo in range(min_id - 1, max_id, BATCH_ROWS):
+        hi = lo + BATCH_ROWS
+        if db.use_oracle:
+            cursor.execute(insert, lo=lo, hi=hi)
+        else:
+            cursor.execute(insert, (lo, hi))
+        copied += cursor.rowcount
+        db.conn.commit()
+        print(f"  {min(hi, max_id):,} / {max_id:,} (복사 {copied:,}행, {time.time() - started:.1f}초)")
+
+    cursor.close()
+    return copied
+
+
+def swap_tables(db, drop_old=False):
+    """candles → candles_v1, candles_v2 → candles"""
+    cursor = db.conn.cursor()
+    if db.use_oracle:
+        cursor.execute("ALTER TABLE candles RENAME TO candles_v1")
+        cursor.execute("ALTER TABLE candles_v2 RENAME TO candles")
+        if drop_old:
+            cursor.execute("DROP TABLE candles_v1 PURGE")
+    else:
+        cursor.execute("ALTER TABLE candles RENAME TO candles_v1")
+        cursor.execute("ALTER TABLE candles_v2 RENAME TO candles")
+        # v1 인덱스는 v1 테이블에 붙어 있으므로 이름만 정리
+        cursor.execute("DROP INDEX IF EXISTS idx_candles_market_time")
+        if drop_old:
+            cursor.execute("DROP TABLE candles_v1")
+    db.conn.commit()
+    cursor.close()
+
+    if drop_old and not db.use_oracle:
+        db.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        db.conn.execute("VACUUM")
+
+
+def main():
+    """메인 함수"""
+
+    print("=" * 60)
+    print("🔄 캔들 테이블 v2 변환")
+    print("=" * 60)
+
+    use_oracle = os.environ.get('USE_ORACLE_DB', 'false').lower() == 'true'
+    apply = '--apply' in sys.argv[1:]
+    drop_old = '--drop-old' in sys.argv[1:]
+
+    try:
+        db = DatabaseManager(use_oracle=use_oracle)
+    except Exception as e:
+        print(f"❌ DB 연결 실패: {e}")
+        sys.exit(1)
+
+    if db.candle_schema >= CANDLE_SCHEMA_VERSION:
+        print("✅ 이미 v2 형식입니다")
+        db.close()
+        return
+
+    cursor = db.conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM candles")
+    total = cursor.fetchone()[0]
+    cursor.close()
+
+    size_mb = table_size_mb(db, 'candles')
+    print(f"v1 캔들: {total:,}행" + (f", {size_mb:.1f} MB" if size_mb else ""))
+
+    if not apply:
+        print("\n🔍 DRY RUN 모드 - 변환하려면: python scripts/migrate_candles_v2.py --apply")
+        db.close()
+        return
+
+    print("\n📦 복사 중...")
+    try:
+        copied = copy_candles(db)
+    except Exception as e:
+        print(f"❌ 복사 실패: {e}")
+        db.conn.rollback()
+        db.close()
+        sys.exit(1)
+
+    if copied < total:
+        print(f"ℹ️ 중복 봉 {total - copied:,}행 제외")
+
+    swap_tables(db, drop_old=drop_old)
+
+    new_size_mb = table_size_mb(db, 'candles')
+    if size_mb and new_size_mb:
+        print(f"\n💾 크기: {size_mb:.1f} MB → {new_size_mb:.1f} MB ({new_size_mb / size_mb * 100:.0f}%)")
+    print(f"✅ 변환 완료: {copied:,}행" + ("" if drop_old else " (기존 테이블은 candles_v1로 보관)"))
+
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+candles/trades 월별 파티션 변환 스크립트
+- SQLite: {table}을 {table}_unpartitioned로 이름 변경 → 달마다 {table}_pYYYYMM으로 복사 → 건수 확인
+          → 같은 이름의 UNION ALL 뷰 생성 (--drop-old면 기존 테이블 삭제)
+- Oracle: ALTER TABLE ... MODIFY PARTITION BY ... ONLINE (캔들: 월 range, 거래: 월 interval)
+
+변환 후에는 scripts/db_maintenance.py가 DELETE/VACUUM 대신 오래된 달의 파티션을 삭제합니다.
+캔들이 v1 형식이면 먼저 scripts/migrate_candles_v2.py로 변환하세요.
+
+사용법:
+    python scripts/partition_tables.py            # DRY RUN (월/건수만 출력)
+    python scripts/partition_tables.py --apply    # 실제 변환
+    python scripts/partition_tables.py --apply --drop-old
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database_manager import DatabaseManager, CANDLES_V2_DDL, CANDLE_SCHEMA_VERSION, TRADES_DDL
+from db_partitions import (SQLitePartitions, ORACLE_TRADES_PARTITIONS, month_key, month_range,
+                           months_between, oracle_candle_partitions)
+
+
+def sqlite_months(cursor, table, source):
+    """source 테이블 데이터가 걸친 월 목록"""
+    if table == 'candles':
+        cursor.execute(f"SELECT MIN(ts), MAX(ts) FROM {source}")
+        first, last = cursor.fetchone()
+        return [] if first is None else months_between(month_key(first), month_key(last))
+    cursor.execute(f"SELECT MIN(timestamp), MAX(timestamp) FROM {source}")
+    first, last = cursor.fetchone()
+    return [] if first is None else months_between(str(first)[:7], str(last)[:7])
+
+
+def copy_sqlite_month(cursor, table, source, partition, key):
+    """source의 한 달치를 파티션 테이블로 복사
+
+    Returns:
+        int: 복사된 행 수
+    """
+    if table == 'candles':
+        # (market, timeframe)별 기본키 범위 스캔
+        lo, hi = month_range(key)
+        cursor.execute(f"SELECT DISTINCT market, timeframe FROM {source}")
+        copied = 0
+        for market, timeframe in cursor.fetchall():
+            cursor.execute(f"""
+                INSERT OR IGNORE INTO {partition}
+                SELECT * FROM {source}
+                WHERE market = ? AND timeframe = ? AND ts >= ? AND ts < ?
+            """, (market, timeframe, lo, hi))
+            copied += cursor.rowcount
+        return copied
+
+    next_key = month_key(month_range(key)[1])
+    cursor.execute(f"""
+        INSERT INTO {partition}
+        SELECT * FROM {source}
+        WHERE timestamp >= ? AND timestamp < ?
+    """, (f"{key}-01", f"{next_key}-01"))
+    return cursor.rowcount
+
+
+def partition_sqlite_table(db, table, drop_old=False):
+    """SQLite 단일 테이블 → 월별 파티션 테이블 + 뷰
+
+    Returns:
+        int: 복사된 행 수
+    """
+    source = f"{table}_unpartitioned"
+    ddl = CANDLES_V2_DDL['sqlite'] if table == 'candles' else TRADES_DDL
+    parts = SQLitePartitions(table, ddl)
+
+    cursor = db.conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+    total = cursor.fetchone()[0]
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {source}")
+    db.conn.commit()
+
+    copied = 0
+    started = time.time()
+    for key in sqlite_months(cursor, table, source):
+        copied += copy_sqlite_month(cursor, table, source, parts.ensure(cursor, key), key)
+        db.conn.commit()
+        print(f"  {table} {key}: 누적 {copied:,} / {total:,}행 ({time.time() - started:.1f}초)")
+
+    # 이번 달 파티션 (데이터가 없어도 뷰가 있도록)
+    parts.ensure(cursor, time.strftime('%Y-%m', time.gmtime()))
+    db.conn.commit()
+
+    if copied < total:
+        print(f"⚠️ {table}: {total - copied:,}행이 복사되지 않았습니다 - {source} 유지")
+    elif drop_old:
+        cursor.execute(f"DROP TABLE {source}")
+        db.conn.commit()
+    cursor.close()
+    return copied
+
+
+def partition_oracle_table(db, table):
+    """Oracle 단일 테이블 → 파티션 테이블 (온라인 변환, 변환 중에도 읽기/쓰기 가능)"""
+    clause = oracle_candle_partitions() if table == 'candles' else ORACLE_TRADES_PARTITIONS
+    cursor = db.conn.cursor()
+    cursor.execute(f"ALTER TABLE {table} MODIFY {clause} ONLINE UPDATE INDEXES")
+    cursor.close()
+
+
+def main():
+    """메인 함수"""
+
+    print("=" * 60)
+    print("🗂️ candles/trades 월별 파티션 변환")
+    print("=" * 60)
+
+    use_oracle = os.environ.get('USE_ORACLE_DB', 'false').lower() == 'true'
+    apply = '--apply' in sys.argv[1:]
+    drop_old = '--drop-old' in sys.argv[1:]
+
+    try:
+        db = DatabaseManager(use_oracle=use_oracle)
+    except Exception as e:
+        print(f"❌ DB 연결 실패: {e}")
+        sys.exit(1)
+
+    tables = [table for table in ('candles', 'trades') if not db.partitioned[table]]
+    if 'candles' in tables and db.candle_schema < CANDLE_SCHEMA_VERSION:
+        print("⚠️ candles가 v1 형식입니다 - scripts/migrate_candles_v2.py로 먼저 변환하세요")
+        tables.remove('candles')
+    if not tables:
+        print("✅ 변환할 테이블 없음 (이미 월별 파티션)")
+        db.close()
+        return
+
+    cursor = db.conn.cursor()
+    for table in tables:
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        print(f"{table}: {cursor.fetchone()[0]:,}행")
+    cursor.close()
+
+    if not apply:
+        print("\n🔍 DRY RUN 모드 - 변환하려면: python scripts/partition_tables.py --apply")
+        db.close()
+        return
+
+    for table in tables:
+        print(f"\n📦 {table} 변환 중...")
+        try:
+            if use_oracle:
+                partition_oracle_table(db, table)
+                print(f"✅ {table} 변환 완료")
+            else:
+                copied = partition_sqlite_table(db, table, drop_old=drop_old)
+                print(f"✅ {table} 변환 완료: {copied:,}행" +
+                      ("" if drop_old else f" (기존 테이블은 {table}_unpartitioned로 보관)"))
+        except Exception as e:
+            print(f"❌ {table} 변환 실패: {e}")
+            db.conn.rollback()
+            db.close()
+            sys.exit(1)
+
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
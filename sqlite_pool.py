@@ -0,0 +1,161 @@
+"""
+SQLite 성능 프로필 + 읽기 전용 커넥션 풀
+데이터 수집기, 봇, 유지보수 스크립트가 같은 파일을 써도 읽기가 쓰기를 막지 않도록
+WAL 모드로 열고, 쓰기는 전용 커넥션 1개, 읽기는 읽기 전용 커넥션 풀로 나눕니다.
+
+- WAL: 읽기와 쓰기가 동시에 진행 (쓰기 커밋 중에도 읽기 가능)
+- synchronous=NORMAL: WAL에서는 커밋마다 fsync 하지 않아도 손상 위험 없음 (정전 시 마지막 커밋만 유실 가능)
+- cache_size / mmap_size: 자주 읽는 캔들 페이지를 메모리에서 제공
+- busy_timeout: 다른 프로세스가 쓰는 중이면 즉시 실패하지 않고 대기
+- auto_vacuum=INCREMENTAL: 삭제로 생긴 빈 페이지를 incremental_vacuum으로 조금씩 반환
+  (새 파일은 바로 적용, 기존 파일은 VACUUM 한 번 후 적용)
+"""
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# 기본 성능 프로필 (PRAGMA 이름: 값)
+SQLITE_PROFILE = {
+    'auto_vacuum': 'INCREMENTAL',    # 테이블 생성 전에 설정해야 하므로 맨 앞
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64 * 1024,        # 음수 = KiB 단위 → 64MB
+    'mmap_size': 256 * 1024 * 1024,  # 256MB
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,            # ms
+}
+
+# 읽기 커넥션에는 파일 형식을 바꾸는 PRAGMA를 적용하지 않음
+_WRITER_ONLY = ('auto_vacuum', 'journal_mode', 'synchronous')
+
+
+def apply_profile(conn, profile=None, readonly=False):
+    """커넥션에 PRAGMA 프로필 적용
+
+    Returns:
+        dict: 적용 후 PRAGMA 값 (확인용)
+    """
+    profile = SQLITE_PROFILE if profile is None else profile
+    applied = {}
+    for name, value in profile.items():
+        if readonly and name in _WRITER_ONLY:
+            continue
+        row = conn.execute(f"PRAGMA {name} = {value}").fetchone()
+        applied[name] = row[0] if row else value
+    return applied
+
+
+def _is_busy(error):
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+class SQLiteWriter:
+    """전용 쓰기 커넥션 (스레드 간 직렬화 + 대기 시간 측정)"""
+
+    def __init__(self, path, profile=None):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.pragmas = apply_profile(self.conn, profile)
+        self._lock = threading.RLock()
+        self.stats = {'writes': 0, 'lock_wait_ms': 0.0, 'write_ms': 0.0, 'busy_errors': 0}
+
+    @contextmanager
+    def transaction(self):
+        """쓰기 트랜잭션 (커밋/롤백 포함)
+
+        사용 예:
+            with writer.transaction() as cursor:
+                cursor.executemany(...)
+        """
+        started = time.perf_counter()
+        with self._lock:
+            acquired = time.perf_counter()
+            cursor = self.conn.cursor()
+            try:
+                yield cursor
+                self.conn.commit()
+            except sqlite3.OperationalError as e:
+                self.conn.rollback()
+                if _is_busy(e):
+                    self.stats['busy_errors'] += 1
+                raise
+            except Exception:
+                self.conn.rollback()
+                raise
+            finally:
+                cursor.close()
+                finished = time.perf_counter()
+                self.stats['writes'] += 1
+                self.stats['lock_wait_ms'] += (acquired - started) * 1000
+                self.stats['write_ms'] += (finished - acquired) * 1000
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class SQLiteReaderPool:
+    """읽기 전용 커넥션 풀 (mode=ro, 필요할 때 size개까지 생성)"""
+
+    def __init__(self, path, size=4, profile=None):
+        self.path = path
+        self.size = size
+        self.profile = profile
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self.stats = {'reads': 0, 'pool_wait_ms': 0.0, 'read_ms': 0.0, 'busy_errors': 0}
+
+    def _connect(self):
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        apply_profile(conn, self.profile, readonly=True)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """풀에서 커넥션 대여 (모두 사용 중이면 반납될 때까지 대기)"""
+        started = time.perf_counter()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                conn = self._idle.get()
+        acquired = time.perf_counter()
+
+        try:
+            yield conn
+        except sqlite3.OperationalError as e:
+            if _is_busy(e):
+                self.stats['busy_errors'] += 1
+            raise
+        finally:
+            self._idle.put(conn)
+            self.stats['reads'] += 1
+            self.stats['pool_wait_ms'] += (acquired - started) * 1000
+            self.stats['read_ms'] += (time.perf_counter() - acquired) * 1000
+
+    def query(self, sql, params=()):
+        """SELECT 실행 후 전체 행 반환"""
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
@@ -16,6 +16,11 @@ from ma_crossover_strategy import MACrossoverStrategy  # MA 크로스오버
 from coin_selector import CoinSelector  # 거래량 기반 코인 선택
 from bear_market_strategy import BearMarketStrategy, StableCoinHedging  # 하락장 대응
 from concurrent.futures import ThreadPoolExecutor
+from async_upbit_api import fetch_candles_multi_unit
+from upbit_cache import DEFAULT_TTLS
+from candle_aggregator import CandleAggregator
+from order_tracker import OrderTracker
+from upbit_websocket import UpbitWebSocketClient
 
 
 
@@ -182,6 +187,15 @@ class TradingBot:
         self.signal_cache = {}  # {timeframe: (timestamp, signals)}
         self.signal_cache_duration = 10  # 10초간 캐시 유지 (1분봉 대응)
 
+        # 주문 체결 추적 (고정 sleep 후 1회 조회 대체)
+        self.order_tracker = OrderTracker(self.upbit)
+
+        # 체결 → 분봉 집계 (시드 후에는 캔들 API 호출 없음)
+        self.candle_aggregator = CandleAggregator(self.upbit)
+        self.trade_stream = None  # UpbitWebSocketClient (start_candle_stream에서 생성)
+        self.trade_poll_interval = 5  # WebSocket 끊김 시 체결 폴링 간격 (초)
+        self.last_trade_poll = {}  # {market: datetime}
+
         # 드라이런 모드용 가상 잔고
         if self.dry_run:
             self.virtual_krw = 1000000  # 100만원
@@ -273,13 +287,76 @@ class TradingBot:
             'change_24h': change_24h
         }
 
+    def _wait_fill(self, uuid, timeout=5):
+        """주문 체결 요약 (체결 없거나 조회 실패 시 None)"""
+        try:
+            fill = self.order_tracker.wait(uuid, timeout)
+        except Exception as e:
+            self.log(f"⚠️ 체결 추적 실패 ({uuid}): {e}")
+            return None
+        if fill['timed_out']:
+            self.log(f"⚠️ 체결 추적 시간 초과 ({uuid}): state={fill['state']}")
+        return fill if fill['filled'] else None
+
+    def prefetch_candles(self, markets, units=(1, 5, 15, 60, 240), count=200):
+        """여러 마켓×타임프레임 캔들을 동시 조회해 응답 캐시에 등록
+
+        Args:
+            markets: 마켓 리스트
+            units: 분봉 단위 리스트
+            count: 캔들 개수 (get_signals 50개, 추세 분석 200개 모두 충족)
+
+        선조회에 수 초가 걸리므로 봉 단위 TTL(1분봉 1초)이 아닌 한 스캔 주기 동안 유지
+        """
+        for (market, unit), candles in fetch_candles_multi_unit(markets, units, count).items():
+            self.upbit.cache_candles(market, unit, candles, ttl=DEFAULT_TTLS['candle_prefetch'])
+
+    def start_candle_stream(self, markets):
+        """마켓별 분봉 집계 시작 (REST 시드 1회 + WebSocket 체결 구독)"""
+        for market in markets:
+            if not self.candle_aggregator.is_seeded(market):
+                self.candle_aggregator.seed(market)
+
+        if self.trade_stream is None:
+            self.trade_stream = UpbitWebSocketClient(
+                on_message=self.candle_aggregator.handle_message,
+                on_gap=self.candle_aggregator.handle_gap
+            )
+        self.trade_stream.subscribe('trade', markets)
+        self.trade_stream.start()
+
+    def _get_aggregated_candles(self, market, unit, count):
+        """집계기 분봉 (WebSocket이 끊겨 있으면 체결 폴링으로 갱신)"""
+        aggregator = self.candle_aggregator
+        if unit not in aggregator.units or count > aggregator.capacity or not aggregator.is_seeded(market):
+            return None
+
+        if not (self.trade_stream and self.trade_stream.connected.is_set()):
+            now = datetime.now()
+            last_poll = self.last_trade_poll.get(market)
+            if last_poll is None or (now - last_poll).total_seconds() >= self.trade_poll_interval:
+                self.last_trade_poll[market] = now
+                try:
+                    aggregator.poll_trades(market)
+                except Exception as e:
+                    self.log(f"체결 폴링 실패 ({market}): {e}")
+
+        return aggregator.get_candles(market, unit, count)
+
+    def _get_candles(self, market, unit, count):
+        """분봉 조회 (집계기 → 응답 캐시/REST 순)"""
+        candles = self._get_aggregated_candles(market, unit, count)
+        if candles:
+            return candles
+        return self.upbit.get_candles(market, "minutes", unit, count)
+
     def get_trend_analysis(self):
         """다중 시간대 추세 분석 (1H + 4H)"""
         try:
             # 1시간봉 200개 (약 8일치)
-            candles_1h = self.upbit.get_candles(self.market, "minutes", 60, 200)
+            candles_1h = self._get_candles(self.market, 60, 200)
             # 4시간봉 200개 (약 33일치)
-            candles_4h = self.upbit.get_candles(self.market, "minutes", 240, 200)
+            candles_4h = self._get_candles(self.market, 240, 200)
 
             if len(candles_1h) < 50 or len(candles_4h) < 50:
                 return None
@@ -350,7 +427,7 @@ class TradingBot:
             if (now - cached_time).total_seconds() < self.signal_cache_duration:
                 return cached_signals
 
-        candles = self.upbit.get_candles(self.market, "minutes", timeframe, 50)
+        candles = self._get_candles(self.market, timeframe, 50)
         if len(candles) < 50:
             return None
 
@@ -606,20 +683,11 @@ class TradingBot:
                         self.log(f"⚠️ 지정가 실패, 시장가로 체결: UUID={uuid}")
 
                         # 실제 체결 정보 조회
-                        import time
-                        time.sleep(0.5)
-                        order_info = self.upbit.get_order(uuid)
-
-                        if order_info and float(order_info.get('executed_volume', 0)) > 0:
-                            trades = order_info.get('trades', [])
-                            if trades:
-                                total_funds = sum(float(t['funds']) for t in trades)
-                                total_volume = sum(float(t['volume']) for t in trades)
-                                executed_price = total_funds / total_volume if total_volume > 0 else price
-                                amount = total_volume
-                            else:
-                                executed_price = float(order_info.get('avg_price') or price)
-                                amount = float(order_info.get('executed_volume', 0))
+                        fill = self._wait_fill(uuid)
+
+                        if fill:
+                            executed_price = fill['avg_price'] or price
+                            amount = fill['executed_volume']
                             self.log(f"✅ 폴백 체결: 평균가={executed_price:,.0f}원, 수량={amount:.8f}")
                         else:
                             self.log(f"⚠️ 폴백 체결 정보 조회 실패, 예상값 사용")
@@ -660,32 +728,19 @@ class TradingBot:
                     uuid = result.get('uuid')
                     self.log(f"✅ 시장가 주문 생성: UUID={uuid}, 시도금액={position_krw:,.0f}원")
 
-                    # 실제 체결 정보 조회 (중요!)
-                    import time
-                    time.sleep(0.5)  # 체결 대기
-                    order_info = self.upbit.get_order(uuid)
-
-                    self.log(f"🔍 주문 조회: state={order_info.get('state') if order_info else 'None'}, "
-                            f"executed_vol={order_info.get('executed_volume') if order_info else 'None'}")
+                    # 실제 체결 정보 조회 (중요!) - 체결 완료까지 적응형 조회
+                    fill = self._wait_fill(uuid)
 
                     # 체결 정보 추출 (state가 done 또는 cancel이어도 체결되었으면 OK)
-                    if order_info and float(order_info.get('executed_volume', 0)) > 0:
-                        # trades 배열에서 실제 체결가 계산
-                        trades = order_info.get('trades', [])
-                        if trades:
-                            total_funds = sum(float(t['funds']) for t in trades)
-                            total_volume = sum(float(t['volume']) for t in trades)
-                            executed_price = total_funds / total_volume if total_volume > 0 else price
-                            amount = total_volume
-                        else:
-                            # avg_price가 있으면 사용
-                            executed_price = float(order_info.get('avg_price') or price)
-                            amount = float(order_info.get('executed_volume', 0))
+                    if fill:
+                        # trades 기준 VWAP 체결가
+                        executed_price = fill['avg_price'] or price
+                        amount = fill['executed_volume']
 
-                        self.log(f"✅ 체결 완료: 평균가={executed_price:,.0f}원, 수량={amount:.8f}")
+                        self.log(f"✅ 체결 완료: 평균가={executed_price:,.0f}원, 수량={amount:.8f} (state={fill['state']})")
                     else:
                         # 조회 실패 시 예상값 사용
-                        self.log(f"⚠️ 체결 정보 조회 실패, 예상값 사용 (state={order_info.get('state') if order_info else 'None'})")
+                        self.log(f"⚠️ 체결 정보 조회 실패, 예상값 사용")
                         executed_price = price
                         amount = position_krw / price
 
@@ -897,6 +952,13 @@ class TradingBot:
                     )
                     return False
 
+                # 실제 체결가/수량으로 손익 계산 (부분 체결 반영)
+                fill = self._wait_fill(result['uuid']) if 'uuid' in result else None
+                if fill:
+                    price = fill['avg_price'] or price
+                    coin_balance = fill['executed_volume']
+                    profit_rate = (price - buy_price) / buy_price * 100
+
             sell_krw = coin_balance * price
             profit = sell_krw - position['buy_krw']
 
@@ -1063,6 +1125,11 @@ class TradingBot:
                     self.log(f"❌ 부분 매도 실패: {error_msg}")
                     return False
 
+                fill = self._wait_fill(result['uuid']) if 'uuid' in result else None
+                if fill:
+                    price = fill['avg_price'] or price
+                    sell_amount = fill['executed_volume']
+
             sell_krw = sell_amount * price
             profit = sell_krw - (self.position['buy_krw'] * ratio)
 
@@ -1140,7 +1207,7 @@ class TradingBot:
         try:
             # ATR 계산 (1시간봉 기준)
             from advanced_features import VolatilityManager
-            candles = self.upbit.get_candles(self.market, "minutes", 60, 30)
+            candles = self._get_candles(self.market, 60, 30)
 
             if not candles or len(candles) < 14:
                 return self.stop_loss  # 데이터 부족 시 기본값
@@ -1207,6 +1274,10 @@ class TradingBot:
 
                 # 마켓 변경
                 self.market = best_coin['market']
+                try:
+                    self.start_candle_stream([self.market])
+                except Exception as e:
+                    self.log(f"분봉 집계 시작 실패 ({self.market}): {e}")
                 return True
 
             return False
@@ -1230,6 +1301,9 @@ class TradingBot:
             if not self.market_scanner.cached_rankings:
                 return None
 
+            # TOP N 코인 캔들 동시 선조회 (1/5/15분 신호 + 60/240분 추세)
+            self.prefetch_candles([coin['market'] for coin in self.market_scanner.cached_rankings[:top_n]])
+
             # TOP N 코인 체크
             best_signal = None
             best_score = 0
@@ -1718,6 +1792,10 @@ class TradingBot:
                 self.send_market_info()
             elif cmd == '/trend':
                 self.send_trend_info()
+            elif cmd == '/orders':
+                self.send_open_orders()
+            elif cmd == '/cancelall':
+                self.cancel_all_orders()
             elif cmd == '/help':
                 self.send_help()
             else:
@@ -1747,6 +1825,11 @@ class TradingBot:
                 msg += f"  • RSI: {signals['rsi']:.1f}\n"
                 msg += f"  • 볼린저: {signals['bb_pos']:.1f}%\n\n"
             
+            if self.upbit.cache:
+                cache = self.upbit.cache.get_stats()
+                msg += f"🗄️ 시세 캐시: 적중 {cache['hit_rate']*100:.0f}% "
+                msg += f"(요청 {cache['misses']}회 / 재사용 {cache['hits'] + cache['coalesced']}회)\n"
+
             msg += f"🤖 봇: 정상 작동\n"
             msg += f"⏰ {datetime.now().strftime('%H:%M:%S')}"
             
@@ -1854,6 +1937,56 @@ class TradingBot:
         except Exception as e:
             self.telegram.send_message(f"조회 실패: {e}")
     
+    def send_open_orders(self):
+        """미체결 주문 (전체 마켓 1회 조회)"""
+        orders = self.upbit.get_open_orders()
+        if orders is None:
+            self.telegram.send_message("❌ 미체결 주문 조회 실패")
+            return
+        if not orders:
+            self.telegram.send_message("📭 미체결 주문 없음")
+            return
+
+        msg = f"📋 <b>미체결 주문</b> ({len(orders)}건)\n━━━━━━━━━━━━━━━━━\n\n"
+        for order in orders[:20]:
+            side = '매수' if order['side'] == 'bid' else '매도'
+            msg += f"• {order['market']} {side} {float(order['price']):,.0f}원 × {float(order['remaining_volume']):.6f}\n"
+        if len(orders) > 20:
+            msg += f"... 외 {len(orders) - 20}건\n"
+        self.telegram.send_message(msg)
+
+    def cancel_all_orders(self, markets=None):
+        """미체결 주문 일괄 취소 (긴급 정리용)
+
+        Args:
+            markets: 취소할 마켓 목록 (None이면 미체결 주문이 있는 모든 마켓)
+        """
+        if self.dry_run:
+            self.telegram.send_message("🧪 시뮬레이션 모드: 취소할 실제 주문 없음")
+            return None
+
+        if markets is None:
+            orders = self.upbit.get_open_orders()
+            if orders is None:
+                self.telegram.send_message("❌ 미체결 주문 조회 실패")
+                return None
+            markets = sorted({order['market'] for order in orders})
+        if not markets:
+            self.telegram.send_message("📭 취소할 미체결 주문 없음")
+            return None
+
+        result = self.upbit.cancel_orders(markets=markets)
+        self.log(f"주문 일괄 취소: 성공 {len(result['success'])}건, 실패 {len(result['failed'])}건")
+
+        msg = f"🧹 <b>미체결 주문 취소</b>\n━━━━━━━━━━━━━━━━━\n\n"
+        msg += f"✅ 취소: {len(result['success'])}건\n"
+        if result['failed']:
+            msg += f"❌ 실패: {len(result['failed'])}건\n"
+            for order in result['failed'][:5]:
+                msg += f"  • {order.get('market') or order['uuid'][:8]}: {order.get('error_message', '')}\n"
+        self.telegram.send_message(msg)
+        return result
+
     def send_help(self):
         """도움말"""
         msg = f"🤖 <b>명령어</b>\n━━━━━━━━━━━━━━━━━\n\n"
@@ -1862,6 +1995,8 @@ class TradingBot:
         msg += f"/market - 시장 현황\n"
         msg += f"/trend - 추세 분석\n"
         msg += f"/report - 일일 리포트\n"
+        msg += f"/orders - 미체결 주문\n"
+        msg += f"/cancelall - 미체결 주문 전체 취소\n"
         msg += f"/help - 도움말\n\n"
         msg += f"⚙️ 다층 익절 전략:\n"
         msg += f"  • ⚡ 퀵익절: +{self.quick_profit*100:.1f}% (30분내)\n"
@@ -1980,7 +2115,7 @@ class TradingBot:
         try:
             # ATR 계산을 위한 데이터 가져오기
             from advanced_features import VolatilityManager
-            candles = self.upbit.get_candles(self.market, 15, 30)  # 15분봉 30개
+            candles = self._get_candles(self.market, 15, 30)  # 15분봉 30개
             if not candles or len(candles) < 14:
                 return
 
@@ -2017,6 +2152,12 @@ class TradingBot:
 
         self.log(f"\n🤖 봇 시작 (기본 {interval}초 체크, 동적 조절 활성화)")
 
+        # 신호 계산용 분봉은 체결 스트림으로 갱신 (실패 시 REST 조회로 동작)
+        try:
+            self.start_candle_stream(list(dict.fromkeys([self.market, *self.positions])))
+        except Exception as e:
+            self.log(f"분봉 집계 시작 실패: {e}")
+
         try:
             while self.is_running:
                 # 동적 스캔 빈도 업데이트
@@ -2034,6 +2175,8 @@ class TradingBot:
         finally:
             # 백그라운드 작업 정리
             self.executor.shutdown(wait=True)
+            if self.trade_stream:
+                self.trade_stream.stop()
 
 
 # ===== 실행 =====
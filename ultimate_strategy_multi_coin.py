@@ -13,6 +13,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import warnings
+from candle_store import CandleStore
 warnings.filterwarnings('ignore')
 
 
@@ -561,12 +562,19 @@ def main():
         data_dict = {}
 
         print("데이터 로드 중...")
+        store = CandleStore()
         for coin in coins_to_load:
+            # 캔들 저장소 (download_multi_coins.py) 우선, 없으면 CSV
+            df = store.load(f'KRW-{coin}', '240m', as_frame=True)
+            if df is not None:
+                data_dict[coin] = df
+                print(f"  ✅ {coin}: {len(df)}개 캔들")
+                continue
             try:
                 df = pd.read_csv(f'upbit_{coin.lower()}_4h.csv')
                 df['timestamp'] = pd.to_datetime(df['timestamp'])
                 data_dict[coin] = df
-                print(f"  ✅ {coin}: {len(df)}개 캔들")
+                print(f"  ✅ {coin}: {len(df)}개 캔들 (CSV)")
             except FileNotFoundError:
                 print(f"  ⚠️ {coin}: 파일 없음 (스킵)")
 
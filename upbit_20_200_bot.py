@@ -16,12 +16,17 @@
 - 부분 익절: +1.5% (50%), +3% (나머지)
 """
 import os
+import threading
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import time
 import requests
 from upbit_api import UpbitAPI
+from upbit_websocket import UpbitWebSocketClient
+from order_tracker import OrderTracker
+from price_reader import HedgedPriceReader
+from candle_decoder import candles_to_dataframe
 from upbit_coin_scanner_20_200 import UpbitCoinScanner_20_200
 
 
@@ -92,7 +97,7 @@ class Upbit20_200Bot:
     """업비트 20/200 SMA 자동매매 봇"""
 
     def __init__(self, access_key=None, secret_key=None, telegram_token=None, telegram_chat_id=None,
-                 dry_run=True, initial_balance_krw=None, timeframe=1):
+                 dry_run=True, initial_balance_krw=None, timeframe=1, use_websocket=True):
         """
         Args:
             access_key: 업비트 API Access Key
@@ -102,6 +107,7 @@ class Upbit20_200Bot:
             dry_run: 시뮬레이션 모드 (True=가상거래, False=실거래)
             initial_balance_krw: 초기 자본 (KRW) - None이면 실제 잔고 조회
             timeframe: 타임프레임 (분) - 1, 3, 5, 10, 15, 30, 60
+            use_websocket: 포지션 보유 중 WebSocket 실시간 체결가 사용
         """
         # 업비트 API
         self.upbit = UpbitAPI(
@@ -109,13 +115,24 @@ class Upbit20_200Bot:
             secret_key or os.getenv('UPBIT_SECRET_KEY')
         )
 
+        # 주문 체결 추적 (주문은 즉시 반환, 체결가는 콜백으로 보정)
+        self.order_tracker = OrderTracker(self.upbit)
+
+        # 실시간 시세 (포지션 모니터링용, 끊기면 REST로 대체)
+        self.ws = UpbitWebSocketClient() if use_websocket else None
+        self.ws_max_age = 5  # 이보다 오래된 WebSocket 가격은 사용 안 함 (초)
+
+        # REST 현재가 (느린 응답은 헤지 요청, 갱신 중에는 직전 가격으로 청산 판단)
+        self.price_reader = HedgedPriceReader(self.upbit)
+
         # 텔레그램
         self.telegram = TelegramNotifier(telegram_token, telegram_chat_id)
 
         # 코인 스캐너
         self.scanner = UpbitCoinScanner_20_200(
             min_volume_krw=10_000_000_000,  # 100억원 이상
-            timeframe=timeframe
+            timeframe=timeframe,
+            upbit=self.upbit  # 커넥션 풀 공유
         )
 
         # 거래 모드
@@ -139,6 +156,9 @@ class Upbit20_200Bot:
 
         # 현재 포지션
         self.position = None  # {'market', 'entry_price', 'amount', 'entry_time', 'partial_sold', 'invest_krw'}
+        self.pending_order = None  # 체결 확인 중인 매수 주문 uuid (확인 전에는 매도 보류)
+        # position/balance_krw/pending_order는 체결 콜백(추적 스레드)과 메인 루프가 함께 바꾸므로 같은 락으로 보호
+        self.state_lock = threading.Lock()
 
         # 거래 기록
         self.trades = []
@@ -161,13 +181,32 @@ class Upbit20_200Bot:
         print(f"{'='*70}\n")
 
     def get_current_price(self, market):
-        """현재 가격 조회"""
-        try:
-            ticker = self.upbit.get_current_price(market)
-            return ticker['trade_price']
-        except Exception as e:
-            print(f"❌ 가격 조회 실패 ({market}): {e}")
-            return None
+        """현재 가격 조회 (WebSocket 최신가 우선)"""
+        if self.ws:
+            price, age = self.ws.get_latest_price(market)
+            if price is not None and age <= self.ws_max_age:
+                return price
+
+        price, age = self.price_reader.get_price(market)
+        if price is None:
+            print(f"❌ 가격 조회 실패 ({market})")
+        elif age > self.ws_max_age:
+            print(f"⚠️ {age:.0f}초 전 가격 사용 ({market})")
+        return price
+
+    def watch_market(self, market):
+        """실시간 시세 구독 (이미 구독 중이면 무시)"""
+        if not self.ws:
+            return
+        self.ws.subscribe('ticker', [market])
+        self.ws.start()
+
+    def wait_tick(self, timeout=1):
+        """다음 체결까지 대기 (WebSocket 미연결 시 sleep)"""
+        if self.ws and self.ws.connected.is_set():
+            self.ws.wait_for_update(timeout)
+        else:
+            time.sleep(timeout)
 
     def get_candles(self, market, count=250):
         """캔들 데이터 조회"""
@@ -179,26 +218,8 @@ class Upbit20_200Bot:
                 count=count
             )
 
-            if not candles:
-                return None
-
-            df = pd.DataFrame(candles)
-            # 업비트는 최신 데이터가 먼저 오므로 역순 정렬
-            df = df.iloc[::-1].reset_index(drop=True)
-
-            df = df.rename(columns={
-                'candle_date_time_kst': 'timestamp',
-                'opening_price': 'open',
-                'high_price': 'high',
-                'low_price': 'low',
-                'trade_price': 'close',
-                'candle_acc_trade_volume': 'volume'
-            })
-
-            df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-
-            return df
+            # 시간 오름차순 컬럼으로 바로 디코딩 (타임스탬프 문자열 파싱 없음)
+            return candles_to_dataframe(candles)
 
         except Exception as e:
             print(f"❌ 캔들 조회 실패 ({market}): {e}")
@@ -334,28 +355,27 @@ class Upbit20_200Bot:
                     self.telegram.send(f"❌ 매수 실패: {market}\n{order['error']['message']}")
                     return False
 
-                # 체결 확인 대기 (최대 10초)
-                for _ in range(10):
-                    time.sleep(1)
-                    ticker = self.upbit.get_current_price(market)
-                    if ticker:
-                        break
-
-                self.position = {
-                    'market': market,
-                    'entry_price': ticker['trade_price'],
-                    'amount': amount,  # 실제로는 주문 체결 정보에서 가져와야 함
-                    'invest_krw': invest_krw,
-                    'entry_time': datetime.now(),
-                    'partial_sold': False,
-                    'order_id': order.get('uuid', '')
-                }
+                # 예상가로 포지션/잔고를 먼저 반영하고, 실제 체결가/수량/금액은 체결 콜백에서 보정
+                # (체결 확인 전에는 매도하지 않음)
+                with self.state_lock:
+                    self.position = {
+                        'market': market,
+                        'entry_price': price,
+                        'amount': amount,
+                        'invest_krw': invest_krw,
+                        'entry_time': datetime.now(),
+                        'partial_sold': False,
+                        'order_id': order.get('uuid', '')
+                    }
+                    self.balance_krw -= invest_krw
+                    self.pending_order = order['uuid']
+                self.order_tracker.track(order['uuid'], callback=self._on_buy_fill)
 
                 msg = f"""
-🟢 <b>매수 체결</b>
+🟢 <b>매수 주문</b>
 ━━━━━━━━━━━━━━━━━
 코인: {market}
-가격: ₩{ticker['trade_price']:,.0f}
+예상가: ₩{price:,.0f}
 투자: ₩{invest_krw:,.0f}
 주문ID: {order.get('uuid', '')[:8]}...
 """
@@ -368,10 +388,86 @@ class Upbit20_200Bot:
                 self.telegram.send(f"❌ 매수 실패: {market}\n{e}")
                 return False
 
+    def _held_volume(self, market):
+        """계좌의 코인 보유 수량 (조회 실패 시 None)"""
+        try:
+            currency = market.split('-')[1]
+            for account in self.upbit.get_accounts():
+                if account['currency'] == currency:
+                    return float(account['balance'])
+            return 0.0
+        except Exception as e:
+            print(f"❌ 보유 수량 조회 실패: {e}")
+            return None
+
+    def _on_buy_fill(self, fill):
+        """매수 체결 콜백 - 포지션/잔고를 실제 체결가/수량/금액으로 보정 후 매도 보류 해제"""
+        with self.state_lock:
+            position = self.position
+            if not position or position.get('order_id') != fill['uuid']:
+                return
+
+        if not fill['filled']:
+            if fill['final']:
+                print(f"❌ 매수 미체결 ({fill['state']}) - 포지션 취소")
+                with self.state_lock:
+                    self.balance_krw += position['invest_krw']
+                    self.position = None
+                    self.pending_order = None
+                self.telegram.send(f"❌ 매수 미체결: {position['market']}")
+            else:
+                # 체결 확인 실패: 잔고는 예상 금액으로 차감된 상태 유지, 수량은 계좌 보유량으로 맞춤
+                held = self._held_volume(position['market'])
+                with self.state_lock:
+                    if held:
+                        position['amount'] = held
+                    self.pending_order = None
+                print(f"⚠️ 매수 체결 확인 지연 - 예상가 유지, 수량 "
+                      f"{'계좌 기준' if held else '예상'} {position['amount']:.6f} ({fill['uuid'][:8]}...)")
+            return
+
+        with self.state_lock:
+            estimated_krw = position['invest_krw']
+            position['entry_price'] = fill['avg_price']
+            position['amount'] = fill['executed_volume']
+            position['invest_krw'] = fill['funds'] + fill['paid_fee']
+            self.balance_krw += estimated_krw - position['invest_krw']
+            self.pending_order = None
+
+        msg = f"""
+🟢 <b>매수 체결</b>
+━━━━━━━━━━━━━━━━━
+코인: {position['market']}
+체결가: ₩{fill['avg_price']:,.0f} (VWAP)
+수량: {fill['executed_volume']:.6f}
+투자: ₩{position['invest_krw']:,.0f}
+"""
+        print(msg)
+        self.telegram.send(msg)
+
+    def _on_sell_fill(self, fill, trade, sell_amount, cost_krw, estimated_krw):
+        """매도 체결 콜백 - 예상가로 반영한 잔고/거래 기록을 실제 체결 금액 기준으로 보정"""
+        if not fill['filled']:
+            print(f"⚠️ 매도 체결 확인 실패 ({fill['state']}) - 예상가 기준 잔고/기록 유지")
+            return
+
+        cost = cost_krw * min(1.0, fill['executed_volume'] / sell_amount) if sell_amount else cost_krw
+        proceeds = fill['funds'] - fill['paid_fee']
+        with self.state_lock:
+            trade['exit_price'] = fill['avg_price']
+            trade['profit'] = proceeds - cost
+            trade['profit_pct'] = (trade['profit'] / cost) * 100 if cost else 0.0
+            self.balance_krw += proceeds - estimated_krw
+
+        if fill['remaining_volume'] > 0:
+            print(f"⚠️ 매도 부분 체결: 잔량 {fill['remaining_volume']:.8f}")
+        print(f"✅ 매도 체결 보정: ₩{fill['avg_price']:,.0f} | 수익 ₩{trade['profit']:+,.0f} ({trade['profit_pct']:+.2f}%)")
+
     def execute_sell(self, price, reason):
-        """매도 실행"""
-        if not self.position:
-            return False
+        """매도 실행 (매수 체결 확인 중이면 보류 - 수량이 확정되지 않음)"""
+        with self.state_lock:
+            if not self.position or self.pending_order:
+                return False
 
         market = self.position['market']
         entry_price = self.position['entry_price']
@@ -460,6 +556,22 @@ class Upbit20_200Bot:
                 }
                 self.trades.append(trade)
 
+                # 손익/잔고는 예상가 기준으로 먼저 반영하고 체결 후 VWAP으로 보정
+                cost_krw = self.position['invest_krw'] * sell_ratio
+                with self.state_lock:
+                    self.balance_krw += final_value
+                    # 포지션 업데이트
+                    if is_partial:
+                        self.position['amount'] *= 0.5
+                        self.position['invest_krw'] *= 0.5
+                        self.position['partial_sold'] = True
+                    else:
+                        self.position = None
+                self.order_tracker.track(
+                    order['uuid'],
+                    callback=lambda fill: self._on_sell_fill(fill, trade, sell_amount, cost_krw, final_value)
+                )
+
                 msg = f"""
 🔴 <b>매도 체결</b>
 ━━━━━━━━━━━━━━━━━
@@ -475,15 +587,6 @@ class Upbit20_200Bot:
 """
                 print(msg)
                 self.telegram.send(msg)
-
-                # 포지션 업데이트
-                if is_partial:
-                    self.position['amount'] *= 0.5
-                    self.position['invest_krw'] *= 0.5
-                    self.position['partial_sold'] = True
-                else:
-                    self.position = None
-
                 return True
 
             except Exception as e:
@@ -596,10 +699,21 @@ class Upbit20_200Bot:
         last_scan_time = None
         scan_interval = 300  # 5분마다 스캔
 
+        # 틱마다 도는 루프에서 텔레그램 long polling(1초)이 지연을 만들지 않도록 간격 제한
+        last_command_check = 0
+        command_interval = 3
+
+        # 포지션 모니터링용 캔들 (봉이 바뀔 때만 다시 조회)
+        monitor_df = None
+        monitor_bar = None
+
         try:
             while self.running:
                 # 텔레그램 명령어 체크
-                messages = self.telegram.get_updates()
+                messages = []
+                if time.time() - last_command_check >= command_interval:
+                    messages = self.telegram.get_updates()
+                    last_command_check = time.time()
                 for msg in messages:
                     msg_lower = msg.lower().strip()
 
@@ -654,19 +768,28 @@ class Upbit20_200Bot:
 
                     time.sleep(1)  # 10초 → 1초로 변경
 
+                # 매수 체결 확인 중이면 매도 판단 보류
+                elif self.pending_order:
+                    self.wait_tick(1)
+
                 # 포지션 있으면 모니터링
                 else:
                     market = self.position['market']
+                    self.watch_market(market)
                     current_price = self.get_current_price(market)
 
                     if not current_price:
                         time.sleep(1)
                         continue
 
-                    # 캔들 데이터 조회 (20MA 이탈 체크용)
-                    df = self.get_candles(market)
-                    if df is not None:
-                        df = self.calculate_indicators(df)
+                    # 캔들 데이터 조회 (20MA 이탈 체크용) - 새 봉이 시작될 때만
+                    bar = (market, int(time.time() // (self.timeframe * 60)))
+                    if bar != monitor_bar:
+                        monitor_df = self.get_candles(market)
+                        if monitor_df is not None:
+                            monitor_df = self.calculate_indicators(monitor_df)
+                            monitor_bar = bar
+                    df = monitor_df
 
                     # 매도 신호 체크
                     should_sell, reason = self.check_sell_signal(current_price, df)
@@ -688,7 +811,7 @@ class Upbit20_200Bot:
                         # 현재 수익률 표시
                         profit_pct = ((current_price - self.position['entry_price']) / self.position['entry_price']) * 100
                         print(f"📊 {market} | 가격: ₩{current_price:,.0f} | 수익: {profit_pct:+.2f}%", end='\r')
-                        time.sleep(1)  # 3초 → 1초로 변경
+                        self.wait_tick(1)  # 새 체결이 오면 즉시 재확인
 
         except KeyboardInterrupt:
             print("\n\n봇 종료 중...")
@@ -705,6 +828,10 @@ class Upbit20_200Bot:
         """봇 종료"""
         self.running = False
 
+        # 매수 체결 확인 중이면 수량이 확정된 뒤 청산
+        if self.pending_order:
+            self.order_tracker.wait(self.pending_order, timeout=5)
+
         # 포지션 있으면 강제 청산
         if self.position:
             print("\n⚠️ 포지션 강제 청산...")
@@ -713,6 +840,10 @@ class Upbit20_200Bot:
             if current_price:
                 self.execute_sell(current_price, "봇종료")
 
+        # 체결 확인 중인 주문은 결과 반영 후 종료
+        for order_id in self.order_tracker.pending():
+            self.order_tracker.wait(order_id, timeout=5)
+
         # 최종 결과
         total_return = self.balance_krw - self.initial_balance
         total_return_pct = (total_return / self.initial_balance) * 100
@@ -732,6 +863,9 @@ class Upbit20_200Bot:
         print(msg)
         self.telegram.send(msg)
 
+        if self.ws:
+            self.ws.stop()
+
 
 def main():
     """메인 함수"""
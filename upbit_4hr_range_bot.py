@@ -15,12 +15,15 @@
 """
 import os
 import sys
-import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import time
 import requests
 from upbit_api import UpbitAPI
+from upbit_websocket import UpbitWebSocketClient
+from order_tracker import OrderTracker
+from price_reader import HedgedPriceReader
+from candle_decoder import candles_to_dataframe
 
 
 class TelegramNotifier:
@@ -83,7 +86,7 @@ class Upbit4HRangeBot:
 
     def __init__(self, access_key, secret_key, market='KRW-BTC',
                  telegram_token=None, telegram_chat_id=None,
-                 dry_run=True, initial_balance_krw=None):
+                 dry_run=True, initial_balance_krw=None, use_websocket=True):
         """
         초기화
 
@@ -91,8 +94,13 @@ class Upbit4HRangeBot:
             market: 거래 마켓 (기본: KRW-BTC)
             dry_run: 시뮬레이션 모드 (True=가상거래, False=실거래)
             initial_balance_krw: 초기 자본
+            use_websocket: WebSocket 실시간 체결가로 돌파/청산 확인
         """
         self.upbit = UpbitAPI(access_key, secret_key)
+        self.order_tracker = OrderTracker(self.upbit)
+        self.ws = UpbitWebSocketClient() if use_websocket else None
+        self.ws_max_age = 5  # 이보다 오래된 WebSocket 가격은 사용 안 함 (초)
+        self.price_reader = HedgedPriceReader(self.upbit)  # REST 현재가 (헤지 + 직전 가격 대체)
         self.telegram = TelegramNotifier(telegram_token, telegram_chat_id)
         self.market = market
         self.dry_run = dry_run
@@ -219,37 +227,20 @@ class Upbit4HRangeBot:
             print(f"❌ 기존 포지션 확인 실패: {e}")
 
     def get_current_price(self, market):
-        """현재가 조회"""
-        try:
-            ticker = self.upbit.get_ticker(market)
-            if ticker:
-                return float(ticker['trade_price'])
-        except:
-            pass
-        return None
+        """현재가 조회 (WebSocket 최신가 우선)"""
+        if self.ws:
+            price, age = self.ws.get_latest_price(market)
+            if price is not None and age <= self.ws_max_age:
+                return float(price)
+
+        price, _ = self.price_reader.get_price(market)
+        return price
 
     def fetch_candles(self, timeframe_minutes, count=200):
         """캔들 데이터 수집"""
         try:
-            url = f"https://api.upbit.com/v1/candles/minutes/{timeframe_minutes}"
-            params = {'market': self.market, 'count': count}
-            response = requests.get(url, params=params, timeout=10)
-
-            if response.status_code == 200:
-                candles = response.json()
-                # 최신 데이터가 먼저 오므로 역순 정렬
-                candles.reverse()
-
-                df = pd.DataFrame({
-                    'timestamp': pd.to_datetime([c['candle_date_time_kst'] for c in candles]),
-                    'open': [c['opening_price'] for c in candles],
-                    'high': [c['high_price'] for c in candles],
-                    'low': [c['low_price'] for c in candles],
-                    'close': [c['trade_price'] for c in candles],
-                    'volume': [c['candle_acc_trade_volume'] for c in candles]
-                })
-
-                return df
+            candles = self.upbit.get_candles(self.market, "minutes", timeframe_minutes, count)
+            return candles_to_dataframe(candles)
         except Exception as e:
             print(f"❌ 캔들 데이터 수집 실패: {e}")
 
@@ -408,12 +399,12 @@ class Upbit4HRangeBot:
                 result = self.upbit.buy_market_order(self.market, buy_amount)
 
                 if result and 'uuid' in result:
-                    time.sleep(0.5)
-                    order_info = self.upbit.get_order(result['uuid'])
+                    # 시장가 매수는 잔량 취소(cancel)로 끝나므로 state가 아닌 체결량으로 판단
+                    fill = self.order_tracker.wait(result['uuid'], timeout=10)
 
-                    if order_info and order_info['state'] == 'done':
-                        quantity = float(order_info['executed_volume'])
-                        avg_price = float(order_info['trades'][0]['price']) if order_info.get('trades') else current_price
+                    if fill['filled']:
+                        quantity = fill['executed_volume']
+                        avg_price = fill['avg_price'] or current_price
 
                         print(f"\n💰 매수 체결")
                         print(f"   가격: {avg_price:,.0f}원")
@@ -482,15 +473,17 @@ class Upbit4HRangeBot:
                 result = self.upbit.sell_market_order(self.market, quantity)
 
                 if result and 'uuid' in result:
-                    time.sleep(0.5)
-                    order_info = self.upbit.get_order(result['uuid'])
+                    fill = self.order_tracker.wait(result['uuid'], timeout=10)
 
-                    if order_info and order_info['state'] == 'done':
-                        avg_price = float(order_info['trades'][0]['price']) if order_info.get('trades') else current_price
+                    if fill['filled']:
+                        avg_price = fill['avg_price'] or current_price
+                        quantity = fill['executed_volume']
 
                         print(f"\n💵 매도 체결 ({reason})")
                         print(f"   가격: {avg_price:,.0f}원")
                         print(f"   수량: {quantity:.8f}")
+                        if fill['remaining_volume'] > 0:
+                            print(f"   ⚠️ 미체결 잔량: {fill['remaining_volume']:.8f}")
 
                         current_price = avg_price
                     else:
@@ -612,10 +605,26 @@ class Upbit4HRangeBot:
         """봇 실행"""
         print("\n🤖 봇 시작...\n")
 
+        if self.ws:
+            self.ws.subscribe('ticker', [self.market])
+            self.ws.start(wait_connected=5)
+
+        # 체결마다 도는 루프에서 텔레그램/레인지 확인은 30초 간격으로만
+        last_housekeeping = 0
+        housekeeping_interval = 30
+
         try:
             while self.running and not self.telegram.stop_requested:
-                # 텔레그램 명령어 확인
-                command = self.telegram.check_commands()
+                command = None
+                if time.time() - last_housekeeping >= housekeeping_interval:
+                    last_housekeeping = time.time()
+
+                    # 텔레그램 명령어 확인
+                    command = self.telegram.check_commands()
+
+                    # 4시간 레인지 업데이트
+                    self.update_daily_range()
+
                 if command == 'stop':
                     print("\n🛑 정지 명령 수신")
                     self.telegram.send("🛑 봇을 정지합니다.")
@@ -631,9 +640,6 @@ class Upbit4HRangeBot:
                     )
                     self.telegram.send(help_msg)
 
-                # 4시간 레인지 업데이트
-                self.update_daily_range()
-
                 # 거래 가능 시간 확인
                 if not self.is_trading_hours():
                     time.sleep(60)
@@ -664,8 +670,11 @@ class Upbit4HRangeBot:
                     if exit_signal:
                         self.execute_sell(current_price, exit_signal)
 
-                # 30초 대기
-                time.sleep(30)
+                # 다음 체결까지 대기 (WebSocket 미연결 시 30초)
+                if self.ws and self.ws.connected.is_set():
+                    self.ws.wait_for_update(housekeeping_interval)
+                else:
+                    time.sleep(housekeeping_interval)
 
         except KeyboardInterrupt:
             print("\n\n🛑 사용자에 의해 중지됨")
@@ -674,6 +683,8 @@ class Upbit4HRangeBot:
             print(f"\n❌ 오류 발생: {e}")
             self.telegram.send(f"❌ 오류 발생: {e}")
         finally:
+            if self.ws:
+                self.ws.stop()
             self.print_status()
             print("\n✅ 봇 종료")
 
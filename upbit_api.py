@@ -2,15 +2,172 @@ import os
 import jwt
 import hashlib
 import requests
+import threading
+import time
 import uuid
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlencode, unquote
+from requests.adapters import HTTPAdapter
+from upbit_rate_limiter import get_shared_limiter
+from upbit_cache import get_shared_cache, bar_ttl, bar_boundary, DEFAULT_TTLS
+from upbit_replay import get_session_recorder
+from candle_decoder import decode_candles, concat_columns, to_dataframe
 
 class UpbitAPI:
-    def __init__(self, access_key, secret_key):
+    # 엔드포인트 그룹별 (connect, read) 타임아웃 (초)
+    TIMEOUTS = {
+        'market': (2, 3),    # 마켓/티커/호가/체결 조회
+        'candle': (2, 5),    # 캔들 조회 (응답이 큼)
+        'order': (3, 10),    # 주문 생성/취소
+        'default': (3, 5),   # 계좌/주문 조회 등 기타 Exchange API
+    }
+
+    # 429 응답 시 재시도 횟수
+    MAX_THROTTLE_RETRIES = 2
+
+    # /v1/ticker 1회 요청당 마켓 수 (URL 길이 제한)
+    TICKER_CHUNK_SIZE = 100
+
+    # 캔들 1회 요청 최대 개수
+    CANDLE_PAGE_SIZE = 200
+
+    # 주문 일괄 조회/취소 1회 요청당 uuid 수, 미체결 목록 페이지 크기
+    ORDER_QUERY_CHUNK_SIZE = 100
+    ORDER_CANCEL_CHUNK_SIZE = 20
+    OPEN_ORDER_PAGE_SIZE = 100
+
+    def __init__(self, access_key, secret_key, pool_connections=4, pool_maxsize=10,
+                 rate_limiter=None, response_cache=None, server_url=None, recorder=None):
+        """
+        Args:
+            access_key: 업비트 API Access Key (시세 조회만 하면 None 가능)
+            secret_key: 업비트 API Secret Key
+            pool_connections: 호스트별 커넥션 풀 개수
+            pool_maxsize: 풀당 유지할 keep-alive 커넥션 수 (동시 요청 스레드 수 이상)
+            rate_limiter: UpbitRateLimiter (None이면 프로세스 공유 인스턴스)
+            response_cache: 시세 응답 ResponseCache (None이면 프로세스 공유 인스턴스, False면 캐시 안 함)
+            server_url: API 주소 (None이면 UPBIT_SERVER_URL 환경변수 또는 api.upbit.com)
+            recorder: 요청/응답 SessionRecorder (None이면 UPBIT_RECORD_PATH 환경변수로 결정)
+        """
         self.access_key = access_key
         self.secret_key = secret_key
-        self.server_url = "https://api.upbit.com"
-    
+        self.server_url = server_url or os.getenv('UPBIT_SERVER_URL', "https://api.upbit.com")
+        self.recorder = recorder or get_session_recorder()
+
+        # keep-alive 커넥션 재사용 (매 요청 TCP+TLS 핸드셰이크 제거)
+        self.session = requests.Session()
+        self._adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', self._adapter)
+        self.session.mount('http://', self._adapter)
+
+        # Remaining-Req 헤더 기반 요청 제한 (고정 sleep 대체)
+        self.rate_limiter = rate_limiter or get_shared_limiter()
+
+        # 같은 판단 주기 안의 중복 시세 조회 제거
+        self.cache = get_shared_cache() if response_cache is None else (response_cache or None)
+
+        self._stats_lock = threading.Lock()
+        self._group_stats = {}  # {group: {'requests', 'errors', 'total_ms'}}
+
+    def _request(self, method, path, group='default', **kwargs):
+        """공용 세션으로 요청 (요청 제한 + 그룹별 타임아웃 + 통계 집계)"""
+        kwargs.setdefault('timeout', self.TIMEOUTS.get(group, self.TIMEOUTS['default']))
+        limit_group = self.rate_limiter.group_for(path, group)
+        # JWT nonce는 재사용할 수 없으므로 인증 요청은 재시도하지 않음
+        retries = 0 if 'headers' in kwargs else self.MAX_THROTTLE_RETRIES
+
+        for attempt in range(retries + 1):
+            self.rate_limiter.acquire(limit_group)
+            response = self._send(method, path, group, **kwargs)
+            limit_group = self.rate_limiter.update_from_header(
+                path, response.headers.get('Remaining-Req')
+            ) or limit_group
+
+            if response.status_code != 429 or attempt == retries:
+                if self.recorder:
+                    self._record(method, path, kwargs, response)
+                return response
+
+            # 한도 초과: 그룹을 비우고 다음 구간에서 재시도
+            self.rate_limiter.penalize(limit_group)
+
+    def _get_public(self, path, group, params=None, ttl=None):
+        """시세 조회 (응답 캐시 + 동일 요청 합치기)"""
+        def fetch():
+            return self._request('GET', path, group, params=params).json()
+
+        if self.cache is None or not ttl:
+            return fetch()
+        key = (path, tuple(sorted((params or {}).items())))
+        return self.cache.get_or_fetch(key, fetch, ttl)
+
+    def _record(self, method, path, kwargs, response):
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        params = kwargs.get('params') or kwargs.get('json')
+        self.recorder.record(method, path, params, response.status_code, body)
+
+    def _send(self, method, path, group, **kwargs):
+        started = time.perf_counter()
+        error = False
+        try:
+            return self.session.request(method, f"{self.server_url}{path}", **kwargs)
+        except requests.exceptions.RequestException:
+            error = True
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._stats_lock:
+                stats = self._group_stats.setdefault(group, {'requests': 0, 'errors': 0, 'total_ms': 0.0})
+                stats['requests'] += 1
+                stats['errors'] += error
+                stats['total_ms'] += elapsed_ms
+
+    def get_transport_stats(self):
+        """커넥션 재사용 및 그룹별 지연 통계
+
+        Returns:
+            dict: {
+                'connections': 새로 연결한 커넥션 수,
+                'requests': 풀을 통해 보낸 요청 수,
+                'reuse_rate': 커넥션 재사용 비율 (0~1),
+                'groups': {group: {'requests', 'errors', 'avg_ms'}}
+            }
+        """
+        connections = 0
+        requests_sent = 0
+        for key in list(self._adapter.poolmanager.pools.keys()):
+            pool = self._adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            requests_sent += pool.num_requests
+
+        with self._stats_lock:
+            groups = {
+                group: {
+                    'requests': s['requests'],
+                    'errors': s['errors'],
+                    'avg_ms': s['total_ms'] / s['requests'] if s['requests'] else 0.0
+                }
+                for group, s in self._group_stats.items()
+            }
+
+        reuse_rate = 1 - connections / requests_sent if requests_sent else 0.0
+        return {
+            'connections': connections,
+            'requests': requests_sent,
+            'reuse_rate': max(0.0, reuse_rate),
+            'groups': groups
+        }
+
+    def close(self):
+        """커넥션 풀 정리"""
+        self.session.close()
+
     def _get_headers(self, query=None):
         payload = {
             'access_key': self.access_key,
@@ -29,22 +186,31 @@ class UpbitAPI:
         return {'Authorization': f'Bearer {jwt_token}'}
     
     def get_accounts(self):
-        url = f"{self.server_url}/v1/accounts"
         headers = self._get_headers()
-        response = requests.get(url, headers=headers)
+        response = self._request('GET', '/v1/accounts', 'default', headers=headers)
         return response.json()
 
     def get_market_all(self):
         """전체 마켓 목록 조회"""
-        url = f"{self.server_url}/v1/market/all"
-        response = requests.get(url)
-        return response.json()
+        return self._get_public('/v1/market/all', 'market', ttl=DEFAULT_TTLS['market'])
 
     def get_current_price(self, market="KRW-ETH"):
-        url = f"{self.server_url}/v1/ticker"
         params = {"markets": market}
-        response = requests.get(url, params=params)
-        return response.json()[0]
+        return self._get_public('/v1/ticker', 'market', params, DEFAULT_TTLS['ticker'])[0]
+
+    def get_current_price_fresh(self, market, timeout=None):
+        """캐시/동일 요청 합치기를 거치지 않는 현재가 조회 (헤지 요청용)
+
+        응답은 공유 캐시에도 넣어 같은 주기의 get_current_price가 재사용합니다.
+        """
+        params = {"markets": market}
+        kwargs = {'params': params}
+        if timeout:
+            kwargs['timeout'] = (min(timeout, self.TIMEOUTS['market'][0]), timeout)
+        body = self._request('GET', '/v1/ticker', 'market', **kwargs).json()
+        if self.cache is not None:
+            self.cache.put(('/v1/ticker', tuple(sorted(params.items()))), body, DEFAULT_TTLS['ticker'])
+        return body[0]
 
     def get_ticker(self, markets):
         """여러 마켓의 현재가 정보 조회
@@ -55,37 +221,228 @@ class UpbitAPI:
         Returns:
             ticker 정보 리스트
         """
-        url = f"{self.server_url}/v1/ticker"
-
         if isinstance(markets, list):
+            if len(markets) > self.TICKER_CHUNK_SIZE:
+                return list(self.get_tickers_batch(markets).values())
             markets_str = ','.join(markets)
         else:
             markets_str = markets
 
         params = {"markets": markets_str}
-        response = requests.get(url, params=params)
-        return response.json()
+        return self._get_public('/v1/ticker', 'market', params, DEFAULT_TTLS['ticker'])
+
+    def _get_ticker_chunk(self, markets):
+        params = {"markets": ','.join(markets)}
+        tickers = self._get_public('/v1/ticker', 'market', params, DEFAULT_TTLS['ticker'])
+        if not isinstance(tickers, list):
+            raise ValueError(f"티커 조회 실패: {tickers}")
+        return tickers
+
+    def get_tickers_batch(self, markets, chunk_size=None, max_workers=4):
+        """마켓 수 제한 없는 현재가 일괄 조회
+
+        마켓 리스트를 요청 크기에 맞게 나눠 동시에 조회한 뒤 마켓 기준으로 병합합니다.
+
+        Args:
+            markets: 마켓 리스트
+            chunk_size: 요청당 마켓 수 (기본 TICKER_CHUNK_SIZE)
+            max_workers: 동시 요청 수
+
+        Returns:
+            dict: {market: ticker} (입력 순서 유지)
+        """
+        chunk_size = chunk_size or self.TICKER_CHUNK_SIZE
+        markets = list(dict.fromkeys(markets))
+        chunks = [markets[i:i + chunk_size] for i in range(0, len(markets), chunk_size)]
+        if not chunks:
+            return {}
+
+        if len(chunks) == 1:
+            results = [self._get_ticker_chunk(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                results = list(executor.map(self._get_ticker_chunk, chunks))
+
+        by_market = {t['market']: t for chunk in results for t in chunk}
+        return {m: by_market[m] for m in markets if m in by_market}
+
+    def get_ticker_columns(self, markets, fields=('trade_price', 'acc_trade_price_24h', 'signed_change_rate'),
+                           sort_by='acc_trade_price_24h'):
+        """현재가 일괄 조회 결과를 컬럼 형태로 반환 (순위 계산용)
+
+        Args:
+            markets: 마켓 리스트
+            fields: float64 배열로 변환할 ticker 필드
+            sort_by: 내림차순 정렬 기준 필드 (None이면 입력 순서)
+
+        Returns:
+            dict: {'market': 마켓 배열, field: float64 배열, ...}
+        """
+        tickers = list(self.get_tickers_batch(markets).values())
+        columns = {'market': np.array([t['market'] for t in tickers], dtype=object)}
+        for field in fields:
+            columns[field] = np.fromiter(
+                (t.get(field) if t.get(field) is not None else np.nan for t in tickers),
+                dtype=np.float64, count=len(tickers)
+            )
+
+        if sort_by and len(tickers):
+            order = np.argsort(-np.nan_to_num(columns[sort_by], nan=-np.inf), kind='stable')
+            columns = {key: values[order] for key, values in columns.items()}
+
+        return columns
 
     def get_orderbook(self, market="KRW-ETH"):
-        url = f"{self.server_url}/v1/orderbook"
         params = {"markets": market}
-        response = requests.get(url, params=params)
-        return response.json()[0]
-    
-    def get_candles(self, market="KRW-ETH", interval="minutes", unit=1, count=200):
+        return self._get_public('/v1/orderbook', 'market', params, DEFAULT_TTLS['orderbook'])[0]
+
+    def get_trades_ticks(self, market="KRW-ETH", count=200, cursor=None):
+        """최근 체결 내역 조회 (최신순)
+
+        Args:
+            count: 체결 개수 (최대 500)
+            cursor: 이 sequential_id 이전 체결부터 조회 (페이지 이동용)
+        """
+        params = {"market": market, "count": count}
+        if cursor:
+            params['cursor'] = cursor
+        return self._get_public('/v1/trades/ticks', 'market', params, DEFAULT_TTLS['trades'])
+
+    def get_candles(self, market="KRW-ETH", interval="minutes", unit=1, count=200, to=None):
+        """
+        Args:
+            to: 마지막 캔들 시각 (exclusive, ISO 8601 문자열) - None이면 최신
+        """
         if interval == "minutes":
-            url = f"{self.server_url}/v1/candles/minutes/{unit}"
+            path = f"/v1/candles/minutes/{unit}"
         else:
-            url = f"{self.server_url}/v1/candles/{interval}"
-        
+            path = f"/v1/candles/{interval}"
+
         params = {"market": market, "count": count}
-        response = requests.get(url, params=params)
-        return response.json()
+        if to:
+            # 과거 구간 페이지는 재사용되지 않으므로 캐시하지 않음
+            params['to'] = to
+            response = self._request('GET', path, 'candle', params=params)
+            return response.json()
+
+        if self.cache is None:
+            return self._get_public(path, 'candle', params)
+
+        # 더 많이 받아 둔 최신 캔들이 있으면 앞부분만 사용 (50개 요청 ← 200개 캐시)
+        ttl = bar_ttl(unit if interval == "minutes" else 1440)
+        latest_key = (path, market)
+        cached = self.cache.get(latest_key)
+        if cached is not None and len(cached) >= count:
+            self.cache.record_hit()
+            return cached[:count]
+
+        candles = self._get_public(path, 'candle', params, ttl)
+        if isinstance(candles, list) and (cached is None or len(candles) > len(cached)):
+            self.cache.put(latest_key, candles, ttl)
+        return list(candles) if isinstance(candles, list) else candles
+
+    def cache_candles(self, market, unit, candles, interval="minutes", ttl=None):
+        """다른 경로(비동기 일괄 조회 등)로 받은 최신 캔들을 응답 캐시에 등록
+
+        Args:
+            ttl: 유지 시간 (초, 기본은 봉 단위 TTL - 일괄 선조회는 DEFAULT_TTLS['candle_prefetch'])
+                 다음 봉 시작 시각을 넘기지 않도록 잘라서 적용 (새 봉은 바로 보임)
+        """
+        if self.cache is None or not isinstance(candles, list):
+            return
+        path = f"/v1/candles/minutes/{unit}" if interval == "minutes" else f"/v1/candles/{interval}"
+        unit_minutes = unit if interval == "minutes" else 1440
+        if ttl is None:
+            ttl = bar_ttl(unit_minutes)
+        else:
+            ttl = min(ttl, bar_boundary(unit_minutes))
+        self.cache.put((path, market), candles, ttl)
+
+    def iter_candles(self, market, unit=1, start=None, end=None, interval="minutes",
+                     limit=None, as_arrays=False, prefetch=True):
+        """과거 캔들 구간을 페이지 단위로 스트리밍
+
+        to 커서로 end → start 방향(과거 방향)으로 페이지를 가져오며,
+        현재 페이지를 넘겨주는 동안 다음 페이지를 미리 요청합니다.
+
+        Args:
+            market: 마켓 (KRW-BTC 등)
+            unit: 분봉 단위 (interval="minutes"일 때)
+            start: 시작 시각 (KST datetime, 포함) - None이면 limit까지
+            end: 종료 시각 (KST datetime, 제외) - None이면 최신
+            interval: "minutes", "days", "weeks", "months"
+            limit: 최대 캔들 수
+            as_arrays: True면 시간 오름차순 컬럼 배열(dict)로 반환
+            prefetch: 다음 페이지 선요청 여부
+
+        Yields:
+            페이지 (기본: 업비트 응답 그대로 최신순 리스트)
+        """
+        start_kst = start.strftime('%Y-%m-%dT%H:%M:%S') if start else None
+        to = end.strftime('%Y-%m-%dT%H:%M:%S') + '+09:00' if end else None
+        remaining = limit
+
+        def fetch(cursor, count):
+            page = self.get_candles(market, interval, unit, count, to=cursor)
+            if not isinstance(page, list):
+                raise ValueError(f"캔들 조회 실패 ({market}): {page}")
+            return page
+
+        def page_size():
+            return self.CANDLE_PAGE_SIZE if remaining is None else min(self.CANDLE_PAGE_SIZE, remaining)
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            count = page_size()
+            page = fetch(to, count)
+
+            while page:
+                oldest = page[-1]['candle_date_time_kst']
+                done = len(page) < count or (start_kst is not None and oldest <= start_kst)
+
+                if start_kst is not None and oldest < start_kst:
+                    page = [c for c in page if c['candle_date_time_kst'] >= start_kst]
+                if remaining is not None:
+                    page = page[:remaining]
+                    remaining -= len(page)
+                    done = done or remaining <= 0
+
+                # 호출자가 현재 페이지를 처리하는 동안 다음 페이지 요청
+                next_page = None
+                if not done:
+                    cursor = oldest + '+09:00'
+                    count = page_size()
+                    if executor:
+                        next_page = executor.submit(fetch, cursor, count)
+                    else:
+                        next_page = cursor
+
+                if page:
+                    yield decode_candles(page) if as_arrays else page
+
+                if next_page is None:
+                    break
+                page = next_page.result() if executor else fetch(next_page, count)
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_candles_range_df(self, market, unit=1, start=None, end=None, interval="minutes", limit=None):
+        """과거 캔들 구간을 DataFrame으로 조회 (시간 오름차순)
+
+        페이지를 컬럼 배열로 받아 이어 붙이므로 응답 dict를 모두 보관하지 않습니다.
+
+        Returns:
+            DataFrame (timestamp, open, high, low, close, volume) 또는 None
+        """
+        chunks = list(self.iter_candles(market, unit, start, end, interval, limit, as_arrays=True))
+
+        # 페이지는 최신 → 과거 순이므로 뒤집어서 연결
+        chunks.reverse()
+        return to_dataframe(concat_columns(chunks))
     
     def order_market_buy(self, market, price):
         """시장가 매수"""
-        url = f"{self.server_url}/v1/orders"
-        
         query = {
             'market': market,
             'side': 'bid',
@@ -94,13 +451,11 @@ class UpbitAPI:
         }
         
         headers = self._get_headers(query)
-        response = requests.post(url, json=query, headers=headers)
+        response = self._request('POST', '/v1/orders', 'order', json=query, headers=headers)
         return response.json()
     
     def order_market_sell(self, market, volume):
         """시장가 매도"""
-        url = f"{self.server_url}/v1/orders"
-
         query = {
             'market': market,
             'side': 'ask',
@@ -109,15 +464,13 @@ class UpbitAPI:
         }
 
         headers = self._get_headers(query)
-        response = requests.post(url, json=query, headers=headers)
+        response = self._request('POST', '/v1/orders', 'order', json=query, headers=headers)
         return response.json()
 
     def get_market_all(self):
         """마켓 코드 조회"""
-        url = f"{self.server_url}/v1/market/all"
         params = {"isDetails": "false"}
-        response = requests.get(url, params=params)
-        return response.json()
+        return self._get_public('/v1/market/all', 'market', params, DEFAULT_TTLS['market'])
 
     def get_current_prices(self, markets):
         """여러 마켓의 현재가 한번에 조회
@@ -125,17 +478,11 @@ class UpbitAPI:
         Args:
             markets: 마켓 리스트 ['KRW-BTC', 'KRW-ETH', ...]
         """
-        url = f"{self.server_url}/v1/ticker"
-        # 한번에 최대 100개까지 조회 가능
-        markets_str = ','.join(markets[:100])
-        params = {"markets": markets_str}
-        response = requests.get(url, params=params)
-        return response.json()
+        # 요청 크기 단위로 나눠 조회하므로 마켓 수 제한 없음
+        return list(self.get_tickers_batch(markets).values())
 
     def buy_limit(self, market, price, volume):
         """지정가 매수"""
-        url = f"{self.server_url}/v1/orders"
-
         query = {
             'market': market,
             'side': 'bid',
@@ -146,7 +493,7 @@ class UpbitAPI:
 
         headers = self._get_headers(query)
         try:
-            response = requests.post(url, json=query, headers=headers)
+            response = self._request('POST', '/v1/orders', 'order', json=query, headers=headers)
             return response.json()
         except Exception as e:
             print(f"지정가 매수 실패: {e}")
@@ -154,8 +501,6 @@ class UpbitAPI:
 
     def sell_limit(self, market, price, volume):
         """지정가 매도"""
-        url = f"{self.server_url}/v1/orders"
-
         query = {
             'market': market,
             'side': 'ask',
@@ -166,7 +511,7 @@ class UpbitAPI:
 
         headers = self._get_headers(query)
         try:
-            response = requests.post(url, json=query, headers=headers)
+            response = self._request('POST', '/v1/orders', 'order', json=query, headers=headers)
             return response.json()
         except Exception as e:
             print(f"지정가 매도 실패: {e}")
@@ -174,13 +519,11 @@ class UpbitAPI:
 
     def get_order(self, uuid):
         """주문 상태 조회"""
-        url = f"{self.server_url}/v1/order"
-
         query = {'uuid': uuid}
         headers = self._get_headers(query)
 
         try:
-            response = requests.get(url, params=query, headers=headers)
+            response = self._request('GET', '/v1/order', 'default', params=query, headers=headers)
             return response.json()
         except Exception as e:
             print(f"주문 조회 실패: {e}")
@@ -188,18 +531,149 @@ class UpbitAPI:
 
     def cancel_order(self, uuid):
         """주문 취소"""
-        url = f"{self.server_url}/v1/order"
-
         query = {'uuid': uuid}
         headers = self._get_headers(query)
 
         try:
-            response = requests.delete(url, params=query, headers=headers)
+            response = self._request('DELETE', '/v1/order', 'order', params=query, headers=headers)
             return response.json()
         except Exception as e:
             print(f"주문 취소 실패: {e}")
             return None
 
+    def _get_private(self, path, query, group='default'):
+        """인증 조회 요청 (에러 응답이면 None)"""
+        headers = self._get_headers(query)
+        response = self._request('GET', path, group, params=query, headers=headers)
+        body = response.json()
+        if isinstance(body, dict) and 'error' in body:
+            print(f"조회 실패 ({path}): {body['error'].get('message')}")
+            return None
+        return body
+
+    def get_orders_by_uuids(self, uuids, market=None):
+        """여러 주문 상태 한번에 조회 (/v1/orders/uuids, 100개 단위)
+
+        목록 응답이라 trades는 포함되지 않습니다 (체결가가 필요하면 get_order).
+
+        Returns:
+            dict: {uuid: order} (조회 실패한 uuid는 빠짐)
+        """
+        uuids = list(dict.fromkeys(uuids))
+        orders = {}
+        for i in range(0, len(uuids), self.ORDER_QUERY_CHUNK_SIZE):
+            query = {'uuids[]': uuids[i:i + self.ORDER_QUERY_CHUNK_SIZE]}
+            if market:
+                query['market'] = market
+            try:
+                chunk = self._get_private('/v1/orders/uuids', query)
+            except Exception as e:
+                print(f"주문 일괄 조회 실패: {e}")
+                continue
+            for order in chunk or []:
+                orders[order['uuid']] = order
+        return orders
+
+    def get_open_orders(self, market=None, states=('wait', 'watch')):
+        """미체결 주문 전체 조회 (/v1/orders/open, 페이지 순회)
+
+        Args:
+            market: 마켓 (None이면 전체 마켓)
+            states: 'wait'(지정가), 'watch'(예약)
+
+        Returns:
+            list: 주문 목록 (실패 시 None)
+        """
+        orders = []
+        page = 1
+        while True:
+            query = {
+                'states[]': list(states),
+                'page': page,
+                'limit': self.OPEN_ORDER_PAGE_SIZE,
+            }
+            if market:
+                query['market'] = market
+            try:
+                chunk = self._get_private('/v1/orders/open', query)
+            except Exception as e:
+                print(f"미체결 주문 조회 실패: {e}")
+                return None
+            if chunk is None:
+                return None
+            orders.extend(chunk)
+            if len(chunk) < self.OPEN_ORDER_PAGE_SIZE:
+                return orders
+            page += 1
+
+    def get_closed_orders(self, market=None, states=('done', 'cancel'), start_time=None, end_time=None, limit=100):
+        """종료된 주문 조회 (/v1/orders/closed)
+
+        Args:
+            start_time/end_time: ISO 8601 문자열 (업비트 조회 기간은 최대 7일)
+            limit: 최대 개수 (1000 이하)
+
+        Returns:
+            list: 주문 목록 (실패 시 None)
+        """
+        query = {'states[]': list(states), 'limit': limit}
+        if market:
+            query['market'] = market
+        if start_time:
+            query['start_time'] = start_time
+        if end_time:
+            query['end_time'] = end_time
+        try:
+            return self._get_private('/v1/orders/closed', query)
+        except Exception as e:
+            print(f"종료 주문 조회 실패: {e}")
+            return None
+
+    def cancel_orders(self, uuids=None, markets=None, side='all'):
+        """주문 일괄 취소
+
+        uuids를 주면 /v1/orders/uuids (20개 단위), markets를 주면 /v1/orders/open로
+        해당 마켓의 미체결 주문을 한 번에 취소합니다. 둘 다 주면 모두 처리합니다.
+
+        Args:
+            uuids: 취소할 주문 uuid 목록
+            markets: 미체결 주문을 모두 취소할 마켓 목록
+            side: 마켓 기준 취소 시 'all', 'bid', 'ask'
+
+        Returns:
+            dict: {'success': [order, ...], 'failed': [order, ...]}
+                  (order = {'uuid', 'market', ...}, 실패 항목은 'error_message' 포함)
+        """
+        result = {'success': [], 'failed': []}
+
+        def merge(query, path, label):
+            headers = self._get_headers(query)
+            try:
+                response = self._request('DELETE', path, 'order', params=query, headers=headers)
+                body = response.json()
+            except Exception as e:
+                body = {'error': {'message': str(e)}}
+
+            if 'error' in body:
+                message = body['error'].get('message')
+                print(f"{label} 실패: {message}")
+                for order_uuid in query.get('uuids[]', []):
+                    result['failed'].append({'uuid': order_uuid, 'error_message': message})
+                return
+            result['success'].extend(body.get('success', {}).get('orders', []))
+            result['failed'].extend(body.get('failed', {}).get('orders', []))
+
+        uuids = list(dict.fromkeys(uuids or []))
+        for i in range(0, len(uuids), self.ORDER_CANCEL_CHUNK_SIZE):
+            merge({'uuids[]': uuids[i:i + self.ORDER_CANCEL_CHUNK_SIZE]}, '/v1/orders/uuids', '주문 일괄 취소')
+
+        markets = list(markets or [])
+        for i in range(0, len(markets), self.ORDER_CANCEL_CHUNK_SIZE):
+            query = {'pairs': ','.join(markets[i:i + self.ORDER_CANCEL_CHUNK_SIZE]), 'cancel_side': side}
+            merge(query, '/v1/orders/open', '마켓 미체결 주문 취소')
+
+        return result
+
     def buy_market_order(self, market, krw_amount):
         """시장가 매수 (wrapper)"""
         return self.order_market_buy(market, krw_amount)
@@ -0,0 +1,181 @@
+"""
+업비트 시세 응답 캐시
+짧은 TTL + LRU + 동일 요청 합치기(singleflight)로 한 번의 판단 주기 안에서
+같은 캔들/티커를 여러 번 조회해도 HTTP 요청은 한 번만 나가게 합니다.
+
+- 캔들 TTL은 봉 단위에 비례하되 다음 봉 경계를 넘기지 않음 (새 봉은 바로 보임)
+- 여러 스레드가 같은 키를 동시에 요청하면 한 스레드만 조회하고 나머지는 결과를 기다림
+- 에러 응답은 캐시하지 않음
+"""
+import threading
+import time
+from collections import OrderedDict
+
+# 엔드포인트별 기본 TTL (초)
+DEFAULT_TTLS = {
+    'market': 3600.0,    # 마켓 목록
+    'ticker': 1.0,
+    'orderbook': 0.5,
+    'trades': 0.5,
+    # 스캔 주기 시작에 일괄 선조회한 캔들 (한 주기 동안 유지, 최소 스캔 간격 60초)
+    'candle_prefetch': 60.0,
+}
+
+# 캔들 TTL = 봉 길이 × 비율 (1분봉 1초, 15분봉 15초 ...), 최대 60초
+CANDLE_TTL_RATIO = 1 / 60
+CANDLE_TTL_MAX = 60.0
+
+
+def bar_boundary(unit_minutes, now=None):
+    """다음 봉 시작까지 남은 시간 (초)
+
+    Args:
+        unit_minutes: 분봉 단위 (일봉 이상은 1440 등)
+        now: 현재 epoch 초 (테스트용)
+    """
+    now = time.time() if now is None else now
+    bar_seconds = unit_minutes * 60
+    return bar_seconds - now % bar_seconds
+
+
+def bar_ttl(unit_minutes, now=None):
+    """봉 단위 기반 캔들 TTL (다음 봉 시작 시각을 넘기지 않음)
+
+    Args:
+        unit_minutes: 분봉 단위 (일봉 이상은 1440 등)
+        now: 현재 epoch 초 (테스트용)
+    """
+    bar_seconds = unit_minutes * 60
+    return min(CANDLE_TTL_MAX, max(1.0, bar_seconds * CANDLE_TTL_RATIO), bar_boundary(unit_minutes, now))
+
+
+def _is_error(value):
+    return value is None or (isinstance(value, dict) and 'error' in value)
+
+
+class _Flight:
+    """진행 중인 조회 1건 (대기 스레드가 결과를 공유)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """TTL + LRU 응답 캐시 (스레드 안전)"""
+
+    def __init__(self, maxsize=512):
+        """
+        Args:
+            maxsize: 최대 항목 수 (초과 시 가장 오래 안 쓴 항목부터 제거)
+        """
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # {key: (expires_at, value)}
+        self._flights = {}             # {key: _Flight}
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'evictions': 0}
+
+    def get(self, key):
+        """유효한 캐시 값 (없으면 None, 통계 미반영)"""
+        with self._lock:
+            return self._lookup(key, time.monotonic())
+
+    def record_hit(self):
+        """get()으로 찾은 값을 실제로 사용했을 때 적중 통계에 반영"""
+        with self._lock:
+            self._stats['hits'] += 1
+
+    def _lookup(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value, ttl):
+        """값 저장 (에러 응답/0 이하 TTL은 무시)"""
+        if ttl <= 0 or _is_error(value):
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def get_or_fetch(self, key, fetch, ttl):
+        """캐시 조회, 없으면 fetch() 결과를 저장 후 반환
+
+        같은 키를 동시에 요청한 스레드들은 fetch를 한 번만 실행하고 결과를 공유합니다.
+        """
+        with self._lock:
+            value = self._lookup(key, time.monotonic())
+            if value is not None:
+                self._stats['hits'] += 1
+                return value
+
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._stats['coalesced'] += 1
+                leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                self._stats['misses'] += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fetch()
+            self.put(key, flight.value, ttl)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def invalidate(self, key=None):
+        """항목 삭제 (key=None이면 전체)"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def get_stats(self):
+        """적중/미스 통계
+
+        Returns:
+            dict: {'hits', 'misses', 'coalesced', 'evictions', 'size', 'hit_rate'}
+        """
+        with self._lock:
+            stats = dict(self._stats, size=len(self._entries))
+        served = stats['hits'] + stats['coalesced']
+        total = served + stats['misses']
+        stats['hit_rate'] = served / total if total else 0.0
+        return stats
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """프로세스 전역 응답 캐시 (모든 UpbitAPI 인스턴스가 공유)"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache()
+        return _shared_cache
@@ -18,28 +18,29 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import time
-import requests
+from upbit_api import UpbitAPI
+from async_upbit_api import fetch_candles_concurrently
+from candle_decoder import candles_to_dataframe
 
 
 class UpbitCoinScanner_20_200:
     """업비트 20/200 SMA 전략 코인 스캐너"""
 
-    def __init__(self, min_volume_krw=10_000_000_000, timeframe=1):
+    def __init__(self, min_volume_krw=10_000_000_000, timeframe=1, upbit=None):
         """
         Args:
             min_volume_krw: 최소 24시간 거래대금 (KRW) - 기본 100억원
             timeframe: 타임프레임 (분) - 1, 3, 5, 10, 15, 30, 60, 240
+            upbit: 공유할 UpbitAPI 인스턴스 (None이면 시세 조회 전용으로 생성)
         """
-        self.server_url = "https://api.upbit.com"
+        self.upbit = upbit or UpbitAPI(None, None)
         self.min_volume_krw = min_volume_krw
         self.timeframe = timeframe
 
     def get_all_krw_markets(self):
         """모든 KRW 마켓 가져오기"""
         try:
-            url = f"{self.server_url}/v1/market/all"
-            response = requests.get(url)
-            markets = response.json()
+            markets = self.upbit.get_market_all()
 
             krw_markets = [
                 m['market'] for m in markets
@@ -53,11 +54,7 @@ class UpbitCoinScanner_20_200:
     def get_ticker(self, markets):
         """현재가 정보 조회"""
         try:
-            url = f"{self.server_url}/v1/ticker"
-            markets_str = ','.join(markets) if isinstance(markets, list) else markets
-            params = {"markets": markets_str}
-            response = requests.get(url, params=params)
-            return response.json()
+            return self.upbit.get_ticker(markets)
         except Exception as e:
             print(f"❌ 티커 조회 실패: {e}")
             return []
@@ -71,33 +68,16 @@ class UpbitCoinScanner_20_200:
             count: 캔들 개수 (200MA 계산 위해 최소 250개)
         """
         try:
-            url = f"{self.server_url}/v1/candles/minutes/{self.timeframe}"
-            params = {"market": market, "count": count}
-            response = requests.get(url, params=params)
-            candles = response.json()
+            candles = self.upbit.get_candles(market, "minutes", self.timeframe, count)
+            return self._candles_to_df(candles)
 
-            if not candles:
-                return None
-
-            df = pd.DataFrame(candles)
-            # Upbit은 최신 데이터가 먼저 오므로 역순 정렬
-            df = df.iloc[::-1].reset_index(drop=True)
-
-            # 필요한 컬럼만 추출
-            df = df.rename(columns={
-                'candle_date_time_kst': 'timestamp',
-                'opening_price': 'open',
-                'high_price': 'high',
-                'low_price': 'low',
-                'trade_price': 'close',
-                'candle_acc_trade_volume': 'volume'
-            })
-
-            df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-
-            return df
+        except Exception as e:
+            return None
 
+    def _candles_to_df(self, candles):
+        """업비트 캔들 응답 → DataFrame (시간 오름차순)"""
+        try:
+            return candles_to_dataframe(candles)
         except Exception as e:
             return None
 
@@ -213,38 +193,38 @@ class UpbitCoinScanner_20_200:
 
         # 2. 24시간 거래량 조회 (상위 코인만)
         print(f"거래량 상위 {max_coins}개 코인 선택 중...")
-        tickers = self.get_ticker(all_markets)
-
-        volume_filtered = []
-        for ticker in tickers:
-            volume_krw = ticker.get('acc_trade_price_24h', 0)
-
-            if volume_krw >= self.min_volume_krw:
-                volume_filtered.append({
-                    'market': ticker['market'],
-                    'volume_krw': volume_krw,
-                    'price': ticker['trade_price']
-                })
+        try:
+            # 거래대금 내림차순 컬럼 (마켓 수와 무관하게 청크 분할 조회)
+            tickers = self.upbit.get_ticker_columns(all_markets, fields=('trade_price', 'acc_trade_price_24h'))
+        except Exception as e:
+            print(f"❌ 티커 조회 실패: {e}")
+            return []
 
-        # 거래량 순 정렬
-        volume_filtered.sort(key=lambda x: x['volume_krw'], reverse=True)
-        top_coins = volume_filtered[:max_coins]
+        volume = tickers['acc_trade_price_24h']
+        top_idx = np.flatnonzero(volume >= self.min_volume_krw)[:max_coins]
+        top_coins = [
+            {
+                'market': tickers['market'][i],
+                'volume_krw': float(volume[i]),
+                'price': float(tickers['trade_price'][i])
+            }
+            for i in top_idx
+        ]
 
         print(f"✅ {len(top_coins)}개 코인 선정 (거래량 ₩{self.min_volume_krw:,.0f} 이상)")
 
-        # 3. 각 코인 전략 조건 체크
+        # 3. 각 코인 전략 조건 체크 (캔들은 공유 요청 제한 안에서 동시 조회)
         print(f"\n전략 조건 체크 중...")
         qualified_coins = []
 
-        for idx, coin_info in enumerate(top_coins):
-            market = coin_info['market']
+        candles_by_market = fetch_candles_concurrently(
+            [c['market'] for c in top_coins], unit=self.timeframe, count=250
+        )
 
-            # 진행 상황 출력
-            if (idx + 1) % 5 == 0:
-                print(f"  {idx + 1}/{len(top_coins)} 진행 중...")
+        for coin_info in top_coins:
+            market = coin_info['market']
 
-            # 캔들 데이터 가져오기
-            df = self.get_candles(market)
+            df = self._candles_to_df(candles_by_market.get(market))
             if df is None:
                 continue
 
@@ -262,9 +242,6 @@ class UpbitCoinScanner_20_200:
                     'details': result['details']
                 })
 
-            # API 제한 방지 (초당 10회 제한)
-            time.sleep(0.1)
-
         # 4. 점수 순 정렬
         qualified_coins.sort(key=lambda x: x['score'], reverse=True)
 
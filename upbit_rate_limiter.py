@@ -0,0 +1,172 @@
+"""
+업비트 요청 수 제한 관리
+Remaining-Req 응답 헤더 기반 토큰 버킷 (스레드 안전, 프로세스 내 공유)
+
+헤더 예시: Remaining-Req: group=default; min=1800; sec=29
+- group: 요청 제한 그룹
+- sec: 현재 1초 구간에서 남은 요청 수
+"""
+import threading
+import time
+
+
+class UpbitRateLimiter:
+    """그룹별 토큰 버킷 요청 제한기
+
+    평소에는 대기 없이 통과시키고, 버킷이 비었을 때만 호출자를 대기열에 넣습니다.
+    서버가 알려주는 잔여 요청 수(sec)가 로컬 추정보다 적으면 즉시 반영하므로
+    같은 API 키를 여러 봇이 나눠 써도 429 없이 실제 한도를 따라갑니다.
+    """
+
+    # 그룹별 초당 요청 한도 (업비트 공지 기준)
+    DEFAULT_LIMITS = {
+        'market': 10,
+        'candle': 10,
+        'candles': 10,
+        'ticker': 10,
+        'orderbook': 10,
+        'trade': 10,
+        'trades': 10,
+        'crix-trades': 10,
+        'order': 8,
+        'default': 30,
+    }
+
+    def __init__(self, limits=None):
+        """
+        Args:
+            limits: {group: 초당 요청 수} (None이면 DEFAULT_LIMITS)
+        """
+        self.limits = dict(self.DEFAULT_LIMITS)
+        if limits:
+            self.limits.update(limits)
+
+        self._lock = threading.Lock()
+        self._buckets = {}      # {group: {'tokens', 'updated', 'rate'}}
+        self._path_groups = {}  # {path: 서버가 알려준 group}
+        self._stats = {}        # {group: {'requests', 'waits', 'wait_ms', 'throttled'}}
+
+    def _bucket(self, group):
+        bucket = self._buckets.get(group)
+        if bucket is None:
+            rate = float(self.limits.get(group, self.limits['default']))
+            bucket = {'tokens': rate, 'updated': time.monotonic(), 'rate': rate}
+            self._buckets[group] = bucket
+        return bucket
+
+    def _refill(self, bucket, now):
+        elapsed = now - bucket['updated']
+        if elapsed > 0:
+            bucket['tokens'] = min(bucket['rate'], bucket['tokens'] + elapsed * bucket['rate'])
+            bucket['updated'] = now
+
+    def _group_stats(self, group):
+        return self._stats.setdefault(group, {'requests': 0, 'waits': 0, 'wait_ms': 0.0, 'throttled': 0})
+
+    def group_for(self, path, fallback='default'):
+        """요청 경로의 제한 그룹 (헤더로 학습한 값 우선)"""
+        return self._path_groups.get(path, fallback)
+
+    def reserve(self, group):
+        """토큰 1개 예약
+
+        Returns:
+            float: 요청 전에 대기해야 할 시간 (초, 0이면 즉시 가능)
+        """
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(group)
+            self._refill(bucket, now)
+
+            # 토큰을 먼저 차감 (음수 = 대기열 순번)
+            bucket['tokens'] -= 1
+            wait = 0.0 if bucket['tokens'] >= 0 else -bucket['tokens'] / bucket['rate']
+
+            stats = self._group_stats(group)
+            stats['requests'] += 1
+            if wait > 0:
+                stats['waits'] += 1
+                stats['wait_ms'] += wait * 1000
+            return wait
+
+    def acquire(self, group):
+        """토큰을 얻을 때까지 블로킹 (동기 클라이언트용)"""
+        wait = self.reserve(group)
+        if wait > 0:
+            time.sleep(wait)
+
+    @staticmethod
+    def parse_header(value):
+        """Remaining-Req 헤더 파싱
+
+        Returns:
+            (group, sec) 또는 파싱 실패 시 (None, None)
+        """
+        if not value:
+            return None, None
+
+        fields = {}
+        for part in value.split(';'):
+            if '=' in part:
+                key, val = part.split('=', 1)
+                fields[key.strip()] = val.strip()
+
+        group = fields.get('group')
+        try:
+            sec = int(fields['sec'])
+        except (KeyError, ValueError):
+            return group, None
+        return group, sec
+
+    def update_from_header(self, path, value):
+        """응답 헤더로 버킷 동기화
+
+        Args:
+            path: 요청 경로 (그룹 학습용)
+            value: Remaining-Req 헤더 값
+        """
+        group, sec = self.parse_header(value)
+        if group is None:
+            return None
+
+        with self._lock:
+            self._path_groups[path] = group
+            if sec is not None:
+                bucket = self._bucket(group)
+                self._refill(bucket, time.monotonic())
+                # 다른 프로세스가 같은 키를 쓰고 있으면 서버 잔여량이 더 적음
+                if sec < bucket['tokens']:
+                    bucket['tokens'] = float(sec)
+        return group
+
+    def penalize(self, group, seconds=1.0):
+        """429 응답 시 해당 그룹을 잠시 비움"""
+        with self._lock:
+            bucket = self._bucket(group)
+            self._refill(bucket, time.monotonic())
+            bucket['tokens'] = min(bucket['tokens'], -seconds * bucket['rate'])
+            self._group_stats(group)['throttled'] += 1
+
+    def get_stats(self):
+        """그룹별 요청/대기 통계"""
+        with self._lock:
+            now = time.monotonic()
+            result = {}
+            for group, stats in self._stats.items():
+                bucket = self._bucket(group)
+                self._refill(bucket, now)
+                result[group] = dict(stats, tokens=bucket['tokens'], limit=bucket['rate'])
+            return result
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_limiter():
+    """프로세스 전역 요청 제한기 (모든 UpbitAPI 인스턴스가 공유)"""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = UpbitRateLimiter()
+        return _shared_limiter
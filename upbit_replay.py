@@ -0,0 +1,485 @@
+"""
+업비트 REST 세션 녹화 / 재생 거래소
+실제 api.upbit.com 없이 봇 루프를 재현 가능하게 벤치마크하기 위한 도구
+
+녹화:
+    UPBIT_RECORD_PATH=session.jsonl.gz python upbit_20_200_bot.py
+    → 모든 UpbitAPI 요청/응답이 gzip JSONL로 저장 (인증 헤더는 저장 안 함)
+
+재생:
+    python upbit_replay.py serve session.jsonl.gz 8080
+    UPBIT_SERVER_URL=http://127.0.0.1:8080 python upbit_20_200_bot.py
+    (실시간 시세는 upbit_websocket.UpbitReplayServer + UPBIT_WEBSOCKET_URL)
+
+재생 서버:
+- 시세 API: 같은 (경로, 파라미터) 요청에 녹화 순서대로 응답 (끝나면 마지막 응답 반복)
+- 주문 API: 가상 잔고 + 마지막 재생 호가창 기준 즉시 체결 시뮬레이션
+  (시장가는 호가를 따라 체결, 지정가는 현재가가 닿으면 체결)
+"""
+import atexit
+import gzip
+import json
+import os
+import threading
+import time
+import uuid as uuid_lib
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, parse_qsl
+
+# 업비트 KRW 마켓 거래 수수료
+FEE_RATE = 0.0005
+
+PRIVATE_PATHS = ('/v1/accounts', '/v1/orders', '/v1/order',
+                 '/v1/orders/uuids', '/v1/orders/open', '/v1/orders/closed')
+
+
+def _params_key(params):
+    return tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+
+
+class SessionRecorder:
+    """UpbitAPI 요청/응답을 gzip JSONL로 기록 (스레드 안전)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, 'at', encoding='utf-8')
+        self._started = time.monotonic()
+        self.count = 0
+        atexit.register(self.close)
+
+    def record(self, method, path, params, status, body):
+        """요청 1건 기록
+
+        Args:
+            params: 쿼리 파라미터 또는 주문 JSON (인증 헤더 제외)
+            body: 응답 JSON (파싱 실패 시 None)
+        """
+        line = json.dumps({
+            't': round((time.monotonic() - self._started) * 1000),
+            'm': method,
+            'p': path,
+            'q': dict(_params_key(params)),
+            's': status,
+            'b': body,
+        }, ensure_ascii=False, separators=(',', ':'))
+
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line + '\n')
+            self.count += 1
+            if self.count % 100 == 0:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_session_recorder():
+    """UPBIT_RECORD_PATH 환경변수가 있으면 프로세스 공유 녹화기, 없으면 None"""
+    global _recorder
+    path = os.getenv('UPBIT_RECORD_PATH')
+    if not path:
+        return None
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = SessionRecorder(path)
+        return _recorder
+
+
+def load_session(path):
+    """녹화 파일 로드 (.gz 또는 평문 JSONL)"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class ReplayExchange:
+    """재생 거래소 상태 (시세 재생 + 가상 계좌/주문)"""
+
+    def __init__(self, records, initial_krw=1_000_000):
+        self._lock = threading.Lock()
+
+        # 시세 응답: {(method, path, params): [body, ...]}
+        self._responses = {}
+        self._by_path = {}  # 파라미터가 다른 요청용 대체 응답 {path: body}
+        for record in records:
+            if record['p'] in PRIVATE_PATHS or record['s'] != 200:
+                continue
+            key = (record['m'], record['p'], _params_key(record['q']))
+            self._responses.setdefault(key, []).append(record['b'])
+            self._by_path[(record['m'], record['p'])] = record['b']
+        self._cursors = {}
+
+        # 재생 시세로 갱신되는 시장 상태
+        self._prices = {}      # {market: 최근 체결가}
+        self._orderbooks = {}  # {market: orderbook_units}
+
+        # 가상 계좌
+        self.balances = {'KRW': float(initial_krw)}
+        self.avg_prices = {}
+        self.orders = {}  # {uuid: order}
+
+        self.stats = {'requests': 0, 'misses': 0, 'orders': 0}
+
+    # === 시세 재생 ===
+
+    def public(self, method, path, params):
+        """녹화된 시세 응답 (없으면 None)"""
+        key = (method, path, _params_key(params))
+        with self._lock:
+            self.stats['requests'] += 1
+            responses = self._responses.get(key)
+            if responses:
+                index = self._cursors.get(key, 0)
+                body = responses[min(index, len(responses) - 1)]
+                self._cursors[key] = index + 1
+            else:
+                body = self._by_path.get((method, path))
+                self.stats['misses'] += 1
+            if body is not None:
+                self._observe(path, body)
+            return body
+
+    def _observe(self, path, body):
+        """재생 응답에서 현재가/호가창 갱신"""
+        items = body if isinstance(body, list) else [body]
+        for item in items:
+            if not isinstance(item, dict) or 'market' not in item:
+                continue
+            if path == '/v1/orderbook':
+                self._orderbooks[item['market']] = item.get('orderbook_units', [])
+            elif 'trade_price' in item and not path.startswith('/v1/candles'):
+                self._prices[item['market']] = float(item['trade_price'])
+        if path.startswith('/v1/candles') and isinstance(body, list) and body:
+            candle = body[0]
+            if isinstance(candle, dict) and 'market' in candle:
+                self._prices.setdefault(candle['market'], float(candle['trade_price']))
+
+    def _book(self, market, side):
+        """체결에 사용할 호가 [(price, size)] (호가창이 없으면 현재가 단일 호가)"""
+        units = self._orderbooks.get(market)
+        if units:
+            key = 'ask' if side == 'bid' else 'bid'
+            return [(float(u[f'{key}_price']), float(u[f'{key}_size'])) for u in units]
+        price = self._prices.get(market)
+        return [(price, float('inf'))] if price else []
+
+    # === 가상 주문 ===
+
+    def accounts(self):
+        with self._lock:
+            return [
+                {
+                    'currency': currency,
+                    'balance': f"{balance:.8f}",
+                    'locked': '0',
+                    'avg_buy_price': f"{self.avg_prices.get(currency, 0):.8f}",
+                    'avg_buy_price_modified': False,
+                    'unit_currency': 'KRW',
+                }
+                for currency, balance in self.balances.items() if balance > 0
+            ]
+
+    def place_order(self, query):
+        """주문 생성 + 즉시 체결 시뮬레이션"""
+        market = query['market']
+        side = query['side']
+        ord_type = query['ord_type']
+        order = {
+            'uuid': str(uuid_lib.uuid4()),
+            'side': side,
+            'ord_type': ord_type,
+            'price': query.get('price'),
+            'state': 'wait',
+            'market': market,
+            'created_at': datetime.now().astimezone().isoformat(timespec='seconds'),
+            'volume': query.get('volume'),
+            'remaining_volume': query.get('volume'),
+            'reserved_fee': '0',
+            'remaining_fee': '0',
+            'paid_fee': '0',
+            'locked': '0',
+            'executed_volume': '0',
+            'trades_count': 0,
+            'trades': [],
+        }
+
+        with self._lock:
+            self.stats['orders'] += 1
+            self.orders[order['uuid']] = order
+            self._try_fill(order)
+            return self._order_view(order, with_trades=False)
+
+    def _try_fill(self, order):
+        market, side = order['market'], order['side']
+        book = self._book(market, side)
+        if not book:
+            return
+
+        if order['ord_type'] == 'price':      # 시장가 매수: KRW 금액
+            budget, volume_limit, limit_price = float(order['price']), None, None
+        elif order['ord_type'] == 'market':   # 시장가 매도: 수량
+            budget, volume_limit, limit_price = None, float(order['volume']), None
+        else:                                 # 지정가
+            budget, volume_limit = None, float(order['remaining_volume'])
+            limit_price = float(order['price'])
+
+        fills = []
+        for price, size in book:
+            if limit_price is not None and ((side == 'bid' and price > limit_price) or
+                                            (side == 'ask' and price < limit_price)):
+                break
+            if budget is not None:
+                volume = min(size, budget / price)
+                budget -= volume * price
+            else:
+                volume = min(size, volume_limit)
+                volume_limit -= volume
+            if volume > 0:
+                fills.append((price, volume))
+            if (budget is not None and budget <= 1e-9) or (volume_limit is not None and volume_limit <= 1e-12):
+                break
+
+        if not fills:
+            return
+
+        currency = market.split('-')[1]
+        executed = sum(v for _, v in fills)
+        funds = sum(p * v for p, v in fills)
+        fee = funds * FEE_RATE
+
+        if side == 'bid':
+            held = self.balances.get(currency, 0.0)
+            self.avg_prices[currency] = (
+                (self.avg_prices.get(currency, 0.0) * held + funds) / (held + executed)
+            )
+            self.balances['KRW'] -= funds + fee
+            self.balances[currency] = held + executed
+        else:
+            self.balances[currency] = max(0.0, self.balances.get(currency, 0.0) - executed)
+            self.balances['KRW'] += funds - fee
+
+        for price, volume in fills:
+            order['trades'].append({
+                'market': market,
+                'uuid': str(uuid_lib.uuid4()),
+                'price': str(price),
+                'volume': f"{volume:.8f}",
+                'funds': f"{price * volume:.8f}",
+                'side': side,
+                'created_at': datetime.now().astimezone().isoformat(timespec='seconds'),
+            })
+        total_executed = float(order['executed_volume']) + executed
+        order['executed_volume'] = f"{total_executed:.8f}"
+        order['paid_fee'] = f"{float(order['paid_fee']) + fee:.8f}"
+        order['trades_count'] = len(order['trades'])
+
+        if order['ord_type'] == 'limit':
+            remaining = float(order['volume']) - total_executed
+            order['remaining_volume'] = f"{max(remaining, 0.0):.8f}"
+            order['state'] = 'done' if remaining <= 1e-12 else 'wait'
+        else:
+            order['remaining_volume'] = '0'
+            order['state'] = 'done' if order['ord_type'] == 'market' else 'cancel'
+
+    def get_order(self, order_uuid):
+        with self._lock:
+            order = self.orders.get(order_uuid)
+            if order is None:
+                return None
+            if order['state'] == 'wait':
+                self._try_fill(order)
+            return self._order_view(order, with_trades=True)
+
+    def cancel_order(self, order_uuid):
+        with self._lock:
+            order = self.orders.get(order_uuid)
+            if order is None:
+                return None
+            if order['state'] == 'wait':
+                order['state'] = 'cancel'
+            return self._order_view(order, with_trades=False)
+
+    def get_orders(self, uuids):
+        """여러 주문 조회 (/v1/orders/uuids, trades 제외)"""
+        with self._lock:
+            orders = [self.orders[u] for u in uuids if u in self.orders]
+            for order in orders:
+                if order['state'] == 'wait':
+                    self._try_fill(order)
+            return [self._order_view(order, with_trades=False) for order in orders]
+
+    def list_orders(self, states, market=None):
+        """상태별 주문 목록 (/v1/orders/open, /v1/orders/closed)"""
+        with self._lock:
+            return [
+                self._order_view(order, with_trades=False)
+                for order in self.orders.values()
+                if order['state'] in states and (market is None or order['market'] == market)
+            ]
+
+    def cancel_orders(self, uuids=None, markets=None, side='all'):
+        """주문 일괄 취소 (업비트 일괄 취소 응답 형식)"""
+        success, failed = [], []
+        with self._lock:
+            if markets is not None:
+                uuids = [
+                    order['uuid'] for order in self.orders.values()
+                    if order['market'] in markets and order['state'] == 'wait'
+                    and side in ('all', order['side'])
+                ]
+            for order_uuid in uuids or []:
+                order = self.orders.get(order_uuid)
+                if order is None or order['state'] != 'wait':
+                    failed.append({'uuid': order_uuid, 'market': order and order['market'],
+                                   'error_code': 'order_not_found', 'error_message': '취소할 수 없는 주문'})
+                    continue
+                order['state'] = 'cancel'
+                success.append({'uuid': order_uuid, 'market': order['market']})
+        return {
+            'success': {'count': len(success), 'orders': success},
+            'failed': {'count': len(failed), 'orders': failed},
+        }
+
+    @staticmethod
+    def _order_view(order, with_trades):
+        view = dict(order)
+        if not with_trades:
+            view.pop('trades')
+        else:
+            view['trades'] = list(order['trades'])
+        return view
+
+
+class _Handler(BaseHTTPRequestHandler):
+    exchange = None  # ReplayExchange (서버 생성 시 설정)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        group = 'order' if self.command != 'GET' else 'default'
+        self.send_header('Remaining-Req', f"group={group}; min=1800; sec=29")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _not_found(self, name='not_found', message='녹화된 응답 없음'):
+        self._reply(404, {'error': {'name': name, 'message': message}})
+
+    def _dispatch(self):
+        url = urlparse(self.path)
+        params = dict(parse_qsl(url.query))
+        lists = parse_qs(url.query)  # uuids[], states[] 등 배열 파라미터
+        exchange = self.exchange
+
+        if url.path == '/v1/accounts':
+            return self._reply(200, exchange.accounts())
+
+        if url.path == '/v1/orders' and self.command == 'POST':
+            length = int(self.headers.get('Content-Length') or 0)
+            query = json.loads(self.rfile.read(length) or b'{}')
+            return self._reply(201, exchange.place_order(query))
+
+        if url.path == '/v1/orders/uuids':
+            if self.command == 'DELETE':
+                return self._reply(200, exchange.cancel_orders(uuids=lists.get('uuids[]', [])))
+            return self._reply(200, exchange.get_orders(lists.get('uuids[]', [])))
+
+        if url.path == '/v1/orders/open':
+            if self.command == 'DELETE':
+                markets = params.get('pairs', '').split(',')
+                return self._reply(200, exchange.cancel_orders(markets=markets,
+                                                               side=params.get('cancel_side', 'all')))
+            orders = exchange.list_orders(lists.get('states[]', ['wait', 'watch']), params.get('market'))
+            limit = int(params.get('limit', 100))
+            start = (int(params.get('page', 1)) - 1) * limit
+            return self._reply(200, orders[start:start + limit])
+
+        if url.path == '/v1/orders/closed':
+            return self._reply(200, exchange.list_orders(lists.get('states[]', ['done', 'cancel']),
+                                                         params.get('market')))
+
+        if url.path == '/v1/order':
+            handler = exchange.cancel_order if self.command == 'DELETE' else exchange.get_order
+            order = handler(params.get('uuid'))
+            if order is None:
+                return self._not_found('order_not_found', '주문을 찾지 못함')
+            return self._reply(200, order)
+
+        body = exchange.public(self.command, url.path, params)
+        if body is None:
+            return self._not_found()
+        return self._reply(200, body)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+    do_DELETE = _dispatch
+
+
+class UpbitReplayHTTPServer:
+    """녹화 세션을 재생하는 로컬 업비트 REST 서버"""
+
+    def __init__(self, session, host='127.0.0.1', port=0, initial_krw=1_000_000):
+        """
+        Args:
+            session: 녹화 파일 경로 또는 load_session() 결과
+            port: 0이면 빈 포트 자동 선택
+            initial_krw: 가상 계좌 초기 원화
+        """
+        records = load_session(session) if isinstance(session, str) else session
+        self.exchange = ReplayExchange(records, initial_krw)
+        handler = type('ReplayHandler', (_Handler,), {'exchange': self.exchange})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """백그라운드 스레드에서 서버 시작"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='upbit-replay-http',
+                                        daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        """서버 종료"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    """python upbit_replay.py serve session.jsonl.gz [port]"""
+    import sys
+
+    if len(sys.argv) < 3 or sys.argv[1] != 'serve':
+        print("사용법: python upbit_replay.py serve session.jsonl.gz [port]")
+        sys.exit(1)
+
+    server = UpbitReplayHTTPServer(sys.argv[2], port=int(sys.argv[3]) if len(sys.argv) > 3 else 8080)
+    print(f"🔁 재생 서버: {server.start()}")
+    print(f"   UPBIT_SERVER_URL={server.url} 로 봇 실행")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"   {server.exchange.stats}")
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,468 @@
+"""
+업비트 WebSocket 시세 클라이언트 + 로컬 재생 서버
+
+클라이언트:
+- ticker / trade / orderbook 구독 (백그라운드 스레드의 asyncio 루프)
+- 연결 끊김 시 지수 백오프 재연결 + 전체 구독 재전송
+- 체결(sequential_id) 역행/중복 제거, 끊김·무응답 구간을 gap으로 기록
+- 봇 루프용 동기 API: get_latest_price(), wait_for_update()
+
+재생 서버:
+- 업비트와 같은 구독 메시지/바이너리 JSON 프레임 프로토콜
+- 녹화한 메시지(JSONL)를 원래 간격(또는 배속)으로 재생 → 오프라인 테스트
+
+사용 예:
+    ws = UpbitWebSocketClient()
+    ws.subscribe('ticker', ['KRW-BTC'])
+    ws.start()
+    price, age = ws.get_latest_price('KRW-BTC')
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import websockets
+
+
+# 재생 서버로 돌릴 때는 UPBIT_WEBSOCKET_URL 환경변수로 변경
+UPBIT_WEBSOCKET_URL = os.getenv('UPBIT_WEBSOCKET_URL', "wss://api.upbit.com/websocket/v1")
+
+STREAM_TYPES = ('ticker', 'trade', 'orderbook')
+
+
+def build_subscription(subscriptions, ticket=None):
+    """업비트 구독 요청 메시지 생성
+
+    Args:
+        subscriptions: {type: [codes]}
+    """
+    request = [{'ticket': ticket or str(uuid.uuid4())}]
+    for stream_type, codes in subscriptions.items():
+        if codes:
+            request.append({'type': stream_type, 'codes': sorted(codes)})
+    request.append({'format': 'DEFAULT'})
+    return request
+
+
+def parse_subscription(request):
+    """구독 요청 메시지 → {type: set(codes)}"""
+    subscriptions = {}
+    for item in request:
+        if isinstance(item, dict) and item.get('type') in STREAM_TYPES:
+            subscriptions.setdefault(item['type'], set()).update(item.get('codes', []))
+    return subscriptions
+
+
+def _message_time_ms(message):
+    """메시지 기준 시각 (체결 시각 우선)"""
+    return message.get('trade_timestamp') or message.get('timestamp') or 0
+
+
+class UpbitWebSocketClient:
+    """업비트 WebSocket 시세 클라이언트"""
+
+    def __init__(self, url=UPBIT_WEBSOCKET_URL, on_message=None, on_gap=None,
+                 stale_timeout=30, max_backoff=30, record_path=None):
+        """
+        Args:
+            url: WebSocket 주소 (재생 서버 사용 시 ws://127.0.0.1:port)
+            on_message: 메시지 콜백 fn(message) - 수신 스레드에서 호출
+            on_gap: 누락 구간 콜백 fn(gap) - gap: {'type', 'code', 'from_ms', 'to_ms', 'reason'}
+                    (REST 보충처럼 오래 걸릴 수 있으므로 수신 루프가 아닌 별도 스레드에서 순서대로 호출)
+            stale_timeout: 이 시간(초) 동안 메시지가 없으면 재연결
+            max_backoff: 재연결 최대 대기 (초)
+            record_path: 수신 메시지를 JSONL로 저장할 경로 (재생 서버 입력용)
+        """
+        self.url = url
+        self.on_message = on_message
+        self.on_gap = on_gap
+        self.stale_timeout = stale_timeout
+        self.max_backoff = max_backoff
+        self.record_path = record_path
+
+        self._subscriptions = {}  # {type: set(codes)}
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._latest = {}          # {(type, code): message}
+        self._received_at = {}     # {code: monotonic} 가격 수신 시각
+        self._last_seq = {}        # {code: 마지막 체결 sequential_id}
+        self._last_msg_ms = {}     # {(type, code): 마지막 메시지 시각}
+        self._resync = set()       # 재연결 후 아직 첫 체결을 받지 못한 code
+        self._version = 0
+
+        self.gaps = []
+        self.stats = {'messages': 0, 'reconnects': 0, 'duplicates': 0, 'gaps': 0, 'errors': 0}
+
+        self._loop = None
+        self._thread = None
+        self._ws = None
+        self._record_file = None   # 연결 동안 열어 두는 녹화 파일
+        self._gap_executor = None  # on_gap 호출 스레드 (1개 → gap 순서 유지)
+        self._running = False
+        self.connected = threading.Event()
+
+    # === 구독 관리 ===
+
+    def subscribe(self, stream_type, codes):
+        """구독 추가 (연결 중이면 즉시 재구독, 이미 구독 중인 code만이면 무시)"""
+        if stream_type not in STREAM_TYPES:
+            raise ValueError(f"지원하지 않는 타입: {stream_type}")
+
+        with self._lock:
+            subscribed = self._subscriptions.setdefault(stream_type, set())
+            if subscribed.issuperset(codes):
+                return
+            subscribed.update(codes)
+
+        if self._loop and self.connected.is_set():
+            asyncio.run_coroutine_threadsafe(self._send_subscription(), self._loop)
+
+    def unsubscribe(self, stream_type, codes):
+        """구독 해제 (업비트는 전체 구독을 다시 보내는 방식)"""
+        with self._lock:
+            self._subscriptions.get(stream_type, set()).difference_update(codes)
+
+        if self._loop and self.connected.is_set():
+            asyncio.run_coroutine_threadsafe(self._send_subscription(), self._loop)
+
+    async def _send_subscription(self):
+        with self._lock:
+            request = build_subscription(self._subscriptions)
+        if self._ws is not None:
+            await self._ws.send(json.dumps(request))
+
+    # === 실행 ===
+
+    def start(self, wait_connected=None):
+        """백그라운드 스레드에서 수신 시작
+
+        Args:
+            wait_connected: 첫 연결까지 대기할 시간 (초, None이면 대기 안 함)
+        """
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._thread_main, name='upbit-ws', daemon=True)
+        self._thread.start()
+
+        if wait_connected:
+            self.connected.wait(wait_connected)
+
+    def stop(self):
+        """수신 중지"""
+        self._running = False
+        if self._loop and self._ws is not None:
+            asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._gap_executor:
+            self._gap_executor.shutdown(wait=False)
+            self._gap_executor = None
+        self.connected.clear()
+
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._run())
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    async def _run(self):
+        backoff = 0.5
+        first = True
+
+        while self._running:
+            try:
+                async with websockets.connect(self.url, ping_interval=20, ping_timeout=20,
+                                              max_size=None) as ws:
+                    self._ws = ws
+                    if self.record_path:
+                        self._record_file = open(self.record_path, 'a', encoding='utf-8')
+                    await self._send_subscription()
+                    self.connected.set()
+                    if not first:
+                        self.stats['reconnects'] += 1
+                        with self._lock:
+                            self._resync = {code for (_, code) in self._last_msg_ms}
+                    first = False
+                    backoff = 0.5
+
+                    while self._running:
+                        raw = await asyncio.wait_for(ws.recv(), timeout=self.stale_timeout)
+                        try:
+                            self._handle_raw(raw)
+                        except Exception as e:
+                            # 메시지 하나가 잘못돼도 수신 스레드는 계속
+                            self.stats['errors'] += 1
+                            print(f"⚠️ WebSocket 메시지 처리 실패: {e}")
+
+            except asyncio.TimeoutError:
+                print(f"⚠️ WebSocket 무응답 {self.stale_timeout}초 - 재연결")
+            except (OSError, websockets.exceptions.WebSocketException) as e:
+                if self._running:
+                    print(f"⚠️ WebSocket 연결 끊김: {e}")
+            finally:
+                self._ws = None
+                if self._record_file:
+                    self._record_file.close()
+                    self._record_file = None
+                self.connected.clear()
+
+            if self._running:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    # === 메시지 처리 ===
+
+    def _handle_raw(self, raw):
+        message = json.loads(raw)
+        if 'error' in message:
+            print(f"❌ WebSocket 오류: {message['error']}")
+            return
+
+        stream_type = message.get('type')
+        code = message.get('code')
+        if stream_type not in STREAM_TYPES or not code:
+            return
+
+        if stream_type == 'trade' and not self._check_sequence(code, message):
+            return
+
+        if self._record_file:
+            self._record_file.write(json.dumps(message, ensure_ascii=False) + '\n')
+
+        with self._cond:
+            self._latest[(stream_type, code)] = message
+            if stream_type in ('ticker', 'trade'):
+                self._received_at[code] = time.monotonic()
+            self._version += 1
+            self.stats['messages'] += 1
+            self._cond.notify_all()
+
+        if self.on_message:
+            try:
+                self.on_message(message)
+            except Exception as e:
+                print(f"⚠️ WebSocket 콜백 오류: {e}")
+
+    def _check_sequence(self, code, message):
+        """체결 순서 확인 (역행/중복 제거, 재연결 후 누락 구간 기록)"""
+        seq = message.get('sequential_id')
+        msg_ms = _message_time_ms(message)
+        last_seq = self._last_seq.get(code)
+
+        if seq is not None and last_seq is not None and seq <= last_seq:
+            self.stats['duplicates'] += 1
+            return False
+
+        last_ms = self._last_msg_ms.get(('trade', code))
+        # 재연결 후 첫 체결: 끊겨 있던 동안의 체결은 받지 못했을 수 있음 (REST로 보충 대상)
+        if code in self._resync:
+            self._resync.discard(code)
+            if last_ms is not None and msg_ms > last_ms:
+                self._record_gap('trade', code, last_ms, msg_ms, 'reconnect')
+
+        if seq is not None:
+            self._last_seq[code] = seq
+        self._last_msg_ms[('trade', code)] = msg_ms
+        return True
+
+    def _record_gap(self, stream_type, code, from_ms, to_ms, reason):
+        gap = {'type': stream_type, 'code': code, 'from_ms': from_ms, 'to_ms': to_ms, 'reason': reason}
+        self.gaps.append(gap)
+        self.stats['gaps'] += 1
+        if self.on_gap:
+            # 수신 루프를 막지 않도록 별도 스레드에서 호출
+            if self._gap_executor is None:
+                self._gap_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='upbit-ws-gap')
+            self._gap_executor.submit(self._call_on_gap, gap)
+
+    def _call_on_gap(self, gap):
+        try:
+            self.on_gap(gap)
+        except Exception as e:
+            print(f"⚠️ gap 콜백 오류: {e}")
+
+    # === 봇 루프용 동기 API ===
+
+    def get_latest(self, stream_type, code):
+        """마지막 수신 메시지"""
+        with self._lock:
+            return self._latest.get((stream_type, code))
+
+    def get_latest_price(self, code):
+        """최신 체결가와 수신 후 경과 시간
+
+        Returns:
+            (price, age_seconds) 또는 (None, None)
+        """
+        with self._lock:
+            candidates = [self._latest.get((t, code)) for t in ('trade', 'ticker')]
+            candidates = [m for m in candidates if m]
+            if not candidates:
+                return None, None
+            latest = max(candidates, key=_message_time_ms)
+            return latest['trade_price'], time.monotonic() - self._received_at[code]
+
+    def wait_for_update(self, timeout):
+        """새 메시지가 올 때까지 대기 (sleep 대체)
+
+        Returns:
+            bool: 새 메시지 수신 여부
+        """
+        with self._cond:
+            version = self._version
+            return self._cond.wait_for(lambda: self._version != version, timeout=timeout)
+
+
+def load_messages(path):
+    """녹화된 JSONL 메시지 로드"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class UpbitReplayServer:
+    """업비트 WebSocket 프로토콜 재생 서버 (오프라인 테스트용)"""
+
+    def __init__(self, messages, host='127.0.0.1', port=0, speed=1.0, loop=False,
+                 disconnect_after=None):
+        """
+        Args:
+            messages: 메시지 리스트 또는 JSONL 경로 (UpbitWebSocketClient record_path 형식)
+            port: 0이면 빈 포트 자동 선택
+            speed: 재생 배속 (0이면 간격 없이 즉시 전송)
+            loop: 끝까지 재생 후 처음부터 반복
+            disconnect_after: 연결당 이 개수만큼 보낸 뒤 강제 종료 (재연결 테스트)
+        """
+        self.messages = load_messages(messages) if isinstance(messages, str) else list(messages)
+        self.messages.sort(key=_message_time_ms)
+        self.host = host
+        self.port = port
+        self.speed = speed
+        self.loop = loop
+        self.disconnect_after = disconnect_after
+
+        self.connections = 0
+        self._loop = None
+        self._thread = None
+        self._server = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    async def _handler(self, ws, path=None):
+        self.connections += 1
+        try:
+            subscriptions = parse_subscription(json.loads(await ws.recv()))
+        except (ValueError, websockets.exceptions.WebSocketException):
+            await ws.send(json.dumps({'error': {'name': 'INVALID_REQUEST'}}).encode())
+            return
+
+        try:
+            await self._replay(ws, subscriptions)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    async def _replay(self, ws, subscriptions):
+        sent = 0
+        while True:
+            previous_ms = None
+            sent_before = sent
+            for message in self.messages:
+                codes = subscriptions.get(message.get('type'))
+                if not codes or message.get('code') not in codes:
+                    continue
+
+                msg_ms = _message_time_ms(message)
+                if self.speed and previous_ms is not None and msg_ms > previous_ms:
+                    await asyncio.sleep((msg_ms - previous_ms) / 1000 / self.speed)
+                previous_ms = msg_ms
+
+                # 업비트와 같이 바이너리 프레임으로 전송
+                await ws.send(json.dumps(message, ensure_ascii=False).encode('utf-8'))
+                sent += 1
+                if self.disconnect_after and sent >= self.disconnect_after:
+                    await ws.close()
+                    return
+
+            # 구독과 맞는 메시지가 하나도 없으면 반복해도 보낼 게 없음 (이벤트 루프 독점 방지)
+            if not self.loop or sent == sent_before:
+                break
+            await asyncio.sleep(0)
+
+        # 재생 종료 후 연결 유지 (클라이언트가 끊을 때까지)
+        await ws.wait_closed()
+
+    def start(self):
+        """백그라운드 스레드에서 서버 시작"""
+        self._thread = threading.Thread(target=self._thread_main, name='upbit-ws-replay', daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self.url
+
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        async def _serve():
+            self._server = await websockets.serve(self._handler, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await self._server.wait_closed()
+
+        try:
+            self._loop.run_until_complete(_serve())
+        finally:
+            self._loop.close()
+
+    def stop(self):
+        """서버 종료"""
+        if self._loop and self._server:
+            self._loop.call_soon_threadsafe(self._server.close)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    """녹화 / 재생
+
+    python upbit_websocket.py record KRW-BTC,KRW-ETH ws_record.jsonl
+    python upbit_websocket.py replay ws_record.jsonl
+    """
+    import sys
+
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'record'
+
+    if mode == 'replay':
+        server = UpbitReplayServer(sys.argv[2], port=8765, loop=True)
+        print(f"🔁 재생 서버: {server.start()}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.stop()
+    else:
+        codes = (sys.argv[2] if len(sys.argv) > 2 else 'KRW-BTC').split(',')
+        path = sys.argv[3] if len(sys.argv) > 3 else 'ws_record.jsonl'
+        client = UpbitWebSocketClient(record_path=path)
+        client.subscribe('ticker', codes)
+        client.subscribe('trade', codes)
+        client.start(wait_connected=10)
+        print(f"⏺️ 녹화 중: {path} (Ctrl+C 종료)")
+        try:
+            while True:
+                client.wait_for_update(5)
+                for code in codes:
+                    price, age = client.get_latest_price(code)
+                    if price:
+                        print(f"{code}: {price:,.0f} ({age*1000:.0f}ms 전)", end='  ')
+                print(end='\r')
+        except KeyboardInterrupt:
+            client.stop()